@@ -0,0 +1,298 @@
+"""
+Perencanaan batch: semua kombinasi (depot, tanggal) dalam satu proses.
+
+Inventaris dibaca dari file CSV/Parquet (lihat bin_inventory). Jika ada kolom depot_id, setiap
+kelompok depot_id adalah satu depot dengan baris pertamanya sebagai lokasi depot; tanpa kolom
+itu setiap file adalah satu depot (nama file sebagai depot_id).
+
+Matriks jarak dihitung sekali per depot untuk seluruh inventarisnya. Setiap hari hanya memakai
+sub-matriks tempat sampah yang dijadwalkan (np.ix_), dan kombinasi (depot, tanggal) diselesaikan
+paralel di process pool dengan mode armada (fleet_routing). Volume berasal dari provider volume
+default jika cocok, atau volume sintetis dengan seed per depot (lihat depot_demand_provider).
+
+Hasil ditulis per trip dalam format kolumnar: JSON lines (default) atau Parquet (jika nama file
+berakhiran .parquet, membutuhkan pyarrow). Peta tidak dibuat saat perencanaan; gunakan subcommand
+render untuk membuat peta satu (depot, tanggal) dari file hasil bila diperlukan.
+
+distance_m adalah jarak satu trip; trip terakhir setiap truk juga menghitung perjalanan kembali dari
+TPA ke depot, sehingga jumlah distance_m per (depot, tanggal) sama dengan total jarak armada.
+
+Contoh:
+    python batch_planner.py plan inventaris.csv --start 2024-06-03 --end 2024-06-09 \\
+        --capacities 25 25 --output rute.jsonl
+    python batch_planner.py render rute.jsonl inventaris.csv --depot inventaris --date 2024-06-03
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bin_inventory import filter_inventory_by_day, inventory_from_frame, read_inventory_frame
+from demand_provider import DEFAULT_DEMAND_SEED, SyntheticDemandProvider, get_demand_provider
+from distance_backend import PrecomputedBackend, get_distance_backend
+from fleet_routing import calculate_fleet_routes
+from optimalisasi_rute_truk_sampah import to_integer_matrix, visualize_route
+
+# bin_id untuk TPA (tidak ada di inventaris)
+LANDFILL_BIN_ID = -1
+
+
+# Fungsi untuk memuat inventaris per depot dari satu atau beberapa file
+def load_depot_inventories(paths):
+    """
+    Return:
+    - dict {depot_id: inventaris (NumPy structured array)}.
+    """
+    inventories = {}
+    for path in paths:
+        frame = read_inventory_frame(path)
+        if 'depot_id' in frame:
+            for depot_id, group in frame.groupby('depot_id', sort=False):
+                inventories[str(depot_id)] = inventory_from_frame(group)
+        else:
+            inventories[Path(path).stem] = inventory_from_frame(frame)
+    return inventories
+
+
+# Fungsi untuk membuat daftar tanggal dari rentang (inklusif)
+def date_range(start, end):
+    start, end = date.fromisoformat(str(start)), date.fromisoformat(str(end))
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+# Fungsi untuk mengubah tanggal menjadi nomor hari untuk provider volume
+def demand_day(current_date, start_date):
+    """Minggu pertama rentang bernomor 0..6 (Senin..Minggu), minggu berikutnya 7..13, dst."""
+    return (current_date - start_date).days + start_date.weekday()
+
+
+# Fungsi untuk memilih provider volume satu depot
+def depot_demand_provider(depot_id, num_bins):
+    """
+    Provider default dipakai jika bukan sintetis dan jumlah tempat sampahnya cocok. Selain itu
+    volume sintetis dengan seed dari DEMAND_SEED dan depot_id (crc32, stabil antar proses), sehingga
+    depot dengan jumlah tempat sampah yang sama tidak mendapat volume yang sama.
+    """
+    provider = get_demand_provider()
+    if provider.num_bins == num_bins and not isinstance(provider, SyntheticDemandProvider):
+        return provider
+    return SyntheticDemandProvider(num_bins, seed=zlib.crc32(f"{DEFAULT_DEMAND_SEED}:{depot_id}".encode()))
+
+
+# Fungsi untuk merencanakan satu (depot, tanggal) di proses worker
+def plan_depot_day(task):
+    """
+    task: dict berisi depot_id, date, data (sudah difilter untuk hari tersebut), bin_ids,
+          distances, durations (sub-matriks untuk data['locations'] ditambah TPA jika ada),
+          dan solver_options
+
+    Return:
+    - list baris hasil, satu baris per trip (atau satu baris status jika tidak ada solusi).
+    """
+    data = task['data']
+    locations = list(data['locations'])
+    if data.get('landfill_location') is not None:
+        locations.append(data['landfill_location'])
+    backend = PrecomputedBackend(locations, task['distances'], task['durations'])
+    distances = to_integer_matrix(task['distances'])
+
+    start = time.perf_counter()
+    result = calculate_fleet_routes(data, backend, task['solver_options'])
+    solve_time = time.perf_counter() - start
+
+    base = {'depot_id': task['depot_id'], 'date': task['date'], 'weekday': task['weekday'],
+            'bins': len(data['locations']) - 1, 'solve_time_s': round(solve_time, 3)}
+    if result is None:
+        return [dict(base, status='no_solution', vehicle_id=None, trip=None, stops=[], load=None, distance_m=None)]
+
+    bin_ids = list(task['bin_ids']) + [LANDFILL_BIN_ID]
+    rows = []
+    for vehicle in result['vehicles']:
+        for trip_number, (trip, load) in enumerate(zip(vehicle['trips'], vehicle['loads'])):
+            distance = int(distances[trip[:-1], trip[1:]].sum())
+            # Trip terakhir ikut menghitung perjalanan kembali dari TPA ke depot, sehingga jumlah
+            # distance_m sama dengan total jarak calculate_fleet_routes
+            if result['landfill'] is not None and trip_number == len(vehicle['trips']) - 1:
+                distance += int(distances[result['landfill'], data['depot']])
+            rows.append(dict(
+                base,
+                status='ok',
+                vehicle_id=vehicle['vehicle_id'],
+                trip=trip_number,
+                stops=[int(bin_ids[node]) for node in trip],
+                load=int(load),
+                distance_m=distance,
+            ))
+    return rows
+
+
+# Fungsi untuk menyiapkan task semua tanggal untuk satu depot dengan satu matriks bersama
+def depot_tasks(depot_id, inventory, dates, backend, vehicle_capacities, max_trips, landfill_location,
+                solver_options):
+    locations = np.column_stack([inventory['lat'], inventory['lng']])
+    if landfill_location is not None:
+        locations = np.vstack([locations, landfill_location])
+    distances, durations = backend.matrix(locations.tolist())
+
+    # Volume semua tanggal diambil sekaligus; kolom 0 adalah depot dengan volume 0
+    provider = depot_demand_provider(depot_id, len(inventory) - 1)
+    daily_demands = provider.demands([demand_day(current_date, dates[0]) for current_date in dates])
+    daily_demands = np.column_stack([np.zeros(len(dates), dtype=np.int64), daily_demands])
+
+    tasks = []
+    for current_date, all_demands in zip(dates, daily_demands):
+        view = filter_inventory_by_day(inventory, current_date.weekday())
+        indices = view.indices
+        demands = all_demands[indices]
+        data = {
+            'locations': view.locations().tolist(),
+            'demands': demands.tolist(),
+            'vehicle_capacities': list(vehicle_capacities),
+            'num_vehicles': len(vehicle_capacities),
+            'depot': 0,
+            # Default: trip yang cukup untuk total volume hari itu jika semua truk penuh, ditambah satu
+            'max_trips': max_trips or -(-int(demands.sum()) // sum(vehicle_capacities)) + 1,
+            'landfill_location': landfill_location,
+        }
+        if landfill_location is not None:
+            indices = np.append(indices, len(inventory))
+        tasks.append({
+            'depot_id': depot_id,
+            'date': current_date.isoformat(),
+            'weekday': current_date.weekday(),
+            'data': data,
+            'bin_ids': view.column('bin_id').tolist(),
+            'distances': distances[np.ix_(indices, indices)],
+            'durations': durations[np.ix_(indices, indices)],
+            'solver_options': solver_options,
+        })
+    return tasks
+
+
+# Fungsi untuk merencanakan semua (depot, tanggal)
+def plan_batch(inventories, dates, backend=None, vehicle_capacities=(25,), max_trips=None, landfill_location=None,
+               solver_options=None, max_workers=None):
+    """
+    inventories: dict {depot_id: inventaris} (lihat load_depot_inventories)
+    backend: backend matriks jarak per depot (nama atau objek, lihat get_distance_backend)
+    max_trips: trip maksimum per truk; default dihitung dari total volume per hari
+
+    Return:
+    - DataFrame berisi satu baris per trip.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend)
+
+    rows = []
+    # 'spawn' agar worker tidak mewarisi klien OSRM bersama (thread pool-nya tidak ikut ter-fork)
+    # yang sudah dipakai untuk menghitung matriks depot
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context) as executor:
+        futures = []
+        # Task sebuah depot langsung dikirim sehingga solve berjalan selagi matriks depot berikutnya dihitung
+        for depot_id, inventory in inventories.items():
+            for task in depot_tasks(depot_id, inventory, dates, backend, vehicle_capacities, max_trips,
+                                    landfill_location, solver_options):
+                futures.append(executor.submit(plan_depot_day, task))
+        for future in as_completed(futures):
+            rows.extend(future.result())
+
+    columns = ['depot_id', 'date', 'weekday', 'status', 'vehicle_id', 'trip', 'stops', 'load', 'distance_m',
+               'bins', 'solve_time_s']
+    return pd.DataFrame(rows, columns=columns).sort_values(['depot_id', 'date', 'vehicle_id', 'trip'],
+                                                           ignore_index=True)
+
+
+# Fungsi untuk menulis hasil ke JSON lines atau Parquet
+def write_routes(routes, path):
+    if str(path).endswith(('.parquet', '.pq')):
+        routes.to_parquet(path, index=False)
+    else:
+        routes.to_json(path, orient='records', lines=True)
+
+
+# Fungsi untuk membaca baris hasil satu (depot, tanggal) tanpa memuat seluruh file JSON lines
+def read_plan_rows(path, depot_id, plan_date):
+    if str(path).endswith(('.parquet', '.pq')):
+        routes = pd.read_parquet(path, filters=[('depot_id', '==', depot_id), ('date', '==', plan_date)])
+        return routes
+    chunks = pd.read_json(path, lines=True, chunksize=10000, dtype={'depot_id': str, 'date': str})
+    return pd.concat([chunk[(chunk['depot_id'] == depot_id) & (chunk['date'] == plan_date)] for chunk in chunks])
+
+
+# Fungsi untuk membuat peta HTML satu (depot, tanggal) dari file hasil
+def render_plan_map(routes_path, inventories, depot_id, plan_date, output_path, landfill_location=None):
+    rows = read_plan_rows(routes_path, depot_id, plan_date)
+    rows = rows[rows['status'] == 'ok']
+    if rows.empty:
+        raise ValueError(f"Tidak ada rute untuk depot {depot_id} tanggal {plan_date}")
+
+    inventory = inventories[depot_id]
+    locations = np.column_stack([inventory['lat'], inventory['lng']]).tolist()
+    node_of_bin = {int(bin_id): node for node, bin_id in enumerate(inventory['bin_id'])}
+    if landfill_location is not None:
+        node_of_bin[LANDFILL_BIN_ID] = len(locations)
+        locations.append(list(landfill_location))
+
+    # Semua trip digabung menjadi satu urutan tanpa perhentian berurutan yang sama
+    route = []
+    for stops in rows['stops']:
+        for bin_id in stops:
+            node = node_of_bin[int(bin_id)]
+            if not route or route[-1] != node:
+                route.append(node)
+    visualize_route(locations, route, int(rows['distance_m'].sum()), output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help='Merencanakan semua (depot, tanggal)')
+    plan.add_argument('inventory', nargs='+', help='File inventaris CSV/Parquet')
+    plan.add_argument('--start', required=True, help='Tanggal awal (YYYY-MM-DD)')
+    plan.add_argument('--end', required=True, help='Tanggal akhir, inklusif (YYYY-MM-DD)')
+    plan.add_argument('--capacities', type=int, nargs='+', default=[25], help='Kapasitas per truk')
+    plan.add_argument('--max-trips', type=int, default=None)
+    plan.add_argument('--landfill', type=float, nargs=2, default=None, metavar=('LAT', 'LNG'))
+    plan.add_argument('--backend', default=None, help="Backend jarak ('osrm', 'haversine', ...)")
+    plan.add_argument('--time-limit', type=int, default=None, help='Batas waktu solver per (depot, tanggal)')
+    plan.add_argument('--workers', type=int, default=None)
+    plan.add_argument('--output', default='routes.jsonl', help='File hasil .jsonl atau .parquet')
+
+    render = commands.add_parser('render', help='Membuat peta HTML satu (depot, tanggal) dari file hasil')
+    render.add_argument('routes', help='File hasil dari subcommand plan')
+    render.add_argument('inventory', nargs='+', help='File inventaris yang sama dengan saat plan')
+    render.add_argument('--depot', required=True)
+    render.add_argument('--date', required=True)
+    render.add_argument('--landfill', type=float, nargs=2, default=None, metavar=('LAT', 'LNG'))
+    render.add_argument('--output', default=None, help='Default: route_map_<depot>_<tanggal>.html')
+
+    args = parser.parse_args()
+    inventories = load_depot_inventories(args.inventory)
+
+    if args.command == 'plan':
+        start = time.perf_counter()
+        solver_options = {'time_limit_seconds': args.time_limit} if args.time_limit else None
+        routes = plan_batch(inventories, date_range(args.start, args.end), args.backend, args.capacities,
+                            args.max_trips, args.landfill, solver_options, args.workers)
+        write_routes(routes, args.output)
+        plans = routes.groupby(['depot_id', 'date'])
+        failed = int((plans['status'].first() != 'ok').sum())
+        print(f"{plans.ngroups} rencana ({len(inventories)} depot), {failed} tanpa solusi, "
+              f"total {routes['distance_m'].sum() / 1000:.1f} km, {time.perf_counter() - start:.1f} s "
+              f"-> {args.output}")
+    else:
+        output = args.output or f"route_map_{args.depot}_{args.date}.html"
+        render_plan_map(args.routes, inventories, args.depot, args.date, output, args.landfill)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark ukuran payload dan waktu pembuatan figure animasi rute.
+
+Membandingkan mode 'cumulative' (satu frame per titik, setiap frame berisi seluruh prefix rute)
+dengan mode 'marker' (rute disederhanakan dan digambar sekali, frame hanya memindahkan marker).
+Geometri leg dibuat sintetis dengan belokan kecil agar mirip polyline jalan dari OSRM.
+
+Contoh:
+    python -m benchmarks.bench_animation --points 500 1000 3000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.instances import DEPOT_LOCATION
+from dashboard import generate_animation
+
+
+# Fungsi untuk membuat satu polyline sintetis sepanjang `points` titik
+def synthetic_legs(points, legs=20, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.0002, size=(points, 2)) + 0.00005
+    path = np.asarray(DEPOT_LOCATION) + np.cumsum(steps, axis=0)
+    return [chunk.tolist() for chunk in np.array_split(path, legs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, nargs='+', default=[500, 1000, 3000])
+    args = parser.parse_args()
+
+    print(f"{'points':>7} {'mode':>11} {'frames':>7} {'build (s)':>10} {'payload (MB)':>13}")
+    for points in args.points:
+        legs = synthetic_legs(points)
+        for mode in ('cumulative', 'marker'):
+            start = time.perf_counter()
+            figure = generate_animation([DEPOT_LOCATION], [0], 0, legs=legs, mode=mode)
+            payload = figure.to_json()
+            elapsed = time.perf_counter() - start
+            print(f"{points:>7} {mode:>11} {len(figure.frames):>7} {elapsed:>10.2f} {len(payload) / 1e6:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark pengambilan geometri leg rute terhadap server OSRM tiruan lokal.
+
+Membandingkan cara lama (requests.get berurutan tanpa Session) dengan klien OSRM bersama
+(connection pooling + request paralel) untuk rute dengan banyak perhentian.
+
+Contoh:
+    python -m benchmarks.bench_osrm_client --stops 200 --latency 0.05
+"""
+import argparse
+import random
+import time
+
+import requests
+
+from mock_osrm import start_mock_osrm
+from osrm_client import OSRMClient, set_osrm_client
+from route_cache import RouteCache, set_route_cache
+import optimalisasi_rute_truk_sampah as planner
+
+
+# Fungsi untuk membuat lokasi acak di sekitar depot Jakarta
+def random_locations(n, seed=0):
+    rng = random.Random(seed)
+    return [[-6.2088 + rng.uniform(-0.05, 0.05), 106.8456 + rng.uniform(-0.05, 0.05)] for _ in range(n)]
+
+
+# Fungsi untuk mengambil geometri leg satu per satu seperti implementasi lama
+def fetch_legs_sequential(base_url, locations, route):
+    legs = []
+    for i in range(len(route) - 1):
+        origin = planner.format_coordinate(locations[route[i]])
+        destination = planner.format_coordinate(locations[route[i + 1]])
+        url = f"{base_url}/route/v1/driving/{origin};{destination}?overview=full&geometries=geojson"
+        legs.append(requests.get(url).json()['routes'][0]['geometry']['coordinates'])
+    return legs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stops', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Jeda server tiruan per request (detik)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_osrm(latency=args.latency)
+    locations = random_locations(args.stops + 1)
+    route = list(range(len(locations))) + [0]
+
+    start = time.perf_counter()
+    fetch_legs_sequential(base_url, locations, route)
+    sequential_time = time.perf_counter() - start
+
+    # Cache kosong di memori agar semua leg benar-benar diambil dari server
+    set_route_cache(RouteCache(':memory:'))
+    client = OSRMClient(base_url=base_url, max_concurrency=args.concurrency)
+    set_osrm_client(client)
+    start = time.perf_counter()
+    legs = planner.get_route_legs_coordinates(locations, route)
+    pooled_time = time.perf_counter() - start
+
+    print(f"Leg: {len(route) - 1}, latensi server: {args.latency * 1000:.0f} ms")
+    print(f"Berurutan (requests.get): {sequential_time:.2f} s")
+    print(f"Klien OSRM ({args.concurrency} paralel): {pooled_time:.2f} s "
+          f"({sequential_time / pooled_time:.1f}x lebih cepat), "
+          f"{sum(1 for leg in legs if len(leg))} leg valid, {client.request_count} request")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark throughput ingest pembacaan sensor (lihat sensor_stream).
+
+Mengukur jumlah pembacaan per detik untuk:
+- ingest: SensorAggregator.ingest langsung dari array NumPy per batch
+- parse: LineParser.feed (parse JSON lines + ingest) dari potongan byte di memori
+- tail: start_sensor_stream membaca file JSON lines dari awal sampai semua pembacaan masuk
+- tcp: start_sensor_stream menerima pembacaan lewat socket TCP lokal
+serta waktu memilih tempat sampah di atas ambang (dengan proyeksi laju pengisian) dan membangun
+data model pengambilan.
+
+Contoh:
+    python -m benchmarks.bench_sensor_stream --readings 500000 --bins 5000
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import time
+
+import numpy as np
+
+from sensor_stream import LineParser, SensorAggregator, SENSOR_CHUNK_SIZE, pickup_data_model, start_sensor_stream
+
+
+# Fungsi untuk membuat pembacaan sintetis: setiap tempat sampah terisi naik perlahan dengan noise
+def generate_readings(num_readings, num_bins, seed=0):
+    rng = np.random.default_rng(seed)
+    bins = rng.integers(1, num_bins + 1, size=num_readings)
+    timestamps = 1_700_000_000 + np.arange(num_readings) * 0.01
+    rates = rng.uniform(0.2, 1.0, size=num_bins + 1) / (num_readings * 0.01)
+    levels = np.clip(rates[bins] * (timestamps - timestamps[0]) + rng.normal(0, 0.02, num_readings), 0, 1)
+    return bins, levels, timestamps
+
+
+# Fungsi untuk mengubah pembacaan menjadi JSON lines (bytes)
+def to_jsonl(bins, levels, timestamps):
+    return ''.join(json.dumps({'bin': int(b), 'level': round(float(l), 3), 'ts': round(float(t), 2)}) + '\n'
+                   for b, l, t in zip(bins, levels, timestamps)).encode()
+
+
+# Fungsi untuk menunggu sampai aggregator menerima semua pembacaan
+def wait_for(aggregator, expected, timeout=300):
+    deadline = time.perf_counter() + timeout
+    while aggregator.received < expected and time.perf_counter() < deadline:
+        time.sleep(0.005)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readings', type=int, default=500000)
+    parser.add_argument('--bins', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=1000, help='Ukuran batch untuk mode ingest')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    bins, levels, timestamps = generate_readings(args.readings, args.bins, args.seed)
+    payload = to_jsonl(bins, levels, timestamps)
+    results = []
+
+    aggregator = SensorAggregator(args.bins)
+    start = time.perf_counter()
+    for offset in range(0, args.readings, args.batch):
+        batch = slice(offset, offset + args.batch)
+        aggregator.ingest(bins[batch], levels[batch], timestamps[batch])
+    results.append(('ingest', time.perf_counter() - start, aggregator.received))
+
+    aggregator = SensorAggregator(args.bins)
+    line_parser = LineParser(aggregator)
+    start = time.perf_counter()
+    for offset in range(0, len(payload), SENSOR_CHUNK_SIZE):
+        line_parser.feed(payload[offset:offset + SENSOR_CHUNK_SIZE])
+    line_parser.flush()
+    results.append(('parse', time.perf_counter() - start, aggregator.received))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'readings.jsonl')
+        with open(path, 'wb') as file:
+            file.write(payload)
+        aggregator = SensorAggregator(args.bins)
+        start = time.perf_counter()
+        stop, _ = start_sensor_stream(aggregator, path, from_start=True)
+        wait_for(aggregator, args.readings)
+        results.append(('tail', time.perf_counter() - start, aggregator.received))
+        stop()
+
+    aggregator = SensorAggregator(args.bins)
+    stop, address = start_sensor_stream(aggregator, 'tcp://127.0.0.1:0')
+    host, _, port = address[len('tcp://'):].rpartition(':')
+    start = time.perf_counter()
+    with socket.create_connection((host, int(port))) as connection:
+        connection.sendall(payload)
+    wait_for(aggregator, args.readings)
+    results.append(('tcp', time.perf_counter() - start, aggregator.received))
+    stop()
+
+    print(f"{'path':>8} {'readings':>10} {'time (s)':>9} {'readings/s':>11}")
+    for name, elapsed, received in results:
+        print(f"{name:>8} {received:>10} {elapsed:>9.2f} {received / elapsed:>11.0f}")
+
+    data = {
+        'locations': np.random.default_rng(args.seed).uniform(-6.3, -6.1, size=(args.bins + 1, 2)).tolist(),
+        'demands': [0] * (args.bins + 1),
+        'depot': 0,
+    }
+    start = time.perf_counter()
+    pickup_data, _ = pickup_data_model(data, aggregator, horizon_seconds=3600)
+    elapsed = time.perf_counter() - start
+    print(f"\npickup_data_model: {len(pickup_data['locations']) - 1} dari {args.bins} tempat sampah "
+          f"dipilih dalam {elapsed * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark mode sparse (k tetangga terdekat, lihat sparse_routing) vs matriks penuh.
+
+Untuk setiap ukuran instance dilaporkan, per mode:
+- cells: jumlah sel jarak yang diminta dari backend (N x N untuk matriks penuh)
+- distances_s / solve_s: waktu mengambil jarak dan waktu solve
+- cost_km: total jarak rute
+- peak_mb: puncak alokasi Python (tracemalloc) selama mengambil jarak dan membangun model,
+  diukur dalam run terpisah yang berhenti di solusi pertama. Alokasi internal OR-Tools (C++)
+  tidak ikut terhitung.
+
+Sampai --osrm-max tempat sampah jarak diambil dari server OSRM tiruan lokal (jumlah request
+ikut dilaporkan), di atasnya memakai backend haversine.
+
+Contoh:
+    python -m benchmarks.bench_sparse --sizes 500 1000 2000 --time-limit 30
+"""
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.instances import generate_instance
+from benchmarks.run_benchmarks import FixedMatrixBackend, timed
+from distance_backend import get_distance_backend
+from metrics import recent_spans
+from mock_osrm import start_mock_osrm
+from optimalisasi_rute_truk_sampah import calculate_route, create_distance_matrix
+from osrm_client import OSRMClient, set_osrm_client
+from route_cache import DEFAULT_MAX_ENTRIES, RouteCache, set_route_cache
+from sparse_routing import calculate_sparse_route
+
+
+# Fungsi untuk menjalankan satu mode: 'dense', 'sparse', atau 'sparse-free' (tanpa pembatasan domain)
+def run_mode(mode, data, backend_name, neighbors, solver_options):
+    backend = get_distance_backend(backend_name)
+    if mode == 'dense':
+        distances, distances_time = timed(create_distance_matrix, data, backend)
+        fixed = FixedMatrixBackend(distances, np.zeros_like(distances))
+        (_, cost), solve_time = timed(calculate_route, data, fixed, solver_options)
+        return {'cells': distances.size, 'distances_s': distances_time, 'solve_s': solve_time, 'cost_km': cost / 1000}
+
+    (_, cost), total_time = timed(calculate_sparse_route, data, backend, solver_options, neighbors,
+                                  restrict_arcs=mode == 'sparse')
+    distances_time = recent_spans('sparse_distances')[-1]['duration']
+    return {
+        'cells': recent_spans('calculate_sparse_route')[-1]['requested_cells'],
+        'distances_s': distances_time,
+        'solve_s': total_time - distances_time,
+        'cost_km': cost / 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--modes', nargs='+', default=['dense', 'sparse', 'sparse-free'],
+                        choices=['dense', 'sparse', 'sparse-free'])
+    parser.add_argument('--neighbors', type=int, default=10)
+    parser.add_argument('--capacity', type=int, default=100, help='Kapasitas per truk')
+    parser.add_argument('--time-limit', type=int, default=30, help='Batas waktu solver per solve (detik)')
+    parser.add_argument('--osrm-max', type=int, default=1000)
+    parser.add_argument('--dense-max', type=int, default=3000, help='Ukuran maksimum untuk mode dense')
+    parser.add_argument('--no-memory', action='store_true', help='Lewati pengukuran peak memory')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_osrm()
+    client = OSRMClient(base_url=base_url)
+    set_osrm_client(client)
+    solver_options = {'time_limit_seconds': args.time_limit}
+
+    print(f"{'bins':>6} {'mode':>11} {'cells':>10} {'requests':>8} {'distances (s)':>13} {'solve (s)':>9} "
+          f"{'cost (km)':>9} {'peak (MB)':>9}")
+    for size in args.sizes:
+        # Radius area diperbesar seiring jumlah tempat sampah agar kepadatan tetap wajar
+        data = generate_instance(size, seed=args.seed, radius_deg=0.05 * max(size / 1000, 1) ** 0.5)
+        num_vehicles = -(-sum(data['demands']) // args.capacity) + 2
+        data['vehicle_capacities'] = [args.capacity] * num_vehicles
+        data['num_vehicles'] = num_vehicles
+        backend_name = 'osrm-exact' if size <= args.osrm_max else 'haversine'
+
+        for mode in args.modes:
+            if mode == 'dense' and size > args.dense_max:
+                continue
+            # Cache baru di memori agar setiap mode benar-benar meminta selnya ke server
+            set_route_cache(RouteCache(':memory:', max_entries=max(DEFAULT_MAX_ENTRIES, (size + 1) ** 2)))
+            requests_before = client.request_count
+            result = run_mode(mode, data, backend_name, args.neighbors, solver_options)
+            requests = client.request_count - requests_before if backend_name == 'osrm-exact' else '-'
+
+            peak = '-'
+            if not args.no_memory:
+                set_route_cache(RouteCache(':memory:', max_entries=max(DEFAULT_MAX_ENTRIES, (size + 1) ** 2)))
+                tracemalloc.start()
+                run_mode(mode, data, backend_name, args.neighbors, {'solution_limit': 1})
+                peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}"
+                tracemalloc.stop()
+
+            print(f"{size:>6} {mode:>11} {result['cells']:>10} {requests:>8} {result['distances_s']:>13.2f} "
+                  f"{result['solve_s']:>9.2f} {result['cost_km']:>9.1f} {peak:>9}")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
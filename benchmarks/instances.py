@@ -0,0 +1,37 @@
+"""
+Generator instance sintetis untuk benchmark perencanaan rute.
+
+Instance dibuat deterministik dari seed: tempat sampah tersebar acak di sekitar depot Jakarta
+yang sama dengan create_data_model, dengan format dict data yang sama.
+"""
+import numpy as np
+
+DEPOT_LOCATION = [-6.2088, 106.8456]
+
+
+# Fungsi untuk membuat instance sintetis berisi n_bins tempat sampah
+def generate_instance(n_bins, seed=0, radius_deg=0.05, vehicle_capacities=None):
+    """
+    n_bins: jumlah tempat sampah (tidak termasuk depot)
+    radius_deg: jarak maksimum tempat sampah dari depot dalam derajat (~5.5 km per 0.05)
+    vehicle_capacities: kapasitas truk; default satu truk yang cukup untuk semua sampah
+
+    Return:
+    - dict data model (locations, demands, vehicle_capacities, num_vehicles, depot, pickup_schedule)
+    """
+    rng = np.random.default_rng(seed)
+    offsets = rng.uniform(-radius_deg, radius_deg, size=(n_bins, 2))
+    locations = np.vstack([DEPOT_LOCATION, np.asarray(DEPOT_LOCATION) + offsets])
+    demands = np.concatenate([[0], rng.integers(1, 6, size=n_bins)])
+
+    if vehicle_capacities is None:
+        vehicle_capacities = [int(demands.sum())]
+
+    return {
+        'locations': locations.tolist(),
+        'demands': demands.tolist(),
+        'vehicle_capacities': list(vehicle_capacities),
+        'num_vehicles': len(vehicle_capacities),
+        'depot': 0,
+        'pickup_schedule': [0] * (n_bins + 1),
+    }
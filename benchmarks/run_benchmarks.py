@@ -0,0 +1,237 @@
+"""
+Suite benchmark perencanaan rute dengan pelacakan regresi.
+
+Untuk setiap ukuran instance sintetis (lihat benchmarks.instances) diukur:
+- matrix_cold_s / matrix_warm_s: waktu membangun matriks jarak dengan cache kosong dan terisi.
+  Sampai --osrm-max tempat sampah matriks diambil dari server OSRM tiruan lokal; di atasnya
+  memakai backend haversine.
+- solve_s dan cost_m: waktu solve dan total jarak rute. Sampai --monolithic-max tempat sampah
+  memakai calculate_route, di atasnya memakai dekomposisi spasial (solve_decomposed).
+- peak_memory_mb: puncak alokasi Python (tracemalloc) selama membangun matriks dan solve.
+  Alokasi internal OR-Tools (C++) tidak ikut terhitung.
+
+Selain itu diukur latensi callback dashboard (update_dashboard dan update_truck_schedule)
+untuk ketujuh hari, pertama kali (rencana dihitung) dan berikutnya (dari route_store).
+
+Hasil ditulis sebagai JSON. Dengan --baseline, hasil dibandingkan dengan run sebelumnya dan
+metrik yang memburuk lebih dari --tolerance ditandai sebagai regresi (exit code 1).
+
+Contoh:
+    python -m benchmarks.run_benchmarks --sizes 10 100 1000 10000 --output hasil.json
+    python -m benchmarks.run_benchmarks --baseline hasil.json --output hasil-baru.json
+"""
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.instances import generate_instance
+from decomposition import solve_decomposed
+from distance_backend import DistanceBackend, get_distance_backend
+from mock_osrm import start_mock_osrm
+from optimalisasi_rute_truk_sampah import calculate_route, create_distance_matrix
+from osrm_client import OSRMClient, set_osrm_client
+from route_cache import DEFAULT_MAX_ENTRIES, RouteCache, set_route_cache
+
+# Selisih absolut minimum agar perubahan dianggap regresi (menghindari noise pada angka kecil)
+MIN_ABSOLUTE_CHANGE = {'_s': 0.05, '_mb': 1.0, '_m': 1.0}
+
+
+class FixedMatrixBackend(DistanceBackend):
+    """Backend yang mengembalikan matriks yang sudah dihitung, agar waktu solve terukur terpisah."""
+
+    name = 'fixed'
+
+    def __init__(self, distances, durations):
+        self.distances = distances
+        self.durations = durations
+
+    def matrix(self, locations):
+        return self.distances, self.durations
+
+
+# Fungsi untuk mengukur waktu eksekusi sebuah fungsi
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+# Fungsi untuk membangun matriks dan menyelesaikan satu instance
+def build_and_solve(data, backend_name, monolithic, capacity, solver_options):
+    distances, matrix_time = timed(create_distance_matrix, data, get_distance_backend(backend_name))
+    if monolithic:
+        backend = FixedMatrixBackend(distances, np.zeros_like(distances))
+        (_, cost), solve_time = timed(calculate_route, data, backend, solver_options)
+    else:
+        data = dict(data, distance_backend=backend_name)
+        result, solve_time = timed(solve_decomposed, data, vehicle_capacity=capacity, solver_options=solver_options)
+        cost = result['total_distance']
+    return matrix_time, solve_time, cost
+
+
+# Fungsi untuk menjalankan benchmark satu ukuran instance
+def bench_instance(size, args):
+    # Radius area diperbesar seiring jumlah tempat sampah agar kepadatan tetap wajar
+    data = generate_instance(size, seed=args.seed, radius_deg=0.05 * max(size / 1000, 1) ** 0.5)
+    backend_name = 'osrm-exact' if size <= args.osrm_max else 'haversine'
+    monolithic = size <= args.monolithic_max
+    solver_options = {'time_limit_seconds': args.time_limit} if args.time_limit else None
+
+    # Cache baru di memori agar pengukuran pertama benar-benar mengambil semua sel dari server,
+    # dengan kapasitas yang cukup untuk seluruh matriks agar pengukuran kedua benar-benar warm
+    set_route_cache(RouteCache(':memory:', max_entries=max(DEFAULT_MAX_ENTRIES, (size + 1) ** 2)))
+    matrix_cold, solve_time, cost = build_and_solve(data, backend_name, monolithic, args.capacity, solver_options)
+    _, matrix_warm = timed(create_distance_matrix, data, get_distance_backend(backend_name))
+
+    metrics = {
+        'matrix_backend': backend_name,
+        'solver': 'monolithic' if monolithic else 'decomposed',
+        'matrix_cold_s': matrix_cold,
+        'matrix_warm_s': matrix_warm,
+        'solve_s': solve_time,
+        'cost_m': float(cost),
+    }
+
+    if not args.no_memory:
+        # Diukur dalam run terpisah karena tracemalloc memperlambat eksekusi
+        tracemalloc.start()
+        build_and_solve(data, backend_name, monolithic, args.capacity, solver_options)
+        metrics['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return metrics
+
+
+# Fungsi untuk mengukur latensi callback dashboard
+def bench_dashboard():
+    import dashboard
+    from route_store import RoutePlanStore
+
+    dashboard.route_store = RoutePlanStore()
+
+    # Sama dengan isi callback update_dashboard tanpa antrian job: solve di proses ini lalu render
+    def update_dashboard(day):
+        return dashboard.render_plan(dashboard.route_store.get_plan(day))
+
+    cold, warm = [], []
+    failed_days = 0
+    for day in range(7):
+        try:
+            cold.append(timed(update_dashboard, day)[1])
+        except Exception:
+            # Hari tanpa rute yang layak (misalnya volume melebihi kapasitas truk) tidak bisa ditampilkan
+            failed_days += 1
+            continue
+        warm.append(timed(update_dashboard, day)[1])
+    _, schedule_time = timed(dashboard.update_truck_schedule, 0)
+    return {
+        'update_dashboard_cold_s': float(np.mean(cold)),
+        'update_dashboard_warm_s': float(np.mean(warm)),
+        'update_dashboard_warm_max_s': float(np.max(warm)),
+        'update_dashboard_failed_days': failed_days,
+        'update_truck_schedule_s': schedule_time,
+    }
+
+
+# Fungsi untuk membandingkan hasil dengan baseline
+def find_regressions(results, baseline, tolerance):
+    """
+    Return:
+    - list (benchmark, metrik, nilai baseline, nilai sekarang) untuk metrik numerik
+      (semakin kecil semakin baik) yang naik lebih dari tolerance.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        previous_metrics = baseline.get(name, {})
+        for metric, value in metrics.items():
+            previous = previous_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)):
+                continue
+            min_change = next((change for suffix, change in MIN_ABSOLUTE_CHANGE.items() if metric.endswith(suffix)), 0)
+            if value > previous * (1 + tolerance) and value - previous > min_change:
+                regressions.append((name, metric, previous, value))
+    return regressions
+
+
+# Fungsi untuk mengambil commit git saat ini (jika ada)
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--capacity', type=int, default=100, help='Kapasitas per truk untuk solve dekomposisi')
+    parser.add_argument('--osrm-max', type=int, default=1000)
+    parser.add_argument('--monolithic-max', type=int, default=1000)
+    parser.add_argument('--time-limit', type=int, default=None, help='Batas waktu solver per solve (detik)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Jeda server OSRM tiruan per request (detik)')
+    parser.add_argument('--no-memory', action='store_true', help='Lewati pengukuran peak memory')
+    parser.add_argument('--no-dashboard', action='store_true', help='Lewati benchmark callback dashboard')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=None, help='File JSON hasil run sebelumnya')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Kenaikan relatif yang dianggap regresi')
+    args = parser.parse_args()
+
+    server, base_url = start_mock_osrm(latency=args.latency)
+    client = OSRMClient(base_url=base_url)
+    set_osrm_client(client)
+
+    results = {}
+    for size in args.sizes:
+        results[f"instance[{size}]"] = metrics = bench_instance(size, args)
+        print(f"{size:>6} bins: matrix {metrics['matrix_cold_s']:.3f} s (warm {metrics['matrix_warm_s']:.3f} s), "
+              f"solve {metrics['solve_s']:.3f} s ({metrics['solver']}), cost {metrics['cost_m'] / 1000:.1f} km"
+              + (f", peak {metrics['peak_memory_mb']:.1f} MB" if 'peak_memory_mb' in metrics else ''))
+    if not args.no_dashboard:
+        set_route_cache(RouteCache(':memory:'))
+        results['dashboard'] = metrics = bench_dashboard()
+        print(f"dashboard: update {metrics['update_dashboard_cold_s'] * 1000:.0f} ms pertama, "
+              f"{metrics['update_dashboard_warm_s'] * 1000:.1f} ms berikutnya, "
+              f"jadwal {metrics['update_truck_schedule_s'] * 1000:.0f} ms, "
+              f"{metrics['update_dashboard_failed_days']} hari tanpa rute")
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'osrm_requests': client.request_count,
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"Hasil ditulis ke {args.output}")
+
+    client.close()
+    server.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for name, metric, previous, value in regressions:
+            print(f"REGRESI {name} {metric}: {previous:.4g} -> {value:.4g} ({(value / previous - 1) * 100:+.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"Tidak ada regresi terhadap {args.baseline} (toleransi {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
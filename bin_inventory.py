@@ -0,0 +1,126 @@
+"""
+Inventaris tempat sampah dalam bentuk kolumnar (NumPy structured array).
+
+Setiap baris berisi bin_id, lat, lng, capacity (volume tempat sampah), dan schedule_mask.
+schedule_mask adalah bitmask hari pengambilan: bit ke-d menyala jika tempat sampah diambil pada
+hari d (0: Senin, ..., 6: Minggu). Filter per hari cukup berupa operasi bit tervektorisasi.
+
+Inventaris bisa dimuat dari CSV atau Parquet dengan kolom bin_id, lat, lng, dan salah satu dari
+schedule_mask atau pickup_schedule (format lama), serta capacity (opsional).
+"""
+import numpy as np
+import pandas as pd
+
+BIN_DTYPE = np.dtype([
+    ('bin_id', np.int64),
+    ('lat', np.float64),
+    ('lng', np.float64),
+    ('capacity', np.float32),
+    ('schedule_mask', np.uint8),
+])
+
+EVERY_DAY_MASK = 0b1111111
+
+
+# Fungsi untuk mengubah jadwal format lama menjadi bitmask hari
+def schedule_to_mask(pickup_schedule):
+    """
+    pickup_schedule: jadwal format lama, 0 berarti setiap hari dan k berarti setiap hari ke-k
+                     dalam seminggu, yaitu hari d dengan (d + 1) % k == 0. Dengan begitu jadwal 2
+                     jatuh pada Selasa, Kamis, dan Sabtu (bukan semua lokasi pada hari Senin).
+
+    Return:
+    - NumPy array uint8 berisi bitmask hari pengambilan.
+    """
+    schedule = np.asarray(pickup_schedule, dtype=np.int64)
+    days = np.arange(7)
+    period = np.where(schedule > 0, schedule, 1)[:, None]
+    selected = (schedule[:, None] == 0) | ((days[None, :] + 1) % period == 0)
+    return (selected.astype(np.uint8) << days.astype(np.uint8)).sum(axis=1).astype(np.uint8)
+
+
+# Fungsi untuk membuat mask boolean lokasi yang diambil pada hari tertentu
+def day_selection(schedule_mask, day):
+    return (np.asarray(schedule_mask, dtype=np.uint8) >> np.uint8(day % 7)) & 1 == 1
+
+
+class InventoryView:
+    """
+    Subset inventaris tanpa menyalin baris: hanya menyimpan array induk dan indeks terpilih.
+
+    Kolom array induk (misalnya base['lat']) adalah view NumPy; baris terpilih baru diambil
+    saat sebuah kolom diminta.
+    """
+
+    def __init__(self, base, indices):
+        self.base = base
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def column(self, name):
+        return self.base[name][self.indices]
+
+    def locations(self):
+        return np.column_stack([self.column('lat'), self.column('lng')])
+
+
+# Fungsi untuk memilih tempat sampah yang diambil pada hari tertentu
+def filter_inventory_by_day(inventory, day, depot_index=0):
+    """
+    Return:
+    - InventoryView berisi depot (selalu diikutkan, di posisi pertama) dan tempat sampah
+      yang dijadwalkan pada hari tersebut.
+    """
+    selected = day_selection(inventory['schedule_mask'], day)
+    selected[depot_index] = False
+    indices = np.concatenate([[depot_index], np.flatnonzero(selected)])
+    return InventoryView(inventory, indices)
+
+
+# Fungsi untuk membuat inventaris dari kolom-kolom terpisah
+def create_bin_inventory(lat, lng, schedule_mask=None, capacity=None, bin_id=None, pickup_schedule=None):
+    n = len(lat)
+    inventory = np.empty(n, dtype=BIN_DTYPE)
+    inventory['bin_id'] = np.arange(n) if bin_id is None else bin_id
+    inventory['lat'] = lat
+    inventory['lng'] = lng
+    inventory['capacity'] = 0 if capacity is None else capacity
+    if schedule_mask is not None:
+        inventory['schedule_mask'] = schedule_mask
+    elif pickup_schedule is not None:
+        inventory['schedule_mask'] = schedule_to_mask(pickup_schedule)
+    else:
+        inventory['schedule_mask'] = EVERY_DAY_MASK
+    return inventory
+
+
+# Fungsi untuk membuat inventaris dari DataFrame
+def inventory_from_frame(frame):
+    """Baris pertama DataFrame diperlakukan sebagai depot."""
+    return create_bin_inventory(
+        frame['lat'].to_numpy(),
+        frame['lng'].to_numpy(),
+        schedule_mask=frame['schedule_mask'].to_numpy() if 'schedule_mask' in frame else None,
+        capacity=frame['capacity'].to_numpy() if 'capacity' in frame else None,
+        bin_id=frame['bin_id'].to_numpy() if 'bin_id' in frame else None,
+        pickup_schedule=frame['pickup_schedule'].to_numpy() if 'pickup_schedule' in frame else None,
+    )
+
+
+# Fungsi untuk membaca file inventaris CSV atau Parquet sebagai DataFrame
+def read_inventory_frame(path):
+    path = str(path)
+    return pd.read_parquet(path) if path.endswith(('.parquet', '.pq')) else pd.read_csv(path)
+
+
+# Fungsi untuk memuat inventaris dari file CSV atau Parquet
+def load_bin_inventory(path):
+    """
+    Baris pertama file diperlakukan sebagai depot.
+
+    Return:
+    - NumPy structured array dengan dtype BIN_DTYPE.
+    """
+    return inventory_from_frame(read_inventory_frame(path))
@@ -1,34 +1,60 @@
 import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash import ctx, dcc, html
+from dash.dependencies import Input, Output, State
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta  # Updated import
+import numpy as np
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
 
 # Mengimpor fungsi dari optimalisasi_rute_truk_sampah.py
-from optimalisasi_rute_truk_sampah import create_data_model, calculate_route, filter_locations_by_day, visualize_route, get_route_coordinates
+from optimalisasi_rute_truk_sampah import build_route_map, get_route_legs_geometry
+from geometry import leg_coordinates, sample_along, simplify_polyline
+from metrics import current_span, register_metrics_route, traced
+from planning_jobs import get_job_queue
+from route_store import RoutePlanStore
+from scenarios import DEFAULT_SCENARIOS, evaluate_scenarios
 
-# Fungsi untuk menghasilkan peta animasi Plotly
-def generate_animation(locations, route, total_distance):
-    """
-    Fungsi ini akan menghasilkan animasi pergerakan truk pada peta Plotly berdasarkan lokasi dan rute.
-    Memberikan marker dengan warna yang berbeda untuk depot dan tempat sampah.
-    """
-    latitudes = []
-    longitudes = []
-    
-    # Mendapatkan koordinat rute yang mengikuti jalan dari OSRM
-    for i in range(len(route) - 1):
-        origin = f"{locations[route[i]][1]},{locations[route[i]][0]}"  
-        destination = f"{locations[route[i + 1]][1]},{locations[route[i + 1]][0]}"  
-        route_coordinates = get_route_coordinates(origin, destination)
-        
-        if route_coordinates:
-            latitudes.extend([coord[0] for coord in route_coordinates])
-            longitudes.extend([coord[1] for coord in route_coordinates])
-    
-    # Membuat frame untuk setiap langkah rute
+# Batas waktu solver (detik) untuk setiap solve dashboard, agar job yang dibatalkan atau
+# instance yang besar tidak menahan worker antrian job terlalu lama
+DASHBOARD_SOLVE_TIME_LIMIT = float(os.environ.get('DASHBOARD_SOLVE_TIME_LIMIT', 30))
+
+# Rencana rute ketujuh hari dihitung sekali dan dipakai bersama oleh semua callback. Semua solve
+# (termasuk perhitungan awal di background dan refine) berjalan di antrian job, bukan di proses Dash.
+route_store = RoutePlanStore(solver_options={'time_limit_seconds': DASHBOARD_SOLVE_TIME_LIMIT},
+                             job_queue=get_job_queue)
+
+# Jumlah maksimum tabel skenario yang disimpan (LRU) dan jumlah proses evaluasi skenario per job.
+# Evaluasi berjalan di dalam antrian job dashboard, jadi default-nya kecil agar tidak memakai
+# semua core (default scenarios.evaluate_scenarios adalah cpu_count).
+MAX_SCENARIO_TABLES = int(os.environ.get('MAX_SCENARIO_TABLES', 16))
+DASHBOARD_SCENARIO_WORKERS = int(os.environ.get('DASHBOARD_SCENARIO_WORKERS', 2))
+
+# Tabel perbandingan skenario per snapshot muatan mingguan, ditampilkan ulang tanpa solve atau request OSRM
+scenario_tables = OrderedDict()
+scenario_tables_lock = threading.Lock()
+
+# Interval (detik) penghitungan ulang rencana di background, kosong berarti hanya saat startup
+ROUTE_PLAN_REFRESH_SECONDS = float(os.environ['ROUTE_PLAN_REFRESH_SECONDS']) if os.environ.get('ROUTE_PLAN_REFRESH_SECONDS') else None
+
+# Interval polling status job perencanaan dari browser (milidetik)
+PLAN_POLL_INTERVAL_MS = int(os.environ.get('PLAN_POLL_INTERVAL_MS', 500))
+
+# Mode animasi default: 'marker' (marker truk bergerak di atas rute statis) atau
+# 'cumulative' (mode lama, setiap frame menggambar ulang seluruh rute yang sudah dilalui)
+ANIMATION_MODE = os.environ.get('ANIMATION_MODE', 'marker')
+
+# Toleransi penyederhanaan rute (meter) dan durasi putar maksimum animasi (milidetik)
+ANIMATION_SIMPLIFY_TOLERANCE = float(os.environ.get('ANIMATION_SIMPLIFY_TOLERANCE', 5))
+ANIMATION_TIME_BUDGET_MS = int(os.environ.get('ANIMATION_TIME_BUDGET_MS', 30000))
+ANIMATION_FRAME_DURATION_MS = 300
+
+# Fungsi untuk membuat frame mode lama: setiap frame berisi seluruh prefix rute
+def _cumulative_frames(latitudes, longitudes):
     frames = []
     for k in range(len(latitudes)):
         if k == 0:
@@ -66,10 +92,68 @@ def generate_animation(locations, route, total_distance):
                 ],
                 name=f"frame{k}"
             ))
-    
+    return frames
+
+# Fungsi untuk menghasilkan peta animasi Plotly
+@traced('generate_animation', profile=True)
+def generate_animation(locations, route, total_distance, legs=None, mode=None,
+                       tolerance=ANIMATION_SIMPLIFY_TOLERANCE, time_budget_ms=ANIMATION_TIME_BUDGET_MS):
+    """
+    Fungsi ini akan menghasilkan animasi pergerakan truk pada peta Plotly berdasarkan lokasi dan rute.
+    Memberikan marker dengan warna yang berbeda untuk depot dan tempat sampah.
+
+    legs: geometri per leg yang sudah diambil sebelumnya (encoded polyline atau list koordinat,
+          misalnya dari route_store); jika kosong, geometri diambil dari OSRM.
+    mode: 'marker' atau 'cumulative' (default: ANIMATION_MODE).
+          Pada mode 'marker' rute disederhanakan (Douglas-Peucker dengan `tolerance` meter),
+          digambar sekali sebagai garis statis, dan setiap frame hanya memindahkan marker truk.
+          Jumlah frame dibatasi agar durasi putar tidak melebihi `time_budget_ms`.
+    """
+    # Mendapatkan koordinat rute yang mengikuti jalan dari OSRM
+    if legs is None:
+        legs = get_route_legs_geometry(locations, route)
+    route_coordinates = [coordinates for coordinates in map(leg_coordinates, legs) if len(coordinates)]
+    if route_coordinates:
+        path = np.concatenate(route_coordinates).astype(np.float64)
+    else:
+        # Geometri OSRM tidak tersedia: garis lurus antar perhentian sesuai urutan rute
+        path = np.asarray([locations[node] for node in route], dtype=np.float64).reshape(-1, 2)
+    latitudes, longitudes = path[:, 0].tolist(), path[:, 1].tolist()
+
+    mode = mode or ANIMATION_MODE
+    if mode == 'cumulative':
+        # Membuat frame untuk setiap langkah rute
+        frames = _cumulative_frames(latitudes, longitudes)
+        base_data = []
+    else:
+        original_points = len(path)
+        path = simplify_polyline(path, tolerance)
+        latitudes, longitudes = path[:, 0].tolist(), path[:, 1].tolist()
+
+        # Marker truk bergerak dengan jarak yang sama per frame di sepanjang rute
+        max_frames = max(2, time_budget_ms // ANIMATION_FRAME_DURATION_MS)
+        positions = sample_along(path, min(original_points, max_frames))
+        frames = [
+            go.Frame(
+                data=[go.Scattermapbox(lat=[lat], lon=[lng])],
+                traces=[2],  # Hanya trace marker truk yang diperbarui
+                name=f"frame{k}"
+            )
+            for k, (lat, lng) in enumerate(positions.tolist())
+        ]
+        base_data = [
+            go.Scattermapbox(
+                lat=latitudes,
+                lon=longitudes,
+                mode="lines",  # Garis rute lengkap, dikirim sekali
+                line=dict(width=2, color="blue"),
+                hoverinfo="none"
+            )
+        ]
+
     # Membuat peta dasar Plotly dengan mapbox
     fig = go.Figure(
-        data=[
+        data=base_data + [
             go.Scattermapbox(
                 lat=[latitudes[0]],
                 lon=[longitudes[0]],
@@ -77,7 +161,15 @@ def generate_animation(locations, route, total_distance):
                 marker=dict(size=15, color="green"),  # Depot tetap hijau dan besar
                 hoverinfo="none"
             )
-        ],
+        ] + ([] if mode == 'cumulative' else [
+            go.Scattermapbox(
+                lat=[latitudes[0]],
+                lon=[longitudes[0]],
+                mode="markers",
+                marker=dict(size=12, color="red"),  # Marker truk yang bergerak
+                hoverinfo="none"
+            )
+        ]),
         layout=go.Layout(
             mapbox=dict(
                 style="open-street-map",
@@ -90,7 +182,7 @@ def generate_animation(locations, route, total_distance):
             updatemenus=[{
                 "buttons": [
                     {
-                        "args": [None, {"frame": {"duration": 300, "redraw": True}, "fromcurrent": True}],  # Durasi 300 ms per frame
+                        "args": [None, {"frame": {"duration": ANIMATION_FRAME_DURATION_MS, "redraw": True}, "fromcurrent": True}],  # Durasi 300 ms per frame
                         "label": "Play",
                         "method": "animate"
                     },
@@ -113,153 +205,307 @@ def generate_animation(locations, route, total_distance):
         frames=frames
     )
 
+    current_span().set(mode=mode, points=len(latitudes), frames=len(frames))
     return fig
 
+# Fungsi untuk menampilkan lokasi tanpa rute ketika solver tidak menemukan solusi
+def generate_no_solution_map(locations):
+    latitudes = [location[0] for location in locations]
+    longitudes = [location[1] for location in locations]
+    return go.Figure(
+        data=[
+            go.Scattermapbox(lat=latitudes[1:], lon=longitudes[1:], mode="markers",
+                             marker=dict(size=10, color="gray"), hoverinfo="none"),
+            go.Scattermapbox(lat=latitudes[:1], lon=longitudes[:1], mode="markers",
+                             marker=dict(size=15, color="green"), hoverinfo="none"),  # Depot
+        ],
+        layout=go.Layout(
+            mapbox=dict(style="open-street-map", center=dict(lat=latitudes[0], lon=longitudes[0]), zoom=14),
+            autosize=True,
+            height=600,
+            margin=dict(l=0, r=0, t=30, b=0),
+            title="Tidak ada rute yang layak untuk hari ini",
+            showlegend=False,
+        )
+    )
+
 # Fungsi untuk menghitung jadwal pemberangkatan truk berdasarkan permintaan sampah dan jam pemberangkatan
 def calculate_truck_departure_schedule():
     schedule = []
-    truck_capacity = 25  # Kapasitas truk
-    start_time = datetime.strptime("06:00", "%H:%M")  # Start time (6 AM)
-    end_time = datetime.strptime("18:00", "%H:%M")  # End time (6 PM)
-    working_hours = (end_time - start_time).seconds // 3600  # Total working hours
 
-    # Loop through each day and calculate the number of truck trips required
+    # Loop through each day and build the timetable from real travel times
     for day in range(7):  # 0: Monday, 6: Sunday
-        data = create_data_model(day)
-        total_waste = sum(data['demands'])  # Total volume of waste for the day
-        trips_needed = (total_waste // truck_capacity) + (1 if total_waste % truck_capacity != 0 else 0)
-
-        # Calculate the interval between trips (e.g., spread trips across the working hours)
-        if trips_needed > 0:
-            interval_between_trips = working_hours // trips_needed
-        else:
-            interval_between_trips = 0
+        # Hanya rencana yang sudah selesai dihitung; hari lain ditampilkan setelah job-nya selesai
+        plan = route_store.cached_plan(day)
+        timed_plan = plan['timetable'] if plan else None
 
-        # Calculate departure times for each trip
+        # Departure and return times for each trip (jam berangkat dan kembali ke depot)
         departure_times = []
-        for trip in range(trips_needed):
-            departure_time = start_time + timedelta(hours=trip * interval_between_trips)
-            departure_times.append(departure_time.strftime("%H:%M"))
+        return_times = []
+        for vehicle in (timed_plan['vehicles'] if timed_plan else []):
+            for trip in vehicle['timetable']:
+                departure_times.append(trip[0]['departure'])
+                return_times.append(trip[-1]['arrival'])
 
         # Add data for this day to the schedule
         schedule.append({
             'Day': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu'][day],
-            'Total Waste': total_waste,
-            'Trips Needed': trips_needed,
-            'Departure Times': ", ".join(departure_times)  # Join times as a string
+            'Total Waste': plan['total_waste'] if plan else '-',  # Total volume of waste for the day
+            'Trips Needed': len(departure_times) if plan else '-',
+            'Departure Times': ", ".join(departure_times) if plan else 'Sedang dihitung',  # Join times as a string
+            'Return Times': ", ".join(return_times)
         })
     
     return pd.DataFrame(schedule)
 
 # Fungsi untuk menampilkan peta statis setelah animasi
-def generate_static_map(locations, route, total_distance):
-    visualize_route(locations, route, total_distance)
-    return html.Iframe(srcDoc=open('route_map.html', 'r').read(), width='100%', height='600')
+def generate_static_map(locations, route, total_distance, legs=None):
+    # HTML peta dibuat langsung di memori (tanpa menulis lalu membaca route_map.html)
+    route_map = build_route_map(locations, route, total_distance, legs)
+    return html.Iframe(srcDoc=route_map.get_root().render(), width='100%', height='600')
 
 # Buat aplikasi Dash
 app = dash.Dash(__name__)
 
-# Layout aplikasi
-app.layout = html.Div([
-    html.H1("Truck Route Monitoring Dashboard", style={'text-align': 'center'}),
-
-    html.Div([
-        html.H2("Peta Animasi Rute"),
-        dcc.Graph(id='animated-map'),
-        html.Button("Switch to Static Map", id='switch-button', n_clicks=0),
-        html.Div(id='static-map'),
-    ], style={'width': '60%', 'display': 'inline-block', 'padding': '20px'}),
-
-    html.Div([
-        html.H2("Muatan dan Jadwal"),
-        dcc.Graph(id='load-graph'),
-        html.P("Pilih Hari:"),
-        dcc.Dropdown(
-            id='day-dropdown',
-            options=[
-                {'label': 'Senin', 'value': 0},
-                {'label': 'Selasa', 'value': 1},
-                {'label': 'Rabu', 'value': 2},
-                {'label': 'Kamis', 'value': 3},
-                {'label': 'Jumat', 'value': 4},
-                {'label': 'Sabtu', 'value': 5},
-                {'label': 'Minggu', 'value': 6},
-            ],
-            value=datetime.now().weekday(), 
-            clearable=False
-        )
-    ], style={'width': '35%', 'display': 'inline-block', 'vertical-align': 'top', 'padding': '20px'}),
+# Metrik Prometheus (span pipeline, request OSRM, cache) di /metrics
+register_metrics_route(app.server)
 
-    html.Div([
-        html.H2("Jadwal Pemberangkatan Truk"),
-        html.Table(id='truck-schedule-table')
-    ], style={'width': '100%', 'padding': '20px'})
-])
+# Layout aplikasi, dibuat per pemuatan halaman agar setiap sesi browser punya session-id sendiri
+def serve_layout():
+    return html.Div([
+        html.H1("Truck Route Monitoring Dashboard", style={'text-align': 'center'}),
 
-# Callback untuk memperbarui peta animasi dan grafik
-@app.callback(
-    [Output('animated-map', 'figure'), Output('load-graph', 'figure')],
-    [Input('day-dropdown', 'value')]
-)
-def update_dashboard(selected_day):
-    # Membuat data model dan memfilter lokasi berdasarkan hari yang dipilih
-    data = create_data_model(selected_day)
-    filtered_data = filter_locations_by_day(data, selected_day)
+        html.Div([
+            html.H2("Peta Animasi Rute"),
+            dcc.Graph(id='animated-map'),
+            html.Div(id='plan-progress'),
+            html.Button("Switch to Static Map", id='switch-button', n_clicks=0),
+            html.Div(id='static-map'),
+        ], style={'width': '60%', 'display': 'inline-block', 'padding': '20px'}),
+
+        html.Div([
+            html.H2("Muatan dan Jadwal"),
+            dcc.Graph(id='load-graph'),
+            html.P("Pilih Hari:"),
+            dcc.Dropdown(
+                id='day-dropdown',
+                options=[
+                    {'label': 'Senin', 'value': 0},
+                    {'label': 'Selasa', 'value': 1},
+                    {'label': 'Rabu', 'value': 2},
+                    {'label': 'Kamis', 'value': 3},
+                    {'label': 'Jumat', 'value': 4},
+                    {'label': 'Sabtu', 'value': 5},
+                    {'label': 'Minggu', 'value': 6},
+                ],
+                value=datetime.now().weekday(), 
+                clearable=False
+            )
+        ], style={'width': '35%', 'display': 'inline-block', 'vertical-align': 'top', 'padding': '20px'}),
+
+        html.Div([
+            html.H2("Jadwal Pemberangkatan Truk"),
+            html.Table(id='truck-schedule-table')
+        ], style={'width': '100%', 'padding': '20px'}),
+
+        html.Div([
+            html.H2("Perbandingan Skenario"),
+            html.Button("Bandingkan Skenario", id='scenario-button', n_clicks=0),
+            html.Div(id='scenario-progress'),
+            html.Table(id='scenario-table')
+        ], style={'width': '100%', 'padding': '20px'}),
+
+        # Job perencanaan yang sedang diikuti sesi ini dan polling statusnya
+        dcc.Store(id='session-id', data=uuid.uuid4().hex),
+        dcc.Store(id='plan-job'),
+        dcc.Interval(id='plan-poll', interval=PLAN_POLL_INTERVAL_MS, disabled=True),
+        dcc.Store(id='scenario-job'),
+        dcc.Interval(id='scenario-poll', interval=PLAN_POLL_INTERVAL_MS, disabled=True)
+    ])
+
+app.layout = serve_layout
 
-    # Menghitung rute berdasarkan data yang sudah difilter
-    route, total_distance = calculate_route(filtered_data)
+# Fungsi untuk membuat peta animasi, grafik muatan, dan pesan status dari sebuah rencana
+def render_plan(plan):
+    filtered_data = plan['data']
 
-    # Menghasilkan animasi pergerakan truk menggunakan Plotly
-    animated_map = generate_animation(filtered_data['locations'], route, total_distance)
+    message = None
+    if plan['route']:
+        # Menghasilkan animasi pergerakan truk menggunakan Plotly
+        animated_map = route_store.artifact(plan, 'animation', lambda: generate_animation(
+            filtered_data['locations'], plan['route'], plan['total_distance'], plan['legs']))
+    else:
+        # Solver tidak menemukan rute (misalnya total muatan melebihi kapasitas armada)
+        animated_map = generate_no_solution_map(filtered_data['locations'])
+        message = html.P(f"Tidak ditemukan solusi rute: total muatan {sum(filtered_data['demands'])} m3, "
+                         f"kapasitas armada {sum(filtered_data['vehicle_capacities'])} m3.")
 
     # Menyiapkan data untuk grafik muatan dan jadwal
     df = pd.DataFrame({
         'Lokasi': [f'Lokasi {i}' for i in range(len(filtered_data['locations']))],
         'Muatan': filtered_data['demands'],
-        'Jadwal': filtered_data['pickup_schedule']
+        # Data dari inventaris hanya punya bitmask jadwal (lihat data_model_from_inventory)
+        'Jadwal': filtered_data.get('pickup_schedule', filtered_data['schedule_mask'])
     })
 
     # Membuat grafik batang menggunakan Plotly
     fig = px.bar(df, x='Lokasi', y='Muatan', color='Jadwal', title="Muatan dan Jadwal Pengambilan")
 
-    return animated_map, fig
+    return animated_map, fig, message
+
+# Fungsi untuk menampilkan progres job perencanaan
+def render_progress(status):
+    return html.Div([
+        html.Progress(value=str(status['progress']), max='1'),
+        html.Span(f" {status['message']} ({status['progress']:.0%})")
+    ])
+
+# Callback untuk memperbarui peta animasi dan grafik.
+# Rencana yang belum ada dihitung oleh antrian job di process pool; callback ini hanya mengirim
+# job (request identik dari sesi lain ikut job yang sama) lalu memantau statusnya lewat plan-poll.
+@app.callback(
+    [Output('animated-map', 'figure'), Output('load-graph', 'figure'), Output('plan-progress', 'children'),
+     Output('plan-poll', 'disabled'), Output('plan-job', 'data')],
+    [Input('day-dropdown', 'value'), Input('plan-poll', 'n_intervals')],
+    [State('session-id', 'data'), State('plan-job', 'data')]
+)
+def update_dashboard(selected_day, n_intervals, session_id, job):
+    job_queue = get_job_queue()
+
+    if ctx.triggered_id != 'plan-poll' or not job or job['day'] != selected_day:
+        job_id = route_store.submit_day(selected_day, owner=session_id)
+        if job_id is None:
+            # Rencana sudah ada; job lama sesi ini (hari yang sebelumnya dipilih) tidak lagi dibutuhkan
+            job_queue.release(session_id)
+            return *render_plan(route_store.cached_plan(selected_day)), True, {'day': selected_day, 'job_id': None}
+        return (dash.no_update, dash.no_update, render_progress(job_queue.status(job_id)), False,
+                {'day': selected_day, 'job_id': job_id})
+
+    status = job_queue.status(job['job_id']) if job['job_id'] else None
+    if status is None:
+        return dash.no_update, dash.no_update, None, True, dash.no_update
+    if status['state'] == 'done':
+        # Rencana sudah disimpan (dan refine dikirim) oleh callback job di route_store
+        plan = route_store.add_plan(status['result'])
+        return *render_plan(plan), True, dash.no_update
+    if status['state'] in ('failed', 'cancelled'):
+        return dash.no_update, dash.no_update, html.P(f"{status['message']}: {status['error'] or ''}"), True, dash.no_update
+    return dash.no_update, dash.no_update, render_progress(status), False, dash.no_update
 
 # Callback untuk mengganti peta animasi ke peta statis
 @app.callback(
     Output('static-map', 'children'),
     Input('switch-button', 'n_clicks'),
-    Input('day-dropdown', 'value')
+    Input('day-dropdown', 'value'),
+    Input('plan-poll', 'disabled')
 )
-def switch_to_static_map(n_clicks, selected_day):
+def switch_to_static_map(n_clicks, selected_day, polling_disabled):
     if n_clicks > 0:
-        data = create_data_model(selected_day)
-        filtered_data = filter_locations_by_day(data, selected_day)
-        route, total_distance = calculate_route(filtered_data)
-        return generate_static_map(filtered_data['locations'], route, total_distance)
+        plan = route_store.cached_plan(selected_day)
+        if plan is None:
+            return html.P("Rencana rute sedang dihitung...")
+        if not plan['route']:
+            return html.P("Tidak ada rute untuk ditampilkan: solver tidak menemukan solusi untuk hari ini.")
+        # Dibuat sekali per rencana lalu dipakai ulang dari route_store
+        return route_store.artifact(plan, 'static-map', lambda: generate_static_map(
+            plan['data']['locations'], plan['route'], plan['total_distance'], plan['legs']))
     return None
 
 # Callback untuk menampilkan tabel jadwal pemberangkatan truk
 @app.callback(
     Output('truck-schedule-table', 'children'),
-    Input('day-dropdown', 'value')
+    Input('day-dropdown', 'value'),
+    Input('plan-poll', 'disabled')  # Diperbarui lagi setelah job perencanaan selesai
 )
-def update_truck_schedule(selected_day):
+def update_truck_schedule(selected_day, polling_disabled=True):
     # Hitung jadwal pemberangkatan truk
     schedule_df = calculate_truck_departure_schedule()
 
     # Buat tabel HTML berdasarkan dataframe
     table_header = [
-        html.Tr([html.Th("Hari"), html.Th("Total Volume Sampah (m3)"), html.Th("Jumlah Pemberangkatan Truk"), html.Th("Jam Pemberangkatan")])
+        html.Tr([html.Th("Hari"), html.Th("Total Volume Sampah (m3)"), html.Th("Jumlah Pemberangkatan Truk"), html.Th("Jam Pemberangkatan"), html.Th("Jam Kembali")])
     ]
     table_rows = [
         html.Tr([html.Td(schedule_df.iloc[i]['Day']),
                  html.Td(schedule_df.iloc[i]['Total Waste']),
                  html.Td(schedule_df.iloc[i]['Trips Needed']),
-                 html.Td(schedule_df.iloc[i]['Departure Times'])]) for i in range(len(schedule_df))
+                 html.Td(schedule_df.iloc[i]['Departure Times']),
+                 html.Td(schedule_df.iloc[i]['Return Times'])]) for i in range(len(schedule_df))
     ]
 
     return table_header + table_rows
 
+# Fungsi untuk mengambil tabel skenario yang tersimpan (None jika belum ada)
+def lookup_scenario_table(key):
+    with scenario_tables_lock:
+        summary = scenario_tables.get(key)
+        if summary is not None:
+            scenario_tables.move_to_end(key)
+        return summary
+
+# Fungsi untuk menyimpan tabel skenario, membuang snapshot yang paling lama tidak dipakai
+def store_scenario_table(key, summary):
+    with scenario_tables_lock:
+        scenario_tables[key] = summary
+        scenario_tables.move_to_end(key)
+        while len(scenario_tables) > MAX_SCENARIO_TABLES:
+            scenario_tables.popitem(last=False)
+
+# Fungsi untuk membuat tabel HTML dari ringkasan skenario (lihat scenarios.evaluate_scenarios)
+def render_scenario_table(summary):
+    table_header = [
+        html.Tr([html.Th("Skenario"), html.Th("Hari Layanan"), html.Th("Truk"), html.Th("Trip"),
+                 html.Th("Jarak (km)"), html.Th("Durasi (jam)"), html.Th("Utilisasi Muatan"), html.Th("Estimasi BBM (L)")])
+    ]
+    table_rows = [
+        html.Tr([html.Td(row['scenario']),
+                 html.Td(f"{row['service_days']}" + (f" ({row['failed_days']} tanpa solusi)" if row['failed_days'] else '')),
+                 html.Td(row['trucks']),
+                 html.Td(row['trips']),
+                 html.Td(row['distance_km']),
+                 html.Td(row['duration_h']),
+                 html.Td(f"{row['load_utilization']:.0%}" if pd.notna(row['load_utilization']) else '-'),
+                 html.Td(row['fuel_l'])]) for row in summary.to_dict('records')
+    ]
+    return table_header + table_rows
+
+# Callback untuk tabel perbandingan skenario. Evaluasi berjalan sebagai job di antrian perencanaan
+# (satu matriks bersama untuk semua skenario); hasilnya disimpan per snapshot muatan mingguan
+# sehingga menampilkan ulang tabel tidak memicu solve maupun request OSRM.
+@app.callback(
+    [Output('scenario-table', 'children'), Output('scenario-progress', 'children'),
+     Output('scenario-poll', 'disabled'), Output('scenario-job', 'data')],
+    [Input('scenario-button', 'n_clicks'), Input('scenario-poll', 'n_intervals')],
+    [State('session-id', 'data'), State('scenario-job', 'data')]
+)
+def update_scenario_table(n_clicks, n_intervals, session_id, job):
+    if not n_clicks:
+        return None, None, True, None
+    job_queue = get_job_queue()
+
+    if ctx.triggered_id == 'scenario-button' or not job:
+        key = ('scenarios', tuple(route_store.prepare_day(day)[1] for day in range(7)))
+        summary = lookup_scenario_table(key)
+        if summary is not None:
+            return render_scenario_table(summary), None, True, None
+        # Pemilik terpisah agar job skenario tidak membatalkan job rencana harian sesi yang sama
+        job_id = job_queue.submit(key, evaluate_scenarios, DEFAULT_SCENARIOS, route_store.backend,
+                                  route_store.solver_options, fleet_config=route_store.fleet_config,
+                                  max_workers=DASHBOARD_SCENARIO_WORKERS, owner=f"{session_id}:scenarios")
+        return dash.no_update, render_progress(job_queue.status(job_id)), False, {'job_id': job_id}
+
+    status = job_queue.status(job['job_id'])
+    if status is None:
+        return dash.no_update, None, True, dash.no_update
+    if status['state'] == 'done':
+        summary, _ = status['result']
+        store_scenario_table(status['key'], summary)
+        return render_scenario_table(summary), None, True, dash.no_update
+    if status['state'] in ('failed', 'cancelled'):
+        return dash.no_update, html.P(f"{status['message']}: {status['error'] or ''}"), True, dash.no_update
+    return dash.no_update, render_progress(status), False, dash.no_update
+
 # Menjalankan aplikasi
 if __name__ == '__main__':
+    route_store.start_background(interval=ROUTE_PLAN_REFRESH_SECONDS)
     app.run_server(debug=True)
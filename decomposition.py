@@ -0,0 +1,285 @@
+"""
+Dekomposisi spasial untuk instance skala kota.
+
+Tempat sampah dibagi menjadi klaster geografis yang seimbang muatannya (sweep berdasarkan
+sudut dari depot, atau k-means yang diseimbangkan), lalu VRP setiap klaster diselesaikan
+paralel di ProcessPoolExecutor. Hasilnya digabung menjadi satu rencana dan, opsional,
+diperbaiki di perbatasan klaster dengan memindahkan tempat sampah ke rute klaster tetangga
+jika itu memperpendek jarak.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.neighbors import BallTree
+
+from distance_backend import EARTH_RADIUS_M, HaversineBackend, get_distance_backend
+from fleet_routing import calculate_fleet_routes
+
+# Jumlah tempat sampah maksimum per klaster jika jumlah klaster tidak ditentukan
+DEFAULT_MAX_CLUSTER_BINS = 200
+
+
+# Fungsi untuk membagi tempat sampah menjadi klaster yang seimbang muatannya
+def partition_bins(data, num_clusters, method='sweep'):
+    """
+    data: dict data model (locations, demands, depot)
+    num_clusters: jumlah klaster
+    method: 'sweep' (urut sudut dari depot) atau 'kmeans' (k-means lalu diseimbangkan)
+
+    Return:
+    - List klaster, masing-masing list indeks node (tanpa depot).
+    """
+    depot = data['depot']
+    locations = np.asarray(data['locations'], dtype=np.float64)
+    demands = np.asarray(data['demands'], dtype=np.float64)
+    bins = np.array([node for node in range(len(locations)) if node != depot])
+    if len(bins) == 0:
+        return []
+    num_clusters = max(1, min(num_clusters, len(bins)))
+    target_load = demands[bins].sum() / num_clusters
+
+    if method == 'sweep':
+        offsets = locations[bins] - locations[depot]
+        angles = np.arctan2(offsets[:, 0], offsets[:, 1] * math.cos(math.radians(locations[depot][0])))
+        ordered = bins[np.argsort(angles, kind='stable')]
+
+        # Potong urutan sudut setiap kali muatan kumulatif melewati kelipatan target
+        cumulative = np.cumsum(demands[ordered])
+        cluster_ids = np.minimum((cumulative - 1e-9) // target_load, num_clusters - 1).astype(int)
+        return [ordered[cluster_ids == cluster].tolist() for cluster in range(num_clusters)
+                if np.any(cluster_ids == cluster)]
+
+    if method == 'kmeans':
+        # Koordinat diproyeksikan kasar agar jarak Euclid mendekati jarak sebenarnya
+        points = np.column_stack([
+            locations[bins, 0],
+            locations[bins, 1] * math.cos(math.radians(locations[depot][0])),
+        ])
+        kmeans = KMeans(n_clusters=num_clusters, n_init=4, random_state=0).fit(points)
+        centre_distances = np.linalg.norm(points[:, None, :] - kmeans.cluster_centers_[None, :, :], axis=2)
+
+        # Penyeimbangan: titik dengan selisih terbesar antara klaster terdekat dan kedua terdekat
+        # ditempatkan lebih dulu, ke klaster terdekat yang masih memiliki sisa kapasitas
+        capacity_limit = target_load * 1.1
+        preference = np.argsort(centre_distances, axis=1)
+        sorted_distances = np.take_along_axis(centre_distances, preference, axis=1)
+        regret = sorted_distances[:, 1] - sorted_distances[:, 0] if num_clusters > 1 else sorted_distances[:, 0]
+        loads = np.zeros(num_clusters)
+        assignment = np.empty(len(bins), dtype=int)
+        for point in np.argsort(-regret, kind='stable'):
+            demand = demands[bins[point]]
+            for cluster in preference[point]:
+                if loads[cluster] + demand <= capacity_limit:
+                    break
+            else:
+                cluster = int(np.argmin(loads))
+            assignment[point] = cluster
+            loads[cluster] += demand
+        return [bins[assignment == cluster].tolist() for cluster in range(num_clusters)
+                if np.any(assignment == cluster)]
+
+    raise ValueError(f"Metode partisi tidak dikenal: {method}")
+
+
+# Fungsi yang dijalankan di proses worker untuk menyelesaikan satu klaster
+def _solve_cluster(task):
+    cluster_nodes, data, vehicle_capacity, backend, solver_options = task
+    depot = data['depot']
+    nodes = [depot] + list(cluster_nodes)
+    cluster_demand = sum(data['demands'][node] for node in cluster_nodes)
+    # Satu kendaraan cadangan agar bin packing yang ketat tetap memiliki solusi
+    num_vehicles = math.ceil(cluster_demand / vehicle_capacity) + 1
+
+    cluster_data = {
+        'locations': [data['locations'][node] for node in nodes],
+        'demands': [data['demands'][node] for node in nodes],
+        'vehicle_capacities': [vehicle_capacity] * num_vehicles,
+        'num_vehicles': num_vehicles,
+        'depot': 0,
+        'distance_backend': data.get('distance_backend'),
+    }
+    result = calculate_fleet_routes(cluster_data, backend, solver_options)
+    if result is None:
+        return None
+
+    # Indeks lokal klaster dikembalikan ke indeks node global; jarak leg ikut dikembalikan agar
+    # proses induk tidak perlu mengambil matriks lagi
+    routes = [[nodes[node] for node in trip] for vehicle in result['vehicles'] for trip in vehicle['trips']]
+    legs = [legs for vehicle in result['vehicles'] for legs in vehicle['trip_legs']]
+    return routes, legs
+
+
+# Fungsi untuk menghitung jarak great-circle antara dua titik [lat, lng] (meter)
+def _point_distance(a, b, road_factor):
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * road_factor * math.asin(math.sqrt(h))
+
+
+# Fungsi untuk memperbaiki rute di perbatasan klaster
+def repair_boundaries(data, routes, route_clusters, vehicle_capacity, neighbours=5):
+    """
+    Memindahkan tempat sampah di perbatasan klaster ke rute klaster tetangga jika estimasi
+    jaraknya berkurang dan kapasitas masih cukup (operator relocate).
+
+    Tempat sampah dianggap di perbatasan jika salah satu dari `neighbours` tetangga terdekatnya
+    berada di klaster lain. Estimasi jarak memakai haversine dengan faktor jalan.
+
+    Return:
+    - (routes, changed): rute hasil perbaikan dan set indeks rute yang berubah.
+    """
+    locations = data['locations']
+    demands = data['demands']
+    depot = data['depot']
+    road_factor = HaversineBackend().road_factor
+
+    node_route = {}
+    for route_id, route in enumerate(routes):
+        for node in route[1:-1]:
+            node_route[node] = route_id
+    bins = np.array(sorted(node_route))
+    if len(bins) < 2:
+        return routes, set()
+
+    tree = BallTree(np.radians(np.asarray(locations)[bins]), metric='haversine')
+    _, neighbour_positions = tree.query(np.radians(np.asarray(locations)[bins]), k=min(neighbours + 1, len(bins)))
+
+    routes = [list(route) for route in routes]
+    loads = [sum(demands[node] for node in route[1:-1]) for route in routes]
+    changed = set()
+
+    def distance(a, b):
+        return _point_distance(locations[a], locations[b], road_factor)
+
+    for position, node in enumerate(bins):
+        node = int(node)
+        source = node_route[node]
+        candidate_routes = {node_route[int(bins[other])] for other in neighbour_positions[position][1:]}
+        candidate_routes = {route_id for route_id in candidate_routes
+                            if route_clusters[route_id] != route_clusters[source]}
+        if not candidate_routes:
+            continue
+
+        route = routes[source]
+        index = route.index(node)
+        previous_node, next_node = route[index - 1], route[index + 1]
+        removal_gain = distance(previous_node, node) + distance(node, next_node) - distance(previous_node, next_node)
+
+        best = None
+        for target in candidate_routes:
+            if loads[target] + demands[node] > vehicle_capacity:
+                continue
+            target_route = routes[target]
+            for insert_at in range(1, len(target_route)):
+                a, b = target_route[insert_at - 1], target_route[insert_at]
+                insertion_cost = distance(a, node) + distance(node, b) - distance(a, b)
+                if insertion_cost < removal_gain - 1 and (best is None or insertion_cost < best[0]):
+                    best = (insertion_cost, target, insert_at)
+
+        if best is not None:
+            _, target, insert_at = best
+            route.pop(index)
+            routes[target].insert(insert_at, node)
+            loads[source] -= demands[node]
+            loads[target] += demands[node]
+            node_route[node] = target
+            changed.update({source, target})
+
+    # Rute yang menjadi kosong (depot -> depot) tetap dibiarkan agar indeks rute stabil
+    return [route if len(route) > 2 else [depot, depot] for route in routes], changed
+
+
+# Fungsi untuk melengkapi jarak leg yang belum diketahui (leg baru hasil repair_boundaries)
+def _fill_leg_distances(data, routes, leg_distances, backend):
+    """
+    leg_distances: dict {(node asal, node tujuan): jarak} dari solve klaster, diperbarui di tempat.
+    Semua leg yang belum diketahui diambil dengan satu submatrix dari asal ke tujuan unik.
+    """
+    missing = {(a, b) for route in routes for a, b in zip(route, route[1:])
+               if a != b and (a, b) not in leg_distances}
+    if not missing:
+        return leg_distances
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend or data.get('distance_backend'))
+    origins = sorted({a for a, _ in missing})
+    destinations = sorted({b for _, b in missing})
+    distances, _ = backend.submatrix([data['locations'][node] for node in origins],
+                                     [data['locations'][node] for node in destinations])
+    row, col = {node: i for i, node in enumerate(origins)}, {node: j for j, node in enumerate(destinations)}
+    for a, b in missing:
+        leg_distances[(a, b)] = int(np.rint(distances[row[a], col[b]]))
+    return leg_distances
+
+
+# Fungsi untuk menghitung jarak satu rute dari jarak leg
+def _route_distance(route, leg_distances):
+    return sum(leg_distances[(a, b)] for a, b in zip(route, route[1:]) if a != b)
+
+
+# Fungsi utama dekomposisi: partisi, solve paralel, gabung, dan perbaiki perbatasan
+def solve_decomposed(data, vehicle_capacity=None, num_clusters=None, method='sweep', backend=None,
+                     solver_options=None, max_workers=None, repair=True):
+    """
+    Parameter:
+    - data: dict data model (locations, demands, depot, vehicle_capacities)
+    - vehicle_capacity: kapasitas per truk (default: data['vehicle_capacities'][0])
+    - num_clusters: jumlah klaster (default: satu klaster per DEFAULT_MAX_CLUSTER_BINS tempat sampah)
+    - method: 'sweep' atau 'kmeans'
+    - backend: nama backend jarak (harus bisa di-pickle ke proses worker)
+    - solver_options: opsi pencarian per klaster (lihat build_search_parameters)
+    - max_workers: jumlah proses worker (default: jumlah core)
+    - repair: jalankan repair_boundaries setelah penggabungan
+
+    Return:
+    - dict berisi 'routes' (list rute dengan indeks node global), 'route_distances',
+      'total_distance', 'clusters', dan 'unrouted' (indeks node tempat sampah dari klaster yang
+      tidak memiliki solusi; tempat sampah ini tidak ada di routes).
+    """
+    vehicle_capacity = vehicle_capacity or data['vehicle_capacities'][0]
+    num_bins = len(data['locations']) - 1
+    if num_clusters is None:
+        num_clusters = max(1, math.ceil(num_bins / DEFAULT_MAX_CLUSTER_BINS))
+    clusters = partition_bins(data, num_clusters, method)
+
+    shared_data = {key: data[key] for key in ('locations', 'demands', 'depot')}
+    shared_data['distance_backend'] = data.get('distance_backend')
+    tasks = [(cluster, shared_data, vehicle_capacity, backend, solver_options) for cluster in clusters]
+    # 'spawn' agar worker tidak mewarisi klien OSRM bersama (thread pool-nya tidak ikut ter-fork)
+    # jika proses induk sudah memakainya
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context) as executor:
+        cluster_results = list(executor.map(_solve_cluster, tasks))
+
+    routes, route_clusters, unrouted = [], [], []
+    leg_distances = {}
+    for cluster_id, cluster_result in enumerate(cluster_results):
+        if cluster_result is None:
+            print(f"Warning: Klaster {cluster_id} tidak memiliki solusi, {len(clusters[cluster_id])} tempat sampah tidak dirutekan")
+            unrouted.extend(clusters[cluster_id])
+            continue
+        cluster_routes, cluster_legs = cluster_result
+        for route, legs in zip(cluster_routes, cluster_legs):
+            leg_distances.update(zip(zip(route, route[1:]), legs))
+        routes.extend(cluster_routes)
+        route_clusters.extend([cluster_id] * len(cluster_routes))
+
+    route_distances = [_route_distance(route, leg_distances) for route in routes]
+    if repair and len(clusters) > 1:
+        routes, changed = repair_boundaries(data, routes, route_clusters, vehicle_capacity)
+        _fill_leg_distances(data, [routes[route_id] for route_id in changed], leg_distances, backend)
+        for route_id in changed:
+            route_distances[route_id] = _route_distance(routes[route_id], leg_distances)
+
+    # Buang rute kosong setelah perbaikan
+    kept = [route_id for route_id, route in enumerate(routes) if len(route) > 2]
+    return {
+        'routes': [routes[route_id] for route_id in kept],
+        'route_distances': [route_distances[route_id] for route_id in kept],
+        'total_distance': sum(route_distances[route_id] for route_id in kept),
+        'clusters': clusters,
+        'unrouted': sorted(unrouted),
+    }
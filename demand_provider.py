@@ -0,0 +1,130 @@
+"""
+Sumber data volume sampah (demand) per tempat sampah per hari.
+
+- SyntheticDemandProvider: volume sintetis yang deterministik dari seed. Volume satu hari hanya
+  bergantung pada (seed, hari), sehingga rute, cache, dan benchmark stabil antar run.
+- ReplayDemandProvider: memutar ulang riwayat volume yang tercatat (CSV atau JSON lines)
+  dengan kolom day, bin, demand.
+
+Provider default dipilih lewat environment variable:
+- DEMAND_REPLAY_PATH: jika diisi, memakai ReplayDemandProvider dari file tersebut
+- VOLUME_MODEL_VERSION: jika diisi (misalnya 'latest'), memakai PredictedDemandProvider dari
+  model prediksi versi tersebut (lihat volume_model)
+- DEMAND_SEED: seed untuk SyntheticDemandProvider (default: 42)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DEMAND_SEED = int(os.environ.get('DEMAND_SEED', 42))
+DEFAULT_NUM_BINS = 7
+
+# Rentang volume (min, max) per hari dalam seminggu: Senin lebih penuh, akhir pekan lebih ringan
+DEMAND_PROFILES = {0: (5, 10), 5: (1, 3), 6: (1, 3)}
+DEFAULT_DEMAND_PROFILE = (2, 5)
+
+
+class DemandProvider:
+    """Antarmuka sumber volume sampah."""
+
+    num_bins = DEFAULT_NUM_BINS
+
+    def demands(self, days):
+        """
+        days: iterable hari (0: Senin, ..., 6: Minggu; hari > 6 dihitung sebagai hari ke-n)
+
+        Return:
+        - NumPy array integer berukuran len(days) x num_bins (tanpa depot).
+        """
+        raise NotImplementedError
+
+    def daily_demands(self, day):
+        """List volume satu hari dalam format data model: indeks 0 adalah depot (volume 0)."""
+        return [0] + self.demands([day])[0].tolist()
+
+
+class SyntheticDemandProvider(DemandProvider):
+    """
+    Volume acak dengan profil harian, deterministik dari (seed, hari) dan tervektorisasi per hari.
+
+    Setiap hari sengaja memakai generator sendiri (default_rng([seed, hari])) sehingga volume
+    satu hari tidak bergantung pada hari lain yang diminta bersamanya. Loop Python hanya per hari;
+    semua tempat sampah diambil dalam satu panggilan per hari. Satu panggilan untuk seluruh blok
+    hari x tempat sampah akan menghilangkan sifat tersebut, dan hash berbasis counter per
+    (seed, hari, tempat sampah) di NumPy justru lebih lambat (365 x 100k: 1.3 s vs 0.34 s).
+    """
+
+    def __init__(self, num_bins=DEFAULT_NUM_BINS, seed=DEFAULT_DEMAND_SEED):
+        self.num_bins = num_bins
+        self.seed = seed
+
+    def demands(self, days):
+        days = list(days)
+        result = np.empty((len(days), self.num_bins), dtype=np.int64)
+        for row, day in enumerate(days):
+            low, high = DEMAND_PROFILES.get(day % 7, DEFAULT_DEMAND_PROFILE)
+            rng = np.random.default_rng([self.seed, day])
+            result[row] = rng.integers(low, high + 1, size=self.num_bins)
+        return result
+
+
+class ReplayDemandProvider(DemandProvider):
+    """
+    Memutar ulang riwayat volume. Sumber berupa path CSV/JSON lines atau DataFrame
+    dengan kolom day, bin (1..N, tanpa depot), dan demand.
+    """
+
+    def __init__(self, source, loop=False):
+        """
+        loop: jika True, hari di luar riwayat dipetakan ulang secara berulang (day % jumlah hari)
+        """
+        if isinstance(source, pd.DataFrame):
+            history = source
+        elif str(source).endswith(('.jsonl', '.json')):
+            history = pd.read_json(source, lines=True)
+        else:
+            history = pd.read_csv(source)
+
+        table = history.pivot_table(index='day', columns='bin', values='demand', aggfunc='last', fill_value=0)
+        self.days = table.index.to_numpy()
+        self.num_bins = int(table.columns.max())
+        self._table = np.zeros((len(self.days), self.num_bins), dtype=np.int64)
+        self._table[:, table.columns.to_numpy() - 1] = table.to_numpy()
+        self._row_of_day = {int(day): row for row, day in enumerate(self.days)}
+        self.loop = loop
+
+    def demands(self, days):
+        rows = []
+        for day in days:
+            if self.loop and day not in self._row_of_day:
+                day = int(self.days[day % len(self.days)])
+            if day not in self._row_of_day:
+                raise KeyError(f"Tidak ada riwayat volume untuk hari {day}")
+            rows.append(self._row_of_day[day])
+        return self._table[rows]
+
+
+_default_provider = None
+
+
+# Fungsi untuk mendapatkan provider volume default
+def get_demand_provider():
+    global _default_provider
+    if _default_provider is None:
+        replay_path = os.environ.get('DEMAND_REPLAY_PATH')
+        model_version = os.environ.get('VOLUME_MODEL_VERSION')
+        if replay_path:
+            _default_provider = ReplayDemandProvider(replay_path)
+        elif model_version:
+            from volume_model import PredictedDemandProvider, load_volume_model
+            _default_provider = PredictedDemandProvider(load_volume_model(model_version))
+        else:
+            _default_provider = SyntheticDemandProvider()
+    return _default_provider
+
+
+# Fungsi untuk mengganti provider volume default
+def set_demand_provider(provider):
+    global _default_provider
+    _default_provider = provider
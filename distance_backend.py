@@ -0,0 +1,301 @@
+"""
+Backend matriks jarak yang bisa dipilih untuk perencanaan rute.
+
+Setiap backend memiliki method matrix(locations) yang mengembalikan matriks jarak (meter)
+dan durasi (detik) N x N sebagai NumPy array. Tersedia:
+- 'osrm': jarak jalan dari OSRM, sel yang gagal otomatis diisi estimasi haversine
+- 'osrm-exact': jarak jalan dari OSRM saja, sel yang gagal diberi penalti besar
+- 'haversine': jarak garis lurus dikalikan faktor jalan, tanpa jaringan
+- 'warm-start': langsung mengembalikan estimasi haversine sambil memuat OSRM di background
+
+PrecomputedBackend (tanpa nama) melayani subset lokasi dari matriks yang sudah dihitung.
+
+Backend default dipilih lewat environment variable DISTANCE_BACKEND (default: 'osrm').
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+# Rasio jarak jalan terhadap jarak garis lurus, bisa dikalibrasi dengan calibrate_road_factor
+DEFAULT_ROAD_FACTOR = float(os.environ.get('ROAD_FACTOR', 1.3))
+
+# Kecepatan rata-rata truk untuk estimasi durasi (km/jam)
+DEFAULT_SPEED_KMH = float(os.environ.get('TRUCK_SPEED_KMH', 30))
+
+DEFAULT_DISTANCE_BACKEND = os.environ.get('DISTANCE_BACKEND', 'osrm')
+
+# Jumlah matriks tepat yang dimuat atau menunggu diambil WarmStartBackend, dan thread pemuatnya
+WARM_START_MAX_PENDING = int(os.environ.get('WARM_START_MAX_PENDING', 32))
+WARM_START_WORKERS = int(os.environ.get('WARM_START_WORKERS', 2))
+
+# Setengah panjang tali busur di bawah nilai ini dianggap sama dengan sudutnya (galat < 2e-5)
+_ARCSIN_THRESHOLD = 1e-2
+_BLOCK_ROWS = 256
+
+
+class DistanceBackend:
+    """Antarmuka backend matriks jarak."""
+
+    name = None
+
+    def matrix(self, locations):
+        """
+        locations: list [lat, lng]
+
+        Return:
+        - (distances, durations): NumPy array N x N dalam meter dan detik.
+        """
+        raise NotImplementedError
+
+    def submatrix(self, origins, destinations):
+        """
+        Matriks jarak dan durasi persegi panjang dari origins ke destinations.
+        Implementasi default menghitung matriks penuh lalu memotongnya.
+        """
+        distances, durations = self.matrix(list(origins) + list(destinations))
+        rows = slice(0, len(origins))
+        cols = slice(len(origins), None)
+        return distances[rows, cols], durations[rows, cols]
+
+
+class HaversineBackend(DistanceBackend):
+    """
+    Jarak garis lurus (great-circle) dikalikan faktor jalan, dihitung tervektorisasi.
+
+    Titik diubah menjadi vektor satuan 3D sehingga jarak antar semua pasangan bisa dihitung
+    per blok baris dengan satu perkalian matriks, lalu diproses paralel antar core.
+    """
+
+    name = 'haversine'
+
+    def __init__(self, road_factor=DEFAULT_ROAD_FACTOR, speed_kmh=DEFAULT_SPEED_KMH, dtype=np.float32):
+        self.road_factor = road_factor
+        self.speed_kmh = speed_kmh
+        self.dtype = dtype
+
+    def distance_matrix(self, locations, destinations=None):
+        """
+        Menghitung matriks jarak (meter) dari locations ke destinations (default: locations).
+        """
+        origins = _unit_vectors(locations)
+        targets = origins if destinations is None else _unit_vectors(destinations)
+        distances = np.empty((len(origins), len(targets)), dtype=self.dtype)
+        scale = 2 * EARTH_RADIUS_M * self.road_factor
+
+        def fill_block(start):
+            # Dengan vektor yang diskalakan 1/sqrt(2): 0.5 - dot = (tali busur / 2)^2
+            block = origins[start:start + _BLOCK_ROWS] @ targets.T
+            np.subtract(0.5, block, out=block)
+            np.maximum(block, 0, out=block)
+            np.sqrt(block, out=block)
+            if block.size and block.max() > _ARCSIN_THRESHOLD:
+                np.arcsin(block, out=block)
+            np.multiply(block, scale, out=distances[start:start + _BLOCK_ROWS], casting='same_kind')
+
+        starts = range(0, len(origins), _BLOCK_ROWS)
+        if len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(fill_block, starts))
+        else:
+            for start in starts:
+                fill_block(start)
+        if destinations is None:
+            np.fill_diagonal(distances, 0)
+        return distances
+
+    def matrix(self, locations):
+        distances = self.distance_matrix(locations)
+        durations = distances / self.dtype(self.speed_kmh / 3.6)
+        return distances, durations
+
+    def submatrix(self, origins, destinations):
+        distances = self.distance_matrix(origins, destinations)
+        durations = distances / self.dtype(self.speed_kmh / 3.6)
+        return distances, durations
+
+
+class OSRMBackend(DistanceBackend):
+    """Jarak dan durasi jalan dari OSRM Table API (lewat cache rute dan klien OSRM bersama)."""
+
+    name = 'osrm-exact'
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size
+
+    def matrix(self, locations):
+        # Import di sini untuk menghindari import melingkar dengan modul perencana
+        from optimalisasi_rute_truk_sampah import TABLE_CHUNK_SIZE, create_distance_duration_matrix
+
+        return create_distance_duration_matrix({'locations': locations}, chunk_size=self.chunk_size or TABLE_CHUNK_SIZE)
+
+    def submatrix(self, origins, destinations):
+        from optimalisasi_rute_truk_sampah import TABLE_CHUNK_SIZE, create_distance_duration_submatrix
+
+        return create_distance_duration_submatrix(origins, destinations, chunk_size=self.chunk_size or TABLE_CHUNK_SIZE)
+
+
+class FallbackBackend(DistanceBackend):
+    """
+    Memakai backend utama, dan mengisi sel yang gagal (bernilai penalti) atau seluruh matriks
+    ketika backend utama error dengan hasil backend cadangan.
+    """
+
+    name = 'osrm'
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    def matrix(self, locations):
+        return self._with_fallback('matrix', locations)
+
+    def submatrix(self, origins, destinations):
+        return self._with_fallback('submatrix', origins, destinations)
+
+    def _with_fallback(self, method, *locations):
+        from optimalisasi_rute_truk_sampah import INVALID_ROUTE_PENALTY
+
+        try:
+            distances, durations = getattr(self.primary, method)(*locations)
+        except Exception as error:
+            print(f"Warning: Backend {self.primary.name} gagal ({error}), memakai {self.fallback.name}")
+            return getattr(self.fallback, method)(*locations)
+
+        invalid = distances >= INVALID_ROUTE_PENALTY
+        if invalid.any():
+            print(f"Warning: {int(invalid.sum())} pasangan lokasi diisi estimasi {self.fallback.name}")
+            fallback_distances, fallback_durations = getattr(self.fallback, method)(*locations)
+            distances = np.where(invalid, fallback_distances, distances)
+            durations = np.where(invalid, fallback_durations, durations)
+        return distances, durations
+
+
+class WarmStartBackend(DistanceBackend):
+    """
+    Mengembalikan matriks cepat (haversine) seketika, sementara matriks tepat (OSRM)
+    dimuat di background. Panggil refined(locations) untuk menunggu hasil tepatnya.
+
+    Paling banyak max_pending matriks tepat disimpan sambil menunggu refined(); yang paling lama
+    tidak diminta dibuang lebih dulu, dan pemuatannya dibatalkan jika belum mulai.
+    """
+
+    name = 'warm-start'
+
+    def __init__(self, exact, quick, max_pending=WARM_START_MAX_PENDING, max_workers=WARM_START_WORKERS):
+        self.exact = exact
+        self.quick = quick
+        self.max_pending = max(1, max_pending)
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warm-start')
+
+    def _key(self, locations):
+        return tuple(map(tuple, np.asarray(locations, dtype=np.float64).round(6)))
+
+    def matrix(self, locations):
+        key = self._key(locations)
+        with self._lock:
+            if key in self._pending:
+                self._pending.move_to_end(key)
+            else:
+                self._pending[key] = self._executor.submit(self.exact.matrix, locations)
+                while len(self._pending) > self.max_pending:
+                    _, stale = self._pending.popitem(last=False)
+                    stale.cancel()
+        return self.quick.matrix(locations)
+
+    def submatrix(self, origins, destinations):
+        return self.quick.submatrix(origins, destinations)
+
+    def refined(self, locations, timeout=None):
+        """Menunggu dan mengembalikan matriks tepat untuk locations."""
+        key = self._key(locations)
+        with self._lock:
+            future = self._pending.pop(key, None)
+        if future is None or future.cancelled():
+            return self.exact.matrix(locations)
+        return future.result(timeout=timeout)
+
+
+class PrecomputedBackend(DistanceBackend):
+    """
+    Matriks yang sudah dihitung untuk sekumpulan lokasi (misalnya seluruh inventaris satu depot).
+    Permintaan untuk subset lokasi dilayani dengan np.ix_ tanpa menghitung atau mengambil ulang.
+    """
+
+    name = 'precomputed'
+
+    def __init__(self, locations, distances, durations):
+        self.distances = np.asarray(distances)
+        self.durations = np.asarray(durations)
+        self._index = {}
+        for index, (lat, lng) in enumerate(np.asarray(locations, dtype=np.float64).reshape(-1, 2).tolist()):
+            self._index.setdefault((lat, lng), index)
+
+    def indices(self, locations):
+        """Raise KeyError jika ada lokasi yang tidak ada di matriks."""
+        points = np.asarray(locations, dtype=np.float64).reshape(-1, 2).tolist()
+        return np.array([self._index[(lat, lng)] for lat, lng in points], dtype=np.int64)
+
+    def matrix(self, locations):
+        indices = self.indices(locations)
+        return self.distances[np.ix_(indices, indices)], self.durations[np.ix_(indices, indices)]
+
+    def submatrix(self, origins, destinations):
+        rows, cols = self.indices(origins), self.indices(destinations)
+        return self.distances[np.ix_(rows, cols)], self.durations[np.ix_(rows, cols)]
+
+
+# Fungsi untuk mengubah [lat, lng] dalam derajat menjadi vektor satuan 3D yang diskalakan 1/sqrt(2)
+def _unit_vectors(locations):
+    points = np.radians(np.asarray(locations, dtype=np.float64).reshape(-1, 2))
+    lat, lng = points[:, 0], points[:, 1]
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)], axis=1) * np.sqrt(0.5)
+
+
+# Fungsi untuk mengkalibrasi faktor jalan dari matriks jarak OSRM yang sudah ada
+def calibrate_road_factor(locations, road_distances):
+    """
+    Menghitung median rasio jarak jalan terhadap jarak garis lurus.
+
+    road_distances: matriks jarak OSRM N x N untuk locations (sel penalti diabaikan)
+    """
+    from optimalisasi_rute_truk_sampah import INVALID_ROUTE_PENALTY
+
+    straight = HaversineBackend(road_factor=1.0, dtype=np.float64).distance_matrix(locations)
+    road_distances = np.asarray(road_distances, dtype=np.float64)
+    valid = (straight > 1) & (road_distances < INVALID_ROUTE_PENALTY)
+    if not valid.any():
+        return DEFAULT_ROAD_FACTOR
+    return float(np.median(road_distances[valid] / straight[valid]))
+
+
+# Fungsi untuk mendapatkan backend berdasarkan nama
+def get_distance_backend(name=None):
+    name = name or DEFAULT_DISTANCE_BACKEND
+    if name == 'haversine':
+        return HaversineBackend()
+    if name == 'osrm-exact':
+        return OSRMBackend()
+    if name == 'osrm':
+        return FallbackBackend(OSRMBackend(), HaversineBackend())
+    if name == 'warm-start':
+        return _get_warm_start_backend()
+    raise ValueError(f"Backend jarak tidak dikenal: {name}")
+
+
+_warm_start_backend = None
+
+
+# Backend warm-start dipakai bersama agar matriks OSRM yang dimuat di background tidak hilang
+def _get_warm_start_backend():
+    global _warm_start_backend
+    if _warm_start_backend is None:
+        _warm_start_backend = WarmStartBackend(FallbackBackend(OSRMBackend(), HaversineBackend()), HaversineBackend())
+    return _warm_start_backend
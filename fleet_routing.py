@@ -0,0 +1,147 @@
+"""
+Mode armada: banyak truk dengan kapasitas berbeda, masing-masing bisa melakukan beberapa
+trip per hari dengan kembali ke depot (atau TPA) untuk membongkar muatan.
+
+Setiap truk dimodelkan sebagai max_trips kendaraan virtual di OR-Tools. Trip pertama berangkat
+dari depot, trip berikutnya berangkat dari tempat bongkar, dan semua trip berakhir di tempat
+bongkar. Trip ke-k hanya boleh dipakai jika trip ke-(k-1) truk yang sama juga dipakai.
+"""
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+
+from optimalisasi_rute_truk_sampah import (
+    build_search_parameters,
+    create_data_model,
+    create_distance_matrix,
+    to_integer_matrix,
+)
+from planning_jobs import watch_cancellation
+
+
+# Fungsi untuk membuat data model armada berdasarkan data model harian
+def create_fleet_data_model(current_day, vehicle_capacities, max_trips=1, landfill_location=None):
+    """
+    vehicle_capacities: list kapasitas per truk (boleh berbeda-beda)
+    max_trips: jumlah trip maksimum per truk per hari
+    landfill_location: [lat, lng] TPA tempat membongkar muatan; None berarti bongkar di depot
+    """
+    data = create_data_model(current_day)
+    data['vehicle_capacities'] = list(vehicle_capacities)
+    data['num_vehicles'] = len(vehicle_capacities)
+    data['max_trips'] = max_trips
+    data['landfill_location'] = landfill_location
+    return data
+
+
+# Fungsi untuk menghitung rute armada dengan beberapa trip per truk
+def calculate_fleet_routes(data, backend=None, solver_options=None):
+    """
+    Parameter:
+    - data: dict data model dengan vehicle_capacities, num_vehicles, dan opsional
+      max_trips (default 1) serta landfill_location (default None)
+    - backend: backend matriks jarak (lihat create_distance_matrix)
+    - solver_options: opsi pencarian (lihat build_search_parameters), misalnya
+      {'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_limit_seconds': 30}
+
+    Return:
+    - dict berisi 'vehicles' (per truk: vehicle_id, capacity, trips, trip_legs (jarak tiap leg
+      per trip), loads, distance),
+      'total_distance', 'landfill' (indeks node TPA atau None), dan 'locations',
+      atau None jika tidak ditemukan solusi.
+    """
+    max_trips = data.get('max_trips', 1)
+    capacities = data['vehicle_capacities']
+    depot = data['depot']
+
+    # TPA ditambahkan sebagai node terakhir dengan muatan 0
+    locations = list(data['locations'])
+    demands = list(data['demands'])
+    landfill = None
+    if data.get('landfill_location') is not None:
+        landfill = len(locations)
+        locations.append(data['landfill_location'])
+        demands.append(0)
+    unload_node = depot if landfill is None else landfill
+
+    distance_matrix = to_integer_matrix(create_distance_matrix(
+        {'locations': locations, 'distance_backend': data.get('distance_backend')}, backend))
+
+    # Setiap truk dipecah menjadi max_trips kendaraan virtual
+    starts, ends, virtual_capacities = [], [], []
+    for vehicle_id in range(data['num_vehicles']):
+        for trip in range(max_trips):
+            starts.append(depot if trip == 0 else unload_node)
+            ends.append(unload_node)
+            virtual_capacities.append(capacities[vehicle_id])
+
+    manager = pywrapcp.RoutingIndexManager(len(locations), len(starts), starts, ends)
+    routing = pywrapcp.RoutingModel(manager)
+
+    transit_callback_index = routing.RegisterTransitMatrix(distance_matrix.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    demand_callback_index = routing.RegisterUnaryTransitVector(np.asarray(demands, dtype=np.int64).tolist())
+    routing.AddDimensionWithVehicleCapacity(
+        demand_callback_index,
+        0,  # Tidak ada slack
+        virtual_capacities,
+        True,
+        'Capacity'
+    )
+
+    # Trip berikutnya hanya boleh dipakai jika trip sebelumnya dipakai
+    solver = routing.solver()
+    for vehicle_id in range(data['num_vehicles']):
+        for trip in range(1, max_trips):
+            virtual_id = vehicle_id * max_trips + trip
+            solver.Add(routing.ActiveVehicleVar(virtual_id) <= routing.ActiveVehicleVar(virtual_id - 1))
+
+    search_parameters = build_search_parameters(solver_options or data.get('solver_options'))
+    watch_cancellation(routing)
+    solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        return None
+
+    capacity_dimension = routing.GetDimensionOrDie('Capacity')
+    vehicles = []
+    total_distance = 0
+    for vehicle_id in range(data['num_vehicles']):
+        trips, trip_legs, loads = [], [], []
+        vehicle_distance = 0
+        for trip in range(max_trips):
+            virtual_id = vehicle_id * max_trips + trip
+            if not routing.IsVehicleUsed(solution, virtual_id):
+                continue
+            index = routing.Start(virtual_id)
+            route, legs = [], []
+            while not routing.IsEnd(index):
+                route.append(manager.IndexToNode(index))
+                previous_index = index
+                index = solution.Value(routing.NextVar(index))
+                legs.append(routing.GetArcCostForVehicle(previous_index, index, virtual_id))
+            route.append(manager.IndexToNode(index))
+            vehicle_distance += sum(legs)
+            trips.append(route)
+            trip_legs.append(legs)
+            loads.append(solution.Value(capacity_dimension.CumulVar(index)))
+
+        # Setelah trip terakhir truk kembali dari TPA ke depot
+        if trips and landfill is not None:
+            vehicle_distance += int(distance_matrix[landfill][depot])
+
+        vehicles.append({
+            'vehicle_id': vehicle_id,
+            'capacity': capacities[vehicle_id],
+            'trips': trips,
+            'trip_legs': trip_legs,
+            'loads': loads,
+            'distance': vehicle_distance,
+        })
+        total_distance += vehicle_distance
+
+    return {
+        'vehicles': vehicles,
+        'total_distance': total_distance,
+        'landfill': landfill,
+        'locations': locations,
+    }
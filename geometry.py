@@ -0,0 +1,158 @@
+"""
+Utilitas geometri polyline rute: encoding polyline ringkas, penyederhanaan Douglas-Peucker
+(termasuk per level zoom peta), dan sampling posisi di sepanjang rute berdasarkan jarak tempuh.
+
+Koordinat memakai format [lat, lng] seperti hasil get_route_coordinates.
+
+Geometri per leg disimpan (di cache dan di rencana rute) sebagai encoded polyline dengan presisi
+5 desimal, format yang sama dengan geometries=polyline di OSRM dan Google Maps. Setiap titik
+hanya butuh beberapa byte, dan saat dipakai didekode menjadi array float32.
+"""
+import math
+
+import numpy as np
+
+# Meter per derajat lintang (aproksimasi lokal, cukup untuk skala kota)
+METERS_PER_DEGREE = 111320.0
+
+# Jumlah desimal koordinat pada encoded polyline (5 desimal ~ 1 meter, sama dengan OSRM)
+POLYLINE_PRECISION = 5
+
+# Meter per piksel di ekuator pada zoom 0 untuk tile Web Mercator 256 piksel
+METERS_PER_PIXEL_ZOOM_0 = 156543.03
+
+
+# Fungsi untuk memproyeksikan [lat, lng] ke bidang datar lokal dalam meter
+def _project(points):
+    reference_lat = math.radians(float(points[:, 0].mean()))
+    return np.column_stack([
+        points[:, 1] * METERS_PER_DEGREE * math.cos(reference_lat),
+        points[:, 0] * METERS_PER_DEGREE,
+    ])
+
+
+# Fungsi untuk menyederhanakan polyline dengan algoritma Douglas-Peucker
+def simplify_polyline(coordinates, tolerance=5.0):
+    """
+    coordinates: list atau array [lat, lng]
+    tolerance: penyimpangan maksimum dari garis asli dalam meter
+
+    Return:
+    - NumPy array [lat, lng] berisi titik yang dipertahankan (titik awal dan akhir selalu ada).
+    """
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(points) <= 2 or tolerance <= 0:
+        return points
+
+    projected = _project(points)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    # Versi iteratif dengan stack agar tidak terkena batas rekursi pada polyline panjang
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = projected[end] - projected[start]
+        offsets = projected[start + 1:end] - projected[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return points[keep]
+
+
+# Fungsi untuk mengambil posisi berjarak sama di sepanjang polyline
+def sample_along(coordinates, count):
+    """
+    Mengembalikan `count` posisi [lat, lng] yang tersebar merata berdasarkan jarak tempuh,
+    dimulai dari titik awal dan diakhiri di titik akhir polyline.
+    """
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0 or count <= 0:
+        return np.empty((0, 2))
+    if len(points) == 1 or count == 1:
+        return points[:1].repeat(count, axis=0)
+
+    projected = _project(points)
+    travelled = np.concatenate([[0], np.cumsum(np.hypot(*np.diff(projected, axis=0).T))])
+    if travelled[-1] == 0:
+        return points[:1].repeat(count, axis=0)
+    targets = np.linspace(0, travelled[-1], count)
+    return np.column_stack([
+        np.interp(targets, travelled, points[:, 0]),
+        np.interp(targets, travelled, points[:, 1]),
+    ])
+
+
+# Fungsi untuk mengubah list/array [lat, lng] menjadi encoded polyline
+def encode_polyline(coordinates, precision=POLYLINE_PRECISION):
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return ''
+    scaled = np.rint(points * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=[[0, 0]]).ravel()
+    # Zigzag: bilangan negatif dipetakan ke bilangan ganjil
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    chunks = []
+    for value in values.tolist():
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+# Fungsi untuk mengubah encoded polyline menjadi array [lat, lng]
+def decode_polyline(encoded, precision=POLYLINE_PRECISION, dtype=np.float32):
+    """
+    Return:
+    - NumPy array berukuran N x 2 ([lat, lng]) dengan tipe dtype. float32 cukup untuk presisi
+      polyline (~1 meter) dengan separuh memori float64.
+    """
+    values = []
+    value = shift = 0
+    for byte in encoded.encode('ascii'):
+        byte -= 63
+        value |= (byte & 0x1f) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    deltas = np.asarray(values, dtype=np.int64).reshape(-1, 2)
+    return (np.cumsum(deltas, axis=0) / 10 ** precision).astype(dtype)
+
+
+# Fungsi untuk mengubah satu leg (encoded polyline atau list koordinat) menjadi array [lat, lng]
+def leg_coordinates(leg):
+    if isinstance(leg, str):
+        return decode_polyline(leg)
+    return np.asarray(leg, dtype=np.float64).reshape(-1, 2)
+
+
+# Fungsi untuk menghitung toleransi penyederhanaan yang tidak terlihat pada level zoom tertentu
+def tolerance_for_zoom(zoom, latitude=0.0, pixels=0.5):
+    """
+    Return:
+    - toleransi dalam meter yang setara dengan `pixels` piksel layar pada level zoom tersebut.
+    """
+    meters_per_pixel = METERS_PER_PIXEL_ZOOM_0 * math.cos(math.radians(latitude)) / 2 ** zoom
+    return meters_per_pixel * pixels
+
+
+# Fungsi untuk menyederhanakan polyline sesuai level zoom peta
+def simplify_for_zoom(coordinates, zoom, pixels=0.5):
+    points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return points
+    return simplify_polyline(points, tolerance_for_zoom(zoom, float(points[:, 0].mean()), pixels))
@@ -0,0 +1,177 @@
+"""
+Re-optimasi inkremental untuk perubahan di tengah hari.
+
+IncrementalPlanner menyimpan data model, matriks jarak, dan solusi terakhir. Ketika tempat
+sampah ditambahkan, hanya baris dan kolom baru yang diambil dari backend jarak. Tempat sampah
+bisa dihapus permanen atau dilewati sementara, dan volume bisa diperbarui dari sensor.
+Perencanaan ulang dimulai dari solusi sebelumnya (ReadAssignmentFromRoutes +
+SolveFromAssignmentWithParameters) sehingga hanya perlu pencarian lokal singkat.
+"""
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+
+from distance_backend import get_distance_backend
+from optimalisasi_rute_truk_sampah import build_search_parameters, to_integer_matrix
+
+
+class IncrementalPlanner:
+    """
+    Perencana rute yang mempertahankan matriks dan solusi antar perubahan.
+
+    Indeks node mengikuti urutan data['locations']; depot tetap di data['depot'].
+    """
+
+    def __init__(self, data, backend=None, solver_options=None):
+        """
+        data: dict data model (locations, demands, vehicle_capacities, num_vehicles, depot)
+        backend: backend matriks jarak (objek atau nama, lihat get_distance_backend)
+        solver_options: opsi pencarian (lihat build_search_parameters)
+        """
+        if backend is None or isinstance(backend, str):
+            backend = get_distance_backend(backend or data.get('distance_backend'))
+        self.backend = backend
+        self.solver_options = solver_options or data.get('solver_options')
+        self.locations = [list(location) for location in data['locations']]
+        self.demands = list(data['demands'])
+        self.pickup_schedule = list(data.get('pickup_schedule', [0] * len(self.locations)))
+        self.vehicle_capacities = list(data['vehicle_capacities'])
+        self.num_vehicles = data['num_vehicles']
+        self.depot = data['depot']
+        self.active = np.ones(len(self.locations), dtype=bool)
+        self.distances = np.asarray(self.backend.matrix(self.locations)[0], dtype=np.float64)
+        self.routes = None  # Rute per kendaraan berisi indeks node global, tanpa depot
+        self.total_distance = 0
+
+    def add_bin(self, location, demand, schedule=0):
+        """
+        Menambahkan tempat sampah baru. Matriks diperluas dengan satu baris dan satu kolom
+        tanpa menghitung ulang pasangan lama.
+
+        Return:
+        - indeks node tempat sampah baru.
+        """
+        row, _ = self.backend.submatrix([location], self.locations)
+        column, _ = self.backend.submatrix(self.locations, [location])
+        n = len(self.locations)
+        distances = np.empty((n + 1, n + 1), dtype=np.float64)
+        distances[:n, :n] = self.distances
+        distances[n, :n] = row[0]
+        distances[:n, n] = column[:, 0]
+        distances[n, n] = 0
+        self.distances = distances
+
+        self.locations.append(list(location))
+        self.demands.append(demand)
+        self.pickup_schedule.append(schedule)
+        self.active = np.append(self.active, True)
+        return n
+
+    def remove_bin(self, node):
+        """Menghapus tempat sampah secara permanen; indeks node setelahnya bergeser satu."""
+        if node == self.depot:
+            raise ValueError("Depot tidak bisa dihapus")
+        self.distances = np.delete(np.delete(self.distances, node, axis=0), node, axis=1)
+        del self.locations[node]
+        del self.demands[node]
+        del self.pickup_schedule[node]
+        self.active = np.delete(self.active, node)
+        if self.depot > node:
+            self.depot -= 1
+        if self.routes is not None:
+            self.routes = [[stop - (stop > node) for stop in route if stop != node] for route in self.routes]
+
+    def skip_bin(self, node, skipped=True):
+        """Melewati (atau mengaktifkan kembali) tempat sampah tanpa menghapusnya dari matriks."""
+        if node == self.depot:
+            raise ValueError("Depot tidak bisa dilewati")
+        self.active[node] = not skipped
+
+    def update_demand(self, node, demand):
+        self.demands[node] = demand
+
+    def _initial_routes(self, active_nodes, distances):
+        """
+        Rute awal untuk warm start: rute sebelumnya tanpa node yang tidak aktif, lalu node
+        aktif yang belum terlayani disisipkan di posisi termurah (cheapest insertion).
+        """
+        active_set = set(active_nodes)
+        routes = [[stop for stop in route if stop in active_set] for route in self.routes]
+        served = {stop for route in routes for stop in route}
+        for node in active_nodes:
+            if node == self.depot or node in served:
+                continue
+            best = None
+            for vehicle_id, route in enumerate(routes):
+                path = [self.depot] + route + [self.depot]
+                for position in range(1, len(path)):
+                    a, b = path[position - 1], path[position]
+                    cost = distances[a, node] + distances[node, b] - distances[a, b]
+                    if best is None or cost < best[0]:
+                        best = (cost, vehicle_id, position - 1)
+            _, vehicle_id, position = best
+            routes[vehicle_id].insert(position, node)
+        return routes
+
+    def plan(self, solver_options=None):
+        """
+        Menghitung (ulang) rute untuk tempat sampah yang aktif.
+
+        Return:
+        - (route, total_distance) dengan format yang sama seperti calculate_route:
+          route berisi indeks node global yang dilalui semua kendaraan berurutan.
+        """
+        active_nodes = [node for node in np.flatnonzero(self.active) if node != self.depot]
+        active_nodes = [self.depot] + [int(node) for node in active_nodes]
+        model_index = {node: index for index, node in enumerate(active_nodes)}
+
+        distance_matrix = to_integer_matrix(self.distances[np.ix_(active_nodes, active_nodes)])
+        manager = pywrapcp.RoutingIndexManager(len(active_nodes), self.num_vehicles, 0)
+        routing = pywrapcp.RoutingModel(manager)
+
+        transit_callback_index = routing.RegisterTransitMatrix(distance_matrix.tolist())
+        routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+        demand_callback_index = routing.RegisterUnaryTransitVector(
+            [int(self.demands[node]) for node in active_nodes])
+        routing.AddDimensionWithVehicleCapacity(
+            demand_callback_index,
+            0,  # Tidak ada slack
+            self.vehicle_capacities,
+            True,
+            'Capacity'
+        )
+
+        search_parameters = build_search_parameters(solver_options or self.solver_options)
+        solution = None
+        if self.routes is not None:
+            initial_routes = [[model_index[stop] for stop in route]
+                              for route in self._initial_routes(active_nodes, self.distances)]
+            routing.CloseModelWithParameters(search_parameters)
+            initial_assignment = routing.ReadAssignmentFromRoutes(initial_routes, True)
+            if initial_assignment is not None:
+                solution = routing.SolveFromAssignmentWithParameters(initial_assignment, search_parameters)
+        if solution is None:
+            # Tanpa solusi sebelumnya (atau rute awal melanggar kapasitas): solve dari awal
+            solution = routing.SolveWithParameters(search_parameters)
+        if not solution:
+            return None, 0
+
+        routes = []
+        route = []
+        total_distance = 0
+        for vehicle_id in range(self.num_vehicles):
+            index = routing.Start(vehicle_id)
+            vehicle_route = []
+            while not routing.IsEnd(index):
+                node = active_nodes[manager.IndexToNode(index)]
+                route.append(node)
+                if node != self.depot:
+                    vehicle_route.append(node)
+                previous_index = index
+                index = solution.Value(routing.NextVar(index))
+                total_distance += routing.GetArcCostForVehicle(previous_index, index, vehicle_id)
+            route.append(active_nodes[manager.IndexToNode(index)])
+            routes.append(vehicle_route)
+
+        self.routes = routes
+        self.total_distance = total_distance
+        return route, total_distance
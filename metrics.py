@@ -0,0 +1,188 @@
+"""
+Instrumentasi ringan untuk pipeline perencanaan: timing span, counter, dan gauge.
+
+- span(name, **labels): context manager yang mencatat durasi sebuah tahap. Atribut tambahan
+  (misalnya statistik solver) bisa diisi lewat span.set(...) atau current_span().set(...).
+  Span terakhir disimpan di recent_spans() sebagai data terstruktur.
+- traced(name): decorator yang menjalankan seluruh fungsi di dalam sebuah span.
+- increment(name, value, **labels) dan set_gauge(name, value, **labels) untuk counter dan gauge.
+- render_prometheus() menghasilkan format teks Prometheus, disajikan oleh register_metrics_route
+  di route /metrics server Flask milik Dash.
+
+Mode profil: jika environment variable PROFILE_DIR diisi, span yang dibuat dengan profile=True
+(tahap utama pipeline) dijalankan di bawah cProfile dan hasilnya ditulis ke
+PROFILE_DIR/<nama span>-<waktu>.prof (bisa dibuka dengan pstats atau snakeviz).
+"""
+import cProfile
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+RECENT_SPANS = int(os.environ.get('METRICS_RECENT_SPANS', 200))
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_summaries = {}  # (nama span, labels) -> [count, sum, max]
+_recent_spans = deque(maxlen=RECENT_SPANS)
+_local = threading.local()
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def increment(name, value=1, **labels):
+    with _lock:
+        key = (name, _label_key(labels))
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[(name, _label_key(labels))] = value
+
+
+class Span:
+    """Satu pengukuran tahap pipeline; atribut diisi selama span berjalan."""
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.attributes = {}
+        self.start = time.time()
+        self.duration = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def as_dict(self):
+        return {'name': self.name, 'start': self.start, 'duration': self.duration,
+                **self.labels, **self.attributes}
+
+
+@contextmanager
+def span(name, profile=False, **labels):
+    """
+    Mencatat durasi blok kode sebagai summary planner_span_seconds{span=name, ...labels}.
+    Label sebaiknya bernilai sedikit (misalnya nama backend); nilai lain diisi lewat set().
+
+    profile: jika True dan PROFILE_DIR diisi, span ini diprofil dengan cProfile
+             (hanya jika bukan bagian dari span lain yang sedang diprofil di thread yang sama)
+    """
+    current = Span(name, labels)
+    stack = _local.__dict__.setdefault('stack', [])
+    stack.append(current)
+    depth = getattr(_local, 'profile_depth', 0)
+    profiler = cProfile.Profile() if profile and PROFILE_DIR and depth == 0 else None
+    _local.profile_depth = depth + bool(profiler)
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield current
+    finally:
+        if profiler:
+            profiler.disable()
+        current.duration = time.perf_counter() - start
+        _local.profile_depth = depth
+        stack.pop()
+        with _lock:
+            key = (name, _label_key(labels))
+            summary = _summaries.setdefault(key, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += current.duration
+            summary[2] = max(summary[2], current.duration)
+            _recent_spans.append(current.as_dict())
+        if profiler:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            filename = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{id(current):x}.prof"
+            profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+
+
+# Decorator untuk menjalankan fungsi di dalam span
+def traced(name, profile=False, **labels):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name, profile=profile, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _NoSpan:
+    def set(self, **attributes):
+        pass
+
+
+# Fungsi untuk mengambil span terdalam yang sedang berjalan di thread ini
+def current_span():
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else _NoSpan()
+
+
+# Fungsi untuk mengambil span terakhir yang tercatat (terbaru di akhir)
+def recent_spans(name=None):
+    with _lock:
+        return [item for item in _recent_spans if name is None or item['name'] == name]
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
+        _recent_spans.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(items):
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+# Fungsi untuk menghasilkan semua metrik dalam format teks Prometheus
+def render_prometheus():
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        summaries = {key: list(value) for key, value in _summaries.items()}
+
+    lines = []
+    for metric_type, values in (('counter', counters), ('gauge', gauges)):
+        for name in sorted({name for name, _ in values}):
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric_name, label_key), value in sorted(values.items()):
+                if metric_name == name:
+                    lines.append(f"{name}{_format_labels(label_key)} {value}")
+
+    if summaries:
+        lines.append("# TYPE planner_span_seconds summary")
+        for (name, label_key), (count, total, _) in sorted(summaries.items()):
+            labels = _format_labels((('span', name),) + label_key)
+            lines.append(f"planner_span_seconds_count{labels} {count}")
+            lines.append(f"planner_span_seconds_sum{labels} {total:.6f}")
+        lines.append("# TYPE planner_span_seconds_max gauge")
+        for (name, label_key), (_, _, maximum) in sorted(summaries.items()):
+            labels = _format_labels((('span', name),) + label_key)
+            lines.append(f"planner_span_seconds_max{labels} {maximum:.6f}")
+    return '\n'.join(lines) + '\n'
+
+
+# Fungsi untuk menambahkan route /metrics ke server Flask (misalnya app.server milik Dash)
+def register_metrics_route(server, path='/metrics'):
+    from flask import Response
+
+    def metrics_endpoint():
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    server.add_url_rule(path, 'metrics', metrics_endpoint)
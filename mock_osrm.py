@@ -0,0 +1,153 @@
+"""
+Server OSRM tiruan untuk pengujian lokal.
+
+Server ini menjawab endpoint /route dan /table dengan format yang sama seperti OSRM,
+menggunakan jarak haversine yang dikalikan faktor jalan. Dipakai agar pembuatan matriks
+jarak dan benchmark bisa dijalankan tanpa akses ke server OSRM publik.
+
+Untuk menguji retry, server.failures diisi jumlah request berikutnya yang dijawab dengan
+status server.failure_status (default 503).
+
+Contoh:
+    python mock_osrm.py --port 5000
+    OSRM_BASE_URL=http://127.0.0.1:5000 python optimalisasi_rute_truk_sampah.py
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from geometry import encode_polyline
+
+EARTH_RADIUS_M = 6371000.0
+ROAD_FACTOR = 1.3
+SPEED_MPS = 30 / 3.6  # Kecepatan rata-rata truk 30 km/jam
+
+
+# Fungsi untuk menghitung jarak haversine antara dua titik (lng, lat) dalam meter
+def haversine(origin, destination):
+    lng1, lat1 = map(math.radians, origin)
+    lng2, lat2 = map(math.radians, destination)
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+class MockOSRMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self._send_json(self.server.failure_status, {'code': 'TooBusy', 'message': 'Simulated failure'})
+            return
+
+        parsed = urlsplit(self.path)
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) != 4:
+            self._send_json(400, {'code': 'InvalidUrl', 'message': parsed.path})
+            return
+
+        service, _, _, coordinate_text = parts
+        try:
+            coordinates = [tuple(map(float, pair.split(','))) for pair in coordinate_text.split(';')]
+        except ValueError:
+            self._send_json(400, {'code': 'InvalidQuery', 'message': coordinate_text})
+            return
+        query = parse_qs(parsed.query)
+
+        if service == 'route':
+            self._send_json(200, self._route(coordinates, query))
+        elif service == 'table':
+            self._send_json(200, self._table(coordinates, query))
+        else:
+            self._send_json(400, {'code': 'InvalidService', 'message': service})
+
+    def _route(self, coordinates, query):
+        origin, destination = coordinates[0], coordinates[-1]
+        distance = haversine(origin, destination) * ROAD_FACTOR
+        route = {'distance': distance, 'duration': distance / SPEED_MPS}
+        if query.get('overview', ['simplified'])[0] != 'false':
+            # Geometri garis lurus yang dipecah menjadi beberapa titik agar mirip polyline jalan
+            steps = self.server.geometry_points
+            coordinates = [
+                [origin[0] + (destination[0] - origin[0]) * k / steps,
+                 origin[1] + (destination[1] - origin[1]) * k / steps]
+                for k in range(steps + 1)
+            ]
+            if query.get('geometries', ['polyline'])[0] == 'geojson':
+                route['geometry'] = {'type': 'LineString', 'coordinates': coordinates}
+            else:
+                # Default OSRM: encoded polyline dengan urutan [lat, lng]
+                route['geometry'] = encode_polyline([[lat, lng] for lng, lat in coordinates])
+        return {'code': 'Ok', 'routes': [route]}
+
+    def _table(self, coordinates, query):
+        def indices(name):
+            values = query.get(name, ['all'])[0]
+            if values == 'all':
+                return list(range(len(coordinates)))
+            return [int(value) for value in values.split(';')]
+
+        sources = indices('sources')
+        destinations = indices('destinations')
+        distances = [[haversine(coordinates[i], coordinates[j]) * ROAD_FACTOR for j in destinations]
+                     for i in sources]
+        durations = [[distance / SPEED_MPS for distance in row] for row in distances]
+        return {'code': 'Ok', 'distances': distances, 'durations': durations}
+
+
+# Fungsi untuk membuat server OSRM tiruan
+def create_mock_osrm(host='127.0.0.1', port=0, latency=0.0, geometry_points=20):
+    server = ThreadingHTTPServer((host, port), MockOSRMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.geometry_points = geometry_points
+    server.request_count = 0
+    server.failures = 0
+    server.failure_status = 503
+    return server
+
+
+# Fungsi untuk menjalankan server OSRM tiruan di thread terpisah
+def start_mock_osrm(host='127.0.0.1', port=0, latency=0.0, geometry_points=20):
+    """
+    Menjalankan server tiruan di background.
+
+    Return:
+    - (server, base_url): objek server (panggil server.shutdown() untuk berhenti)
+      dan URL yang bisa dipakai sebagai OSRM_BASE_URL.
+    """
+    server = create_mock_osrm(host, port, latency, geometry_points)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Server OSRM tiruan untuk pengujian lokal')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Jeda per request dalam detik')
+    args = parser.parse_args()
+
+    server = create_mock_osrm(args.host, args.port, args.latency)
+    print(f"Mock OSRM berjalan di http://{args.host}:{args.port}")
+    server.serve_forever()
@@ -1,56 +1,88 @@
 from ortools.constraint_solver import pywrapcp, routing_enums_pb2
-import requests
 import folium
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
 from datetime import datetime
-import random
+import os
+import numpy as np
 
-# Fungsi untuk mengambil rute menggunakan OSRM API
-def get_route(origin, destination):
-    base_url = "http://router.project-osrm.org/route/v1/driving/"
-    url = f"{base_url}{origin};{destination}?overview=false"
+from bin_inventory import day_selection, filter_inventory_by_day, schedule_to_mask
+from demand_provider import ReplayDemandProvider, SyntheticDemandProvider, get_demand_provider
+from metrics import current_span, increment, set_gauge, traced
+from distance_backend import get_distance_backend
+from geometry import POLYLINE_PRECISION, decode_polyline, leg_coordinates, simplify_for_zoom
+from osrm_client import OSRMError, get_osrm_client
+from planning_jobs import watch_cancellation
+from route_cache import LEG_KIND, POLYLINE_KIND, get_route_cache
+from volume_model import train_volume_model
 
-    response = requests.get(url)
+# Jumlah koordinat maksimum per request /table (server publik OSRM membatasi ukuran tabel)
+TABLE_CHUNK_SIZE = int(os.environ.get('OSRM_TABLE_CHUNK_SIZE', 100))
 
-    if response.status_code == 200:
-        route_info = response.json()
-        distance = route_info['routes'][0]['distance']  # Dalam meter
-        return distance
-    else:
-        print(f"Error: {response.status_code}, {response.text}")
+# Level zoom terdekat yang tetap akurat pada peta statis (lihat build_route_map)
+STATIC_MAP_MAX_ZOOM = int(os.environ.get('STATIC_MAP_MAX_ZOOM', 17))
+
+# Nilai penalti untuk pasangan lokasi yang tidak memiliki rute valid
+INVALID_ROUTE_PENALTY = 1e6
+
+# Batas waktu default (detik) ketika metaheuristik dipakai tanpa batas waktu/solusi,
+# karena metaheuristik OR-Tools akan terus mencari sampai dihentikan
+DEFAULT_METAHEURISTIC_TIME_LIMIT = 30
+
+# Fungsi untuk mengubah lokasi [lat, lng] menjadi string "lng,lat" yang dipakai OSRM
+def format_coordinate(location):
+    return f"{location[1]},{location[0]}"
+
+# Fungsi untuk mengambil rute menggunakan OSRM API
+def get_route(origin, destination):
+    client = get_osrm_client()
+    cache = get_route_cache()
+    cache_key = cache.make_key(LEG_KIND, origin, destination, client.profile)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached['distance']
+
+    try:
+        route_info = client.route(origin, destination)
+    except OSRMError as error:
+        print(f"Error: {error}")
         return float('inf')  # Mengembalikan nilai tak terhingga jika ada kesalahan
 
+    distance = route_info['distance']  # Dalam meter
+    cache.set(cache_key, {'distance': distance, 'duration': route_info['duration']})
+    return distance
+
 # Fungsi untuk menghasilkan volume sampah berdasarkan hari
-def get_daily_demands(day):
+def get_daily_demands(day, demand_provider=None):
     """
     Fungsi ini menghasilkan volume sampah berdasarkan hari dalam seminggu.
     Hari Senin (day=0) lebih penuh, dan akhir pekan (day=5, 6) lebih ringan.
+    Volume berasal dari demand_provider (default: provider sintetis dengan seed tetap),
+    sehingga hari yang sama selalu menghasilkan volume yang sama.
     
     day: Integer yang merepresentasikan hari dalam seminggu (0: Senin, 1: Selasa, ..., 6: Minggu)
+    demand_provider: objek DemandProvider, default get_demand_provider()
     
     Return:
     - List demands yang berisi volume sampah per lokasi.
     """
-    if day == 0:  # Senin, volume sampah lebih tinggi
-        demands = [random.randint(5, 10) for _ in range(7)]  # Volume sampah lebih banyak
-    elif day == 5 or day == 6:  # Sabtu dan Minggu, volume sampah lebih rendah
-        demands = [random.randint(1, 3) for _ in range(7)]  # Volume sampah lebih sedikit
-    else:  # Hari biasa, volume sampah sedang
-        demands = [random.randint(2, 5) for _ in range(7)]
-    
-    demands.insert(0, 0)  # Tambahkan 0 untuk depot (lokasi awal truk)
-    return demands
+    demand_provider = demand_provider or get_demand_provider()
+    return demand_provider.daily_demands(day)  # Indeks 0 adalah depot (lokasi awal truk) dengan volume 0
 
 # Fungsi untuk membuat data model
-def create_data_model(current_day):
+def create_data_model(current_day, demand_provider=None, inventory=None):
     """
     Fungsi untuk membuat data model untuk routing. 
     Sekarang menambahkan variasi volume sampah berdasarkan hari.
     
     current_day: Hari saat ini (0: Senin, 1: Selasa, dst.)
+    demand_provider: sumber volume sampah (lihat get_daily_demands), misalnya
+                     volume_model.PredictedDemandProvider untuk volume hasil prediksi
+    inventory: inventaris kolumnar (lihat bin_inventory), baris pertama adalah depot.
+               Jika kosong, memakai 7 lokasi contoh di Jakarta.
     """
+    if inventory is not None:
+        return data_model_from_inventory(inventory, current_day, demand_provider)
+
     data = {}
     data['locations'] = [
         [-6.2088, 106.8456],  # Depot (lokasi awal truk) di Jakarta
@@ -64,7 +96,7 @@ def create_data_model(current_day):
     ]
 
     # Panggil get_daily_demands untuk mendapatkan demands berdasarkan hari
-    data['demands'] = get_daily_demands(current_day)
+    data['demands'] = get_daily_demands(current_day, demand_provider)
     
     data['vehicle_capacities'] = [25]  # Kapasitas truk
     data['num_vehicles'] = 1
@@ -72,53 +104,233 @@ def create_data_model(current_day):
 
     # Menambahkan informasi jadwal (hari) untuk setiap lokasi
     data['pickup_schedule'] = [0, 1, 2, 0, 1, 2, 0, 1]  # Jadwal pengambilan sampah per lokasi
+    data['schedule_mask'] = schedule_to_mask(data['pickup_schedule']).tolist()  # Bitmask hari pengambilan
     
     return data
 
+# Fungsi untuk membuat data model dari inventaris kolumnar
+def data_model_from_inventory(inventory, current_day, demand_provider=None):
+    """
+    Membuat data model dari NumPy structured array (lihat bin_inventory.BIN_DTYPE).
+    Volume sampah default berasal dari provider sintetis dengan jumlah tempat sampah yang sesuai.
+
+    Jadwal hanya tersedia sebagai schedule_mask (tanpa pickup_schedule format lama). Inventaris
+    ikut disimpan di data['inventory'] agar filter_locations_by_day bisa memakai InventoryView.
+    """
+    if demand_provider is None and get_demand_provider().num_bins != len(inventory) - 1:
+        demand_provider = SyntheticDemandProvider(num_bins=len(inventory) - 1)
+
+    data = {}
+    data['locations'] = np.column_stack([inventory['lat'], inventory['lng']]).tolist()
+    data['demands'] = get_daily_demands(current_day, demand_provider)
+    data['vehicle_capacities'] = [25]  # Kapasitas truk
+    data['num_vehicles'] = 1
+    data['depot'] = 0
+    data['schedule_mask'] = inventory['schedule_mask'].tolist()
+    data['inventory'] = inventory
+    return data
+
+
+# Fungsi untuk mengambil sebagian tabel jarak dan durasi dari OSRM Table API
+def get_table(coordinates, sources, destinations):
+    """
+    Mengambil blok matriks jarak (meter) dan durasi (detik) dari endpoint /table OSRM.
+
+    coordinates: list string "lng,lat" yang dikirim dalam satu request
+    sources: indeks (di dalam coordinates) yang menjadi titik asal
+    destinations: indeks (di dalam coordinates) yang menjadi titik tujuan
 
-# Fungsi untuk membuat matriks jarak menggunakan OSRM API
-def create_distance_matrix(data):
-    distances = {}
-    for from_counter, from_node in enumerate(data['locations']):
-        distances[from_counter] = {}
-        for to_counter, to_node in enumerate(data['locations']):
-            if from_counter == to_counter:
-                distances[from_counter][to_counter] = 0
+    Return:
+    - (distances, durations) berupa list of list, atau (None, None) jika request gagal.
+      Sel yang tidak memiliki rute bernilai None.
+    """
+    try:
+        return get_osrm_client().table(coordinates, sources, destinations)
+    except OSRMError as error:
+        print(f"Error: {error}")
+        return None, None
+
+# Fungsi untuk membuat matriks jarak dan durasi menggunakan OSRM Table API
+def create_distance_duration_matrix(data, chunk_size=TABLE_CHUNK_SIZE):
+    """
+    Membangun matriks jarak dan durasi N x N dengan request /table yang dipotong per blok.
+
+    Lokasi dibagi menjadi blok berisi maksimal chunk_size // 2 titik, lalu setiap pasangan
+    (blok asal, blok tujuan) diambil dengan satu request, sehingga jumlah request
+    bergantung pada jumlah blok, bukan N^2. Blok yang seluruh pasangannya sudah ada di
+    cache rute tidak dikirim ke OSRM sama sekali.
+
+    Return:
+    - (distances, durations): dua NumPy array float64 berukuran N x N.
+      Pasangan tanpa rute valid diisi INVALID_ROUTE_PENALTY.
+    """
+    distances, durations = create_distance_duration_submatrix(data['locations'], data['locations'], chunk_size)
+    np.fill_diagonal(distances, 0)
+    np.fill_diagonal(durations, 0)
+    return distances, durations
+
+# Fungsi untuk membuat matriks jarak dan durasi dari sekumpulan lokasi asal ke lokasi tujuan
+def create_distance_duration_submatrix(source_locations, destination_locations, chunk_size=TABLE_CHUNK_SIZE):
+    """
+    Sama seperti create_distance_duration_matrix, tetapi untuk matriks persegi panjang
+    (misalnya satu baris dan satu kolom baru ketika tempat sampah ditambahkan).
+
+    Return:
+    - (distances, durations): NumPy array float64 berukuran len(source_locations) x len(destination_locations).
+    """
+    same_locations = source_locations is destination_locations
+    source_coordinates = [format_coordinate(location) for location in source_locations]
+    destination_coordinates = (source_coordinates if same_locations
+                               else [format_coordinate(location) for location in destination_locations])
+    distances = np.full((len(source_coordinates), len(destination_coordinates)), INVALID_ROUTE_PENALTY, dtype=np.float64)
+    durations = np.full_like(distances, INVALID_ROUTE_PENALTY)
+
+    client = get_osrm_client()
+    cache = get_route_cache()
+    block_size = max(1, chunk_size // 2)
+
+    def make_blocks(n):
+        return [list(range(start, min(start + block_size, n))) for start in range(0, n, block_size)]
+
+    source_blocks = make_blocks(len(source_coordinates))
+    destination_blocks = source_blocks if same_locations else make_blocks(len(destination_coordinates))
+
+    # Blok yang belum lengkap di cache dikumpulkan lalu diambil paralel lewat klien OSRM
+    pending_blocks = []
+    for source_block in source_blocks:
+        for destination_block in destination_blocks:
+            cache_keys = [cache.make_key(LEG_KIND, source_coordinates[i], destination_coordinates[j], client.profile)
+                          for i in source_block for j in destination_block]
+            cached = cache.get_many(cache_keys)
+            if len(cached) == len(cache_keys):
+                legs = [cached[key] for key in cache_keys]
+                block_distances = np.array([leg['distance'] for leg in legs]).reshape(len(source_block), -1)
+                block_durations = np.array([leg['duration'] for leg in legs]).reshape(len(source_block), -1)
+                distances[np.ix_(source_block, destination_block)] = block_distances
+                durations[np.ix_(source_block, destination_block)] = block_durations
             else:
-                origin = f"{from_node[1]},{from_node[0]}"  # OSRM expects [lng, lat]
-                destination = f"{to_node[1]},{to_node[0]}"  # OSRM expects [lng, lat]
-                
-                # Handle cases where the OSRM API fails or returns invalid routes
-                distance = get_route(origin, destination)
-                if distance == float('inf'):  # When route is invalid
-                    print(f"Warning: No valid route found from {origin} to {destination}")
-                distances[from_counter][to_counter] = distance if distance != float('inf') else 1e6  # Penalize with large distance if invalid
+                pending_blocks.append((source_block, destination_block, cache_keys))
+
+    def fetch_block(block):
+        source_block, destination_block, _ = block
+        if source_block is destination_block:
+            block_coordinates = [source_coordinates[node] for node in source_block]
+            sources = destinations = list(range(len(source_block)))
+        else:
+            block_coordinates = ([source_coordinates[node] for node in source_block]
+                                 + [destination_coordinates[node] for node in destination_block])
+            sources = list(range(len(source_block)))
+            destinations = list(range(len(source_block), len(block_coordinates)))
+        return get_table(block_coordinates, sources, destinations)
+
+    for (source_block, destination_block, cache_keys), (table_distances, table_durations) in zip(
+            pending_blocks, client.map(fetch_block, pending_blocks)):
+        if table_distances is None:
+            print(f"Warning: Gagal mengambil blok tabel {source_block[0]}-{source_block[-1]} "
+                  f"ke {destination_block[0]}-{destination_block[-1]}")
+            continue
+        # Hanya pasangan dengan rute valid yang disimpan ke cache
+        cache.set_many({
+            key: {'distance': distance, 'duration': duration}
+            for key, distance, duration in zip(
+                cache_keys,
+                (value for row in table_distances for value in row),
+                (value for row in table_durations for value in row))
+            if distance is not None and duration is not None
+        })
+
+        # None dari OSRM (tidak ada rute) menjadi NaN lalu diganti penalti
+        block_distances = np.array(table_distances, dtype=np.float64)
+        block_durations = np.array(table_durations, dtype=np.float64)
+        distances[np.ix_(source_block, destination_block)] = np.where(
+            np.isnan(block_distances), INVALID_ROUTE_PENALTY, block_distances)
+        durations[np.ix_(source_block, destination_block)] = np.where(
+            np.isnan(block_durations), INVALID_ROUTE_PENALTY, block_durations)
+
+    return distances, durations
+
+# Fungsi untuk membuat matriks jarak menggunakan backend jarak (default: OSRM dengan cadangan haversine)
+@traced('create_distance_matrix', profile=True)
+def create_distance_matrix(data, backend=None):
+    """
+    backend: objek DistanceBackend atau nama backend ('osrm', 'osrm-exact', 'haversine',
+             'warm-start'). Jika kosong, memakai data['distance_backend'] atau DISTANCE_BACKEND.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend or data.get('distance_backend'))
+    distances, _ = backend.matrix(data['locations'])
+    invalid_routes = int(np.count_nonzero(distances >= INVALID_ROUTE_PENALTY))
+    current_span().set(backend=backend.name, locations=len(distances), invalid_routes=invalid_routes)
+    if invalid_routes:
+        print(f"Warning: {invalid_routes} pasangan lokasi tidak memiliki rute valid")
     return distances
 
 
+# Fungsi untuk mendapatkan geometri rute dari OSRM API sebagai encoded polyline
+@traced('get_route_geometry')
+def get_route_geometry(origin, destination):
+    """
+    Return:
+    - encoded polyline [lat, lng] (lihat geometry.decode_polyline), string kosong jika gagal.
+    """
+    client = get_osrm_client()
+    cache = get_route_cache()
+    cache_key = cache.make_key(POLYLINE_KIND, origin, destination, client.profile)
+    cached = cache.get(cache_key)
+    current_span().set(cached=cached is not None)
+    if cached is not None:
+        return cached
+
+    try:
+        route_info = client.route(origin, destination, overview='full', geometries='polyline')
+    except OSRMError as error:
+        print(f"Error: {error}")
+        return ''
+
+    # Disimpan apa adanya: polyline dari OSRM sudah berurutan [lat, lng] dan jauh lebih ringkas dari JSON
+    encoded = route_info['geometry']
+    cache.set(cache_key, encoded)
+    return encoded
+
 # Fungsi untuk mendapatkan koordinat rute dari OSRM API
 def get_route_coordinates(origin, destination):
-    base_url = "http://router.project-osrm.org/route/v1/driving/"
-    url = f"{base_url}{origin};{destination}?overview=full&geometries=geojson"
-
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        route_info = response.json()
-        if 'routes' in route_info and len(route_info['routes']) > 0:
-            coordinates = route_info['routes'][0]['geometry']['coordinates']
-            # Format koordinat dari [lng, lat] ke [lat, lng] agar sesuai dengan Folium
-            route_coordinates = [[coord[1], coord[0]] for coord in coordinates]
-            return route_coordinates
-        else:
-            print(f"No routes found for origin {origin} and destination {destination}.")
-            return []
-    else:
-        print(f"Error: {response.status_code}, {response.text}")
-        return []
+    """
+    Return:
+    - List koordinat [lat, lng] sepanjang rute, list kosong jika gagal.
+      Untuk array NumPy, pakai geometry.decode_polyline(get_route_geometry(...)).
+    """
+    return decode_polyline(get_route_geometry(origin, destination), dtype=np.float64).tolist()
 
-# Fungsi visualisasi rute di peta menggunakan Folium
-def visualize_route(locations, route, total_distance):
+# Fungsi untuk mengambil geometri semua leg rute secara paralel
+def get_route_legs_geometry(locations, route):
+    """
+    Mengambil geometri setiap leg (route[i] -> route[i + 1]) lewat klien OSRM bersama.
+
+    Return:
+    - List encoded polyline per leg, urut sesuai rute. Leg yang gagal diambil berupa string kosong.
+    """
+    legs = [(format_coordinate(locations[route[i]]), format_coordinate(locations[route[i + 1]]))
+            for i in range(len(route) - 1)]
+    return get_osrm_client().map(lambda leg: get_route_geometry(*leg), legs)
+
+# Fungsi untuk mengambil koordinat semua leg rute secara paralel
+def get_route_legs_coordinates(locations, route):
+    """
+    Return:
+    - List berisi list koordinat [lat, lng] per leg, urut sesuai rute.
+      Leg yang gagal diambil berupa list kosong.
+    """
+    return [decode_polyline(leg, dtype=np.float64).tolist() for leg in get_route_legs_geometry(locations, route)]
+
+# Fungsi untuk membuat peta Folium rute di memori
+def build_route_map(locations, route, total_distance, legs=None, max_zoom=STATIC_MAP_MAX_ZOOM):
+    """
+    legs: geometri per leg yang sudah diambil sebelumnya (encoded polyline atau list koordinat);
+          jika kosong, geometri diambil dari OSRM.
+    max_zoom: level zoom terdekat yang perlu tampil akurat. Garis rute disederhanakan sampai
+              setengah piksel pada zoom ini; pada zoom yang lebih jauh Leaflet menyederhanakannya
+              lagi di browser.
+    """
     depot_location = locations[0]
     m = folium.Map(location=depot_location, zoom_start=14)
 
@@ -127,90 +339,148 @@ def visualize_route(locations, route, total_distance):
         folium.Marker(location=location, popup=f'Lokasi {i}').add_to(m)
 
     # Mendapatkan koordinat rute dari OSRM API
-    route_coordinates = []
-    for i in range(len(route) - 1):
-        origin = f"{locations[route[i]][1]},{locations[route[i]][0]}"  
-        destination = f"{locations[route[i + 1]][1]},{locations[route[i + 1]][0]}"  
-        temp_coordinates = get_route_coordinates(origin, destination)
-        if temp_coordinates:
-            route_coordinates.extend(temp_coordinates)
+    if legs is None:
+        legs = get_route_legs_geometry(locations, route)
+    route_coordinates = [coordinates for coordinates in map(leg_coordinates, legs) if len(coordinates)]
 
     # Tambahkan rute ke peta jika ada koordinat yang valid
     if route_coordinates:
-        folium.PolyLine(route_coordinates, color='blue', weight=2.5, opacity=1).add_to(m)
+        path = simplify_for_zoom(np.concatenate(route_coordinates), max_zoom)
+        # Dibulatkan ke presisi polyline agar HTML tidak berisi digit float yang tidak berarti
+        folium.PolyLine(np.round(path, POLYLINE_PRECISION).tolist(), color='blue', weight=2.5, opacity=1).add_to(m)
 
     # Tambahkan informasi jarak ke peta
     folium.Marker(location=depot_location, 
                   popup=f'Total distance: {total_distance/1000} km',
                   icon=folium.Icon(color='green')).add_to(m)
+    return m
+
+# Fungsi visualisasi rute di peta menggunakan Folium
+def visualize_route(locations, route, total_distance, output_path='route_map.html', legs=None):
+    m = build_route_map(locations, route, total_distance, legs)
 
     # Simpan peta ke file HTML
-    m.save('route_map.html')
-    print("Peta rute disimpan sebagai 'route_map.html'.")
+    m.save(output_path)
+    print(f"Peta rute disimpan sebagai '{output_path}'.")
 
 # Fungsi untuk melatih model prediksi volume sampah
-def train_volume_prediction_model():
-    # Contoh data historis
-    data = {
-        'hari': [1, 2, 3, 4, 5],
-        'jumlah_pengunjung': [100, 150, 120, 200, 180],
-        'volume_sampah': [10, 15, 12, 25, 20]  # Volume sampah dalam unit
-    }
-
-    df = pd.DataFrame(data)
-
-    # Fitur dan target
-    X = df[['hari', 'jumlah_pengunjung']]
-    y = df['volume_sampah']
-
-    # Pembagian data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def train_volume_prediction_model(history=None, version=None):
+    """
+    Melatih model prediksi volume dan menyimpannya dengan version key (lihat volume_model).
 
-    # Model Random Forest
-    model = RandomForestRegressor()
-    model.fit(X_train, y_train)
+    history: DataFrame/path riwayat dengan kolom day, bin, demand. Jika kosong, riwayat diambil
+             dari seluruh hari yang tercatat di provider volume default.
 
-    return model
+    Raise ValueError jika history kosong dan provider default bukan ReplayDemandProvider: volume
+    sintetis atau hasil prediksi bukan riwayat nyata dan tidak boleh disimpan sebagai model.
+    """
+    if history is None:
+        provider = get_demand_provider()
+        if not isinstance(provider, ReplayDemandProvider):
+            raise ValueError("Model volume hanya dilatih dari riwayat nyata: isi DEMAND_REPLAY_PATH "
+                             f"atau berikan history (provider default: {type(provider).__name__})")
+        days = np.asarray(provider.days)
+        history = pd.DataFrame({
+            'day': np.repeat(days, provider.num_bins),
+            'bin': np.tile(np.arange(1, provider.num_bins + 1), len(days)),
+            'demand': provider.demands(days).ravel(),
+        })
+    return train_volume_model(history, version=version)
 
 # Fungsi untuk memfilter lokasi berdasarkan hari saat ini
 def filter_locations_by_day(data, current_day):
     """
     Memfilter lokasi yang harus diambil sampahnya berdasarkan jadwal dan hari saat ini.
+    Pemilihan dilakukan dengan satu mask boolean dari bitmask jadwal (data['schedule_mask'],
+    atau hasil schedule_to_mask dari pickup_schedule). Depot selalu diikutkan.
+    Data dari data_model_from_inventory difilter lewat InventoryView: lokasi dan jadwal hanya
+    diambil untuk baris terpilih, tanpa mengubah list seluruh inventaris menjadi array lagi.
     
     current_day: Hari saat ini (0: Senin, 1: Selasa, dst.)
     """
-    filtered_locations = []
-    filtered_demands = []
-    filtered_schedule = []
-    
-    for i in range(len(data['locations'])):
-        # Jika jadwal adalah setiap hari (0) atau jadwal sesuai dengan current_day
-        if data['pickup_schedule'][i] == 0 or current_day % data['pickup_schedule'][i] == 0:
-            filtered_locations.append(data['locations'][i])
-            filtered_demands.append(data['demands'][i])
-            filtered_schedule.append(data['pickup_schedule'][i])
-    
+    inventory = data.pop('inventory', None)
+    if inventory is not None:
+        view = filter_inventory_by_day(inventory, current_day, data['depot'])
+        data['locations'] = view.locations().tolist()
+        data['schedule_mask'] = view.column('schedule_mask').tolist()
+        data['demands'] = np.asarray(data['demands'])[view.indices].tolist()
+        data['depot'] = 0
+        return data
+
+    schedule_mask = data.get('schedule_mask')
+    if schedule_mask is None:
+        schedule_mask = schedule_to_mask(data['pickup_schedule'])
+    selected = day_selection(schedule_mask, current_day)
+    selected[data['depot']] = True
+    indices = np.flatnonzero(selected)
+
     # Mengupdate data model dengan lokasi dan permintaan yang difilter
-    data['locations'] = filtered_locations
-    data['demands'] = filtered_demands
-    data['pickup_schedule'] = filtered_schedule
+    for key in ('locations', 'demands', 'pickup_schedule', 'schedule_mask'):
+        if key in data:
+            data[key] = np.asarray(data[key])[indices].tolist()
+    data['depot'] = int(np.searchsorted(indices, data['depot']))
 
     return data
 
+# Fungsi untuk membuat parameter pencarian OR-Tools dari opsi solver
+def build_search_parameters(solver_options=None):
+    """
+    solver_options: dict opsional berisi
+    - first_solution_strategy: nama FirstSolutionStrategy (default: 'PATH_CHEAPEST_ARC')
+    - local_search_metaheuristic: nama LocalSearchMetaheuristic, misalnya 'GUIDED_LOCAL_SEARCH'
+    - time_limit_seconds: batas waktu solve (wall-clock)
+    - solution_limit: batas jumlah solusi yang ditemukan
+    """
+    solver_options = solver_options or {}
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = getattr(
+        routing_enums_pb2.FirstSolutionStrategy,
+        solver_options.get('first_solution_strategy', 'PATH_CHEAPEST_ARC'))
+
+    metaheuristic = solver_options.get('local_search_metaheuristic')
+    if metaheuristic:
+        search_parameters.local_search_metaheuristic = getattr(
+            routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic)
+
+    time_limit = solver_options.get('time_limit_seconds')
+    solution_limit = solver_options.get('solution_limit')
+    if metaheuristic and time_limit is None and solution_limit is None:
+        time_limit = DEFAULT_METAHEURISTIC_TIME_LIMIT
+    if time_limit is not None:
+        search_parameters.time_limit.FromMilliseconds(int(time_limit * 1000))
+    if solution_limit is not None:
+        search_parameters.solution_limit = solution_limit
+    return search_parameters
+
+# Fungsi untuk mengubah matriks jarak/durasi menjadi array integer yang kontigu untuk OR-Tools
+def to_integer_matrix(matrix):
+    return np.ascontiguousarray(np.rint(matrix), dtype=np.int64)
+
 # Fungsi untuk menghitung rute berdasarkan data yang ada
-def calculate_route(data):
+@traced('calculate_route', profile=True)
+def calculate_route(data, backend=None, solver_options=None):
     """
     Fungsi ini menghitung rute optimal berdasarkan data lokasi dan kapasitas kendaraan.
 
     Parameter:
     - data: dict berisi data lokasi, permintaan, kapasitas kendaraan, dll.
+      Jika data['sparse_neighbors'] diisi, hanya arc ke k tetangga terdekat yang dipakai
+      (lihat sparse_routing) sehingga matriks penuh tidak perlu dibuat.
+    - backend: backend matriks jarak (lihat create_distance_matrix)
+    - solver_options: opsi pencarian (lihat build_search_parameters),
+      default memakai data['solver_options'] jika ada
 
     Return:
     - route: urutan indeks lokasi yang dilalui
     - total_distance: total jarak yang ditempuh
     """
-    # Membuat matriks jarak menggunakan OSRM
-    distance_matrix = create_distance_matrix(data)
+    if data.get('sparse_neighbors'):
+        # Import di sini karena sparse_routing memakai fungsi dari modul ini
+        from sparse_routing import calculate_sparse_route
+        return calculate_sparse_route(data, backend, solver_options)
+
+    # Membuat matriks jarak menggunakan OSRM, dibulatkan ke meter sebagai integer
+    distance_matrix = to_integer_matrix(create_distance_matrix(data, backend))
 
     # Membuat manajer index untuk routing
     manager = pywrapcp.RoutingIndexManager(len(distance_matrix), data['num_vehicles'], data['depot'])
@@ -218,22 +488,15 @@ def calculate_route(data):
     # Membuat model routing
     routing = pywrapcp.RoutingModel(manager)
 
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return distance_matrix[from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    # Matriks didaftarkan langsung ke OR-Tools sehingga evaluasi arc tidak memanggil Python
+    transit_callback_index = routing.RegisterTransitMatrix(distance_matrix.tolist())
 
     # Set biaya (cost) ke jarak
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
     # Menambahkan constraint kapasitas kendaraan
-    def demand_callback(from_index):
-        from_node = manager.IndexToNode(from_index)
-        return data['demands'][from_node]
-
-    demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
+    demands = np.asarray(data['demands'], dtype=np.int64)
+    demand_callback_index = routing.RegisterUnaryTransitVector(demands.tolist())
     routing.AddDimensionWithVehicleCapacity(
         demand_callback_index,
         0,  # Tidak ada slack
@@ -243,11 +506,12 @@ def calculate_route(data):
     )
 
     # Setting parameter pencarian
-    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-    search_parameters.first_solution_strategy = (routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    search_parameters = build_search_parameters(solver_options or data.get('solver_options'))
 
-    # Memecahkan masalah
+    # Memecahkan masalah; dihentikan lebih awal jika job antrian dibatalkan
+    watch_cancellation(routing)
     solution = routing.SolveWithParameters(search_parameters)
+    record_solver_statistics(routing, solution, len(distance_matrix))
 
     if solution:
         total_distance = 0
@@ -269,6 +533,25 @@ def calculate_route(data):
     else:
         return None, 0  # Tidak ditemukan solusi
 
+# Fungsi untuk mencatat statistik solver ke span yang sedang berjalan dan ke metrik
+def record_solver_statistics(routing, solution, num_nodes):
+    solver = routing.solver()
+    statistics = {
+        'nodes': num_nodes,
+        'status': routing.status(),
+        'branches': solver.Branches(),
+        'failures': solver.Failures(),
+        'solutions': solver.Solutions(),
+        'solver_wall_time_ms': solver.WallTime(),
+        'objective': solution.ObjectiveValue() if solution else None,
+    }
+    current_span().set(**statistics)
+    increment('solver_runs_total', found=bool(solution))
+    increment('solver_branches_total', statistics['branches'])
+    if solution:
+        set_gauge('solver_last_objective', statistics['objective'])
+    return statistics
+
 # Memecahkan masalah VRP dengan rencana pengambilan berkala
 def main():
     # Tentukan hari saat ini (0: Senin, 1: Selasa, ..., 6: Minggu)
@@ -0,0 +1,183 @@
+"""
+Klien HTTP OSRM bersama untuk semua pengambilan matriks dan geometri rute.
+
+Semua request melewati satu requests.Session dengan connection pooling (keep-alive),
+dibatasi konkurensinya oleh thread pool, dibatasi lajunya per host, memakai timeout,
+dan diulang dengan exponential backoff ketika server sibuk atau koneksi gagal.
+
+Konfigurasi lewat environment variable:
+- OSRM_BASE_URL: alamat server OSRM (default: server publik router.project-osrm.org)
+- OSRM_PROFILE: profil routing (default: driving)
+- OSRM_MAX_CONCURRENCY: jumlah request paralel maksimum (default: 8)
+- OSRM_RATE_LIMIT: request per detik per host, kosong berarti tanpa batas
+- OSRM_TIMEOUT: timeout per request dalam detik (default: 10)
+- OSRM_MAX_RETRIES: jumlah percobaan ulang (default: 3)
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import increment
+
+OSRM_BASE_URL = os.environ.get('OSRM_BASE_URL', 'http://router.project-osrm.org')
+OSRM_PROFILE = os.environ.get('OSRM_PROFILE', 'driving')
+OSRM_MAX_CONCURRENCY = int(os.environ.get('OSRM_MAX_CONCURRENCY', 8))
+OSRM_RATE_LIMIT = float(os.environ['OSRM_RATE_LIMIT']) if os.environ.get('OSRM_RATE_LIMIT') else None
+OSRM_TIMEOUT = float(os.environ.get('OSRM_TIMEOUT', 10))
+OSRM_MAX_RETRIES = int(os.environ.get('OSRM_MAX_RETRIES', 3))
+
+# Status HTTP yang layak dicoba ulang (server sibuk atau gangguan sementara)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class OSRMError(Exception):
+    """Request OSRM gagal setelah semua percobaan ulang, atau ditolak oleh server."""
+
+
+class RateLimiter:
+    """Pembatas laju sederhana: memberi jarak minimal 1/rate detik antar request."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+# Fungsi untuk mendapatkan pembatas laju per host, dipakai bersama oleh semua klien
+def get_rate_limiter(host, rate):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None or limiter.interval != 1.0 / rate:
+            limiter = _rate_limiters[host] = RateLimiter(rate)
+        return limiter
+
+
+class OSRMClient:
+    """
+    Klien OSRM dengan connection pooling, konkurensi terbatas, rate limit per host,
+    timeout, dan retry dengan exponential backoff.
+    """
+
+    def __init__(self, base_url=OSRM_BASE_URL, profile=OSRM_PROFILE, max_concurrency=OSRM_MAX_CONCURRENCY,
+                 rate_limit=OSRM_RATE_LIMIT, timeout=OSRM_TIMEOUT, max_retries=OSRM_MAX_RETRIES,
+                 backoff_factor=0.5):
+        self.base_url = base_url.rstrip('/')
+        self.profile = profile
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self.rate_limiter = get_rate_limiter(urlsplit(self.base_url).netloc, rate_limit) if rate_limit else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='osrm')
+
+    def _get(self, path):
+        url = f"{self.base_url}/{path}"
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            with self._count_lock:
+                self.request_count += 1
+            endpoint = path.split('/', 1)[0]
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                increment('osrm_http_requests_total', endpoint=endpoint, status=type(error).__name__)
+                last_error = f"{type(error).__name__}: {error}"
+            else:
+                increment('osrm_http_requests_total', endpoint=endpoint, status=response.status_code)
+                if response.status_code == 200:
+                    return response.json()
+                last_error = f"{response.status_code}, {response.text}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise OSRMError(last_error)
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit() and attempt < self.max_retries:
+                    time.sleep(float(retry_after))
+                    continue
+
+            if attempt < self.max_retries:
+                time.sleep(self.backoff_factor * (2 ** attempt))
+        raise OSRMError(last_error)
+
+    def route(self, origin, destination, overview='false', geometries=None):
+        """
+        Memanggil /route untuk satu pasangan koordinat "lng,lat".
+
+        Return:
+        - dict rute pertama dari respons OSRM (distance, duration, dan geometry jika diminta).
+        """
+        path = f"route/v1/{self.profile}/{origin};{destination}?overview={overview}"
+        if geometries:
+            path += f"&geometries={geometries}"
+        route_info = self._get(path)
+        if not route_info.get('routes'):
+            raise OSRMError(f"No routes found for origin {origin} and destination {destination}.")
+        return route_info['routes'][0]
+
+    def table(self, coordinates, sources, destinations):
+        """
+        Memanggil /table dengan anotasi jarak dan durasi.
+
+        Return:
+        - (distances, durations) berupa list of list; sel tanpa rute bernilai None.
+        """
+        path = (f"table/v1/{self.profile}/{';'.join(coordinates)}"
+                f"?sources={';'.join(map(str, sources))}"
+                f"&destinations={';'.join(map(str, destinations))}"
+                f"&annotations=distance,duration")
+        table_info = self._get(path)
+        if table_info.get('code') != 'Ok':
+            raise OSRMError(f"{table_info.get('code')}, {table_info.get('message')}")
+        return table_info['distances'], table_info['durations']
+
+    def map(self, function, items):
+        """Menjalankan function untuk setiap item secara paralel (urutan hasil dipertahankan)."""
+        return list(self._executor.map(function, items))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+# Fungsi untuk mendapatkan klien OSRM bersama
+def get_osrm_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OSRMClient()
+        return _default_client
+
+
+# Fungsi untuk mengganti klien OSRM bersama, misalnya ke server tiruan saat benchmark
+def set_osrm_client(client):
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
@@ -0,0 +1,285 @@
+"""
+Antrian job perencanaan yang dijalankan di process pool lokal.
+
+Solve yang lama tidak lagi berjalan di thread request Dash: callback hanya mengirim job lalu
+memantau statusnya lewat polling. Antrian ini:
+- melaporkan progres: fungsi job memanggil report_progress(fraksi, pesan) di proses worker;
+- menggabungkan request identik: job dengan kunci yang sama dan masih berjalan dipakai bersama;
+- membatalkan job usang: setiap pemilik (misalnya satu sesi browser) hanya mengikuti satu job,
+  dan job yang tidak lagi diikuti siapa pun dibatalkan. Job yang belum mulai dibatalkan
+  langsung; job yang sedang berjalan berhenti pada pemanggilan report_progress berikutnya, atau di
+  tengah solve OR-Tools jika model routing didaftarkan dengan watch_cancellation.
+  Job yang dikirim tanpa pemilik (misalnya perhitungan awal di background) tidak ikut dibatalkan.
+
+Jumlah worker diatur lewat environment variable PLANNING_WORKERS (default: 2).
+"""
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get('PLANNING_WORKERS', 2))
+
+# Jumlah job selesai yang statusnya tetap disimpan agar bisa dibaca oleh polling terakhir
+MAX_FINISHED_JOBS = 256
+
+# Jarak minimum (detik) antar pemeriksaan pembatalan dari callback solusi OR-Tools
+CANCEL_CHECK_SECONDS = 0.2
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# State di proses worker
+_progress_queue = None
+_cancelled = None
+_current_job = None
+
+
+def _init_worker(progress_queue, cancelled):
+    global _progress_queue, _cancelled
+    _progress_queue = progress_queue
+    _cancelled = cancelled
+
+
+def _run_job(job_id, function, args, kwargs):
+    global _current_job
+    _current_job = job_id
+    try:
+        report_progress(0.0, 'Dimulai')
+        return function(*args, **kwargs)
+    finally:
+        _current_job = None
+
+
+# Fungsi untuk melaporkan progres dari dalam fungsi job
+def report_progress(fraction, message=''):
+    """
+    fraction: progres 0..1; message: keterangan tahap yang sedang berjalan.
+    Di luar worker antrian job (misalnya solve langsung) fungsi ini tidak melakukan apa-apa.
+
+    Raise JobCancelled jika job sudah dibatalkan.
+    """
+    if _current_job is None:
+        return
+    if _cancelled.get(_current_job):
+        raise JobCancelled(_current_job)
+    _progress_queue.put((_current_job, fraction, message))
+
+
+# Fungsi untuk menghentikan pencarian OR-Tools saat job dibatalkan
+def watch_cancellation(routing):
+    """
+    Mendaftarkan callback solusi yang menghentikan pencarian (FinishCurrentSearch) begitu job
+    dibatalkan. Solve lalu mengembalikan solusi terbaik sejauh ini dan job berhenti pada
+    report_progress berikutnya. Di luar worker antrian job fungsi ini tidak melakukan apa-apa.
+
+    Pembatalan dari thread lain (routing.CancelSearch) tidak bisa dipakai karena solve menahan GIL,
+    dan pemeriksaan di setiap keputusan solver (Solver.CustomLimit) memperlambat pencarian.
+    """
+    if _current_job is None:
+        return
+    job_id = _current_job
+    last_check = [time.monotonic()]
+
+    def check():
+        now = time.monotonic()
+        if now - last_check[0] < CANCEL_CHECK_SECONDS:
+            return
+        last_check[0] = now
+        if _cancelled.get(job_id):
+            routing.solver().FinishCurrentSearch()
+
+    routing.AddAtSolutionCallback(check)
+
+
+class PlanningJobQueue:
+    """Antrian job dengan deduplikasi per kunci dan pembatalan per pemilik."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        # 'spawn' agar worker tidak mewarisi thread dan koneksi (OSRM, SQLite) dari proses Dash
+        context = multiprocessing.get_context('spawn')
+        self._manager = context.Manager()
+        self._progress_queue = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                             initializer=_init_worker,
+                                             initargs=(self._progress_queue, self._cancelled))
+        # RLock: future.cancel() memanggil done callback (_finish) secara langsung
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._in_flight = {}  # kunci -> job_id
+        self._owner_jobs = {}  # pemilik -> job_id
+        self._finished = []
+        self._progress_thread = threading.Thread(target=self._drain_progress, name='planning-progress', daemon=True)
+        self._progress_thread.start()
+
+    def submit(self, key, function, *args, owner=None, **kwargs):
+        """
+        Mengirim job, atau ikut pada job yang sedang berjalan dengan kunci yang sama.
+
+        key: kunci hashable yang mengidentifikasi hasil (request identik punya kunci sama)
+        function: fungsi tingkat modul (harus bisa di-pickle) yang dijalankan di worker
+        owner: pengenal pengirim; job sebelumnya milik pengirim ini dilepas dan dibatalkan
+               jika tidak ada pengirim lain yang masih menunggunya
+
+        Return:
+        - job_id
+        """
+        with self._lock:
+            job_id = self._in_flight.get(key)
+            if job_id is None or self._jobs[job_id]['state'] == 'cancelling':
+                job_id = uuid.uuid4().hex
+                job = {
+                    'id': job_id,
+                    'key': key,
+                    'state': 'pending',
+                    'progress': 0.0,
+                    'message': 'Menunggu worker',
+                    'result': None,
+                    'error': None,
+                    'owners': set(),
+                    'pinned': False,
+                    'callbacks': [],
+                    'created_at': time.time(),
+                }
+                self._jobs[job_id] = job
+                self._in_flight[key] = job_id
+                job['future'] = self._executor.submit(_run_job, job_id, function, args, kwargs)
+                job['future'].add_done_callback(lambda future, job_id=job_id: self._finish(job_id, future))
+
+            if owner is None:
+                self._jobs[job_id]['pinned'] = True
+            else:
+                previous = self._owner_jobs.get(owner)
+                if previous is not None and previous != job_id:
+                    self._release(previous, owner)
+                self._owner_jobs[owner] = job_id
+                self._jobs[job_id]['owners'].add(owner)
+        return job_id
+
+    def _release(self, job_id, owner):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job['owners'].discard(owner)
+        if not job['owners'] and not job['pinned']:
+            self._cancel_job(job)
+
+    def _cancel_job(self, job):
+        # Job yang belum mulai langsung dibatalkan; yang sedang berjalan ditandai dan berhenti
+        # pada report_progress berikutnya
+        if job['state'] in ('pending', 'running') and not job['future'].cancel():
+            job['state'] = 'cancelling'
+            self._cancelled[job['id']] = True
+
+    def release(self, owner):
+        """Melepas job yang sedang diikuti pemilik (misalnya saat pindah ke hasil yang sudah ada)."""
+        with self._lock:
+            job_id = self._owner_jobs.pop(owner, None)
+            if job_id is not None:
+                self._release(job_id, owner)
+
+    def cancel(self, job_id):
+        """Membatalkan job untuk semua pemiliknya."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for owner in job['owners']:
+                if self._owner_jobs.get(owner) == job_id:
+                    del self._owner_jobs[owner]
+            job['owners'].clear()
+            self._cancel_job(job)
+
+    def add_done_callback(self, job_id, callback):
+        """
+        Memanggil callback(status) sekali saat job selesai, dibatalkan, atau gagal (langsung jika
+        job sudah selesai). Callback berjalan di thread yang menyelesaikan job.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job['state'] in ('pending', 'running', 'cancelling'):
+                job['callbacks'].append(callback)
+                return
+        self._run_callbacks([callback], self.status(job_id))
+
+    def _run_callbacks(self, callbacks, status):
+        for callback in callbacks:
+            try:
+                callback(status)
+            except Exception as error:
+                print(f"Warning: Callback job {status['id']} gagal: {error}")
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs[job_id]
+            try:
+                job['result'] = future.result()
+                job['state'] = 'done'
+                job['progress'] = 1.0
+                job['message'] = 'Selesai'
+            except (CancelledError, JobCancelled):
+                job['state'] = 'cancelled'
+                job['message'] = 'Dibatalkan'
+            except Exception as error:
+                job['state'] = 'failed'
+                job['error'] = f"{type(error).__name__}: {error}"
+                job['message'] = 'Gagal'
+            if self._in_flight.get(job['key']) == job_id:
+                del self._in_flight[job['key']]
+            self._cancelled.pop(job_id, None)
+
+            self._finished.append(job_id)
+            while len(self._finished) > MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.pop(0), None)
+            callbacks, job['callbacks'] = job['callbacks'], []
+            status = self.status(job_id)
+        self._run_callbacks(callbacks, status)
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, fraction, message = self._progress_queue.get()
+            except (EOFError, OSError):
+                return  # Manager sudah ditutup
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None and job['state'] in ('pending', 'running'):
+                    job['state'] = 'running'
+                    job['progress'] = fraction
+                    job['message'] = message
+
+    def status(self, job_id):
+        """
+        Return:
+        - dict berisi id, state ('pending', 'running', 'cancelling', 'done', 'failed',
+          'cancelled'), progress, message, result, dan error; atau None jika job tidak dikenal.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {name: value for name, value in job.items() if name not in ('future', 'owners', 'callbacks')}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._manager.shutdown()
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+# Fungsi untuk mendapatkan antrian job bersama (dibuat saat pertama kali dipakai)
+def get_job_queue():
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = PlanningJobQueue()
+        return _default_queue
@@ -0,0 +1,204 @@
+"""
+Cache persisten untuk hasil OSRM (jarak, durasi, dan geometri rute).
+
+Lokasi tempat sampah hampir tidak pernah berpindah, sehingga hasil OSRM untuk pasangan
+koordinat yang sama bisa dipakai ulang antar pemanggilan dan antar proses. Cache disimpan
+di SQLite dengan kunci (jenis data, profil routing, koordinat asal, koordinat tujuan)
+yang dibulatkan, memiliki TTL, dan dibatasi ukurannya dengan eviksi LRU.
+
+Konfigurasi lewat environment variable:
+- ROUTE_CACHE_PATH: file SQLite (default: .route_cache.sqlite, ':memory:' untuk cache sementara)
+- ROUTE_CACHE_TTL: umur maksimum entri dalam detik (default: 7 hari)
+- ROUTE_CACHE_MAX_ENTRIES: jumlah entri maksimum sebelum eviksi LRU (default: 200000)
+- ROUTE_CACHE_TOUCH_INTERVAL: resolusi waktu akses LRU dalam detik (default: 3600); entri yang
+  diakses lagi dalam interval ini tidak diperbarui waktu aksesnya
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import increment
+
+DEFAULT_CACHE_PATH = os.environ.get('ROUTE_CACHE_PATH', '.route_cache.sqlite')
+DEFAULT_TTL = float(os.environ.get('ROUTE_CACHE_TTL', 7 * 24 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('ROUTE_CACHE_MAX_ENTRIES', 200000))
+DEFAULT_TOUCH_INTERVAL = float(os.environ.get('ROUTE_CACHE_TOUCH_INTERVAL', 3600))
+DEFAULT_PRECISION = 5  # 5 desimal ~ 1 meter
+
+# Jenis entri cache: jarak dan durasi satu pasangan koordinat, dan geometri rute sebagai encoded polyline
+LEG_KIND = 'leg'
+POLYLINE_KIND = 'polyline'
+CACHE_KINDS = (LEG_KIND, POLYLINE_KIND)
+
+# Jumlah pembaruan waktu akses yang ditunda sebelum ditulis tanpa menunggu set_many
+MAX_PENDING_TOUCHES = 10000
+
+
+class RouteCache:
+    """
+    Cache key-value berbasis SQLite dengan TTL dan eviksi LRU.
+
+    Nilai disimpan sebagai JSON. Hit memperbarui waktu akses sehingga entri yang paling lama
+    tidak dipakai dihapus lebih dulu ketika jumlah entri melebihi max_entries. Agar pembacaan
+    tidak menulis ke disk, waktu akses hanya diperbarui jika sudah lebih tua dari touch_interval,
+    dan pembaruannya dikumpulkan di memori lalu ditulis bersama set_many (sebelum eviksi) atau flush().
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 precision=DEFAULT_PRECISION, touch_interval=DEFAULT_TOUCH_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.precision = precision
+        self.touch_interval = touch_interval
+        self._pending_touches = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS route_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS route_cache_accessed_at ON route_cache (accessed_at)')
+        self._connection.commit()
+
+    def make_key(self, kind, origin, destination, profile):
+        """
+        Membuat kunci cache dari string koordinat "lng,lat" yang dibulatkan.
+
+        kind: jenis data, salah satu CACHE_KINDS: LEG_KIND ('leg', jarak dan durasi) atau
+              POLYLINE_KIND ('polyline', geometri rute sebagai encoded polyline)
+        """
+        if kind not in CACHE_KINDS:
+            raise ValueError(f"Jenis entri cache tidak dikenal: {kind}")
+
+        def rounded(coordinate):
+            lng, lat = (float(value) for value in coordinate.split(','))
+            return f"{lng:.{self.precision}f},{lat:.{self.precision}f}"
+
+        return f"{kind}:{profile}:{rounded(origin)};{rounded(destination)}"
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Mengambil beberapa entri sekaligus.
+
+        Return:
+        - dict {key: value} hanya untuk entri yang ada dan belum kedaluwarsa.
+        """
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            # SQLite membatasi jumlah parameter per query, jadi kunci dibagi per batch
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f'SELECT key, value, created_at, accessed_at FROM route_cache WHERE key IN ({placeholders})',
+                    batch,
+                ).fetchall()
+                for key, value, created_at, accessed_at in rows:
+                    if self.ttl is None or now - created_at <= self.ttl:
+                        found[key] = json.loads(value)
+                        if now - accessed_at > self.touch_interval:
+                            self._pending_touches[key] = now
+
+            if len(self._pending_touches) > MAX_PENDING_TOUCHES:
+                self._write_touches()
+                self._connection.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        increment('route_cache_hits_total', len(found))
+        increment('route_cache_misses_total', len(keys) - len(found))
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO route_cache (key, value, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(key, json.dumps(value), now, now) for key, value in items.items()],
+            )
+            self._write_touches()
+            self._evict()
+            self._connection.commit()
+
+    def flush(self):
+        """Menulis pembaruan waktu akses yang masih tertunda."""
+        with self._lock:
+            if self._pending_touches:
+                self._write_touches()
+                self._connection.commit()
+
+    def _write_touches(self):
+        if self._pending_touches:
+            self._connection.executemany(
+                'UPDATE route_cache SET accessed_at = ? WHERE key = ?',
+                [(accessed_at, key) for key, accessed_at in self._pending_touches.items()],
+            )
+            self._pending_touches = {}
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._connection.execute(
+                'DELETE FROM route_cache WHERE created_at < ?', (time.time() - self.ttl,))
+        if self.max_entries is None:
+            return
+        (entries,) = self._connection.execute('SELECT COUNT(*) FROM route_cache').fetchone()
+        if entries > self.max_entries:
+            self._connection.execute(
+                'DELETE FROM route_cache WHERE key IN ('
+                ' SELECT key FROM route_cache ORDER BY accessed_at ASC LIMIT ?)',
+                (entries - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM route_cache')
+            self._connection.commit()
+            self._pending_touches = {}
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._connection.execute('SELECT COUNT(*) FROM route_cache').fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+# Fungsi untuk mendapatkan cache bersama yang dipakai oleh seluruh modul
+def get_route_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RouteCache()
+        return _default_cache
+
+
+# Fungsi untuk mengganti cache bersama, misalnya dengan cache ':memory:' saat benchmark
+def set_route_cache(cache):
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
@@ -0,0 +1,319 @@
+"""
+Penyimpanan rencana rute mingguan yang sudah dihitung sebelumnya.
+
+Ketujuh hari diselesaikan sekali oleh worker di background (saat startup dan, opsional, secara
+berkala). Hasilnya dimemoisasi dengan kunci (hari, snapshot muatan, konfigurasi armada) sehingga
+callback dashboard cukup membaca rencana yang sudah ada, dan solve ulang hanya terjadi jika
+muatan atau armada berubah.
+
+Dengan backend 'warm-start', rencana pertama dihitung dari estimasi haversine sehingga langsung
+tersedia, lalu dihitung ulang di background dengan matriks OSRM (WarmStartBackend.refined) dan
+menggantikan rencana awal dengan kunci yang sama. Rencana yang dihitung antrian job disimpan
+dengan add_plan lalu dihitung ulang dengan cara yang sama lewat start_refine.
+
+Jika store dibuat dengan job_queue (misalnya di dashboard), semua solve, termasuk perhitungan di
+background dan refine_plan, dikirim ke antrian job sehingga tidak ada solve di proses pemanggil.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from distance_backend import PrecomputedBackend, WarmStartBackend, get_distance_backend
+from optimalisasi_rute_truk_sampah import (
+    calculate_route,
+    create_data_model,
+    filter_locations_by_day,
+    get_route_legs_geometry,
+)
+from planning_jobs import report_progress
+from timed_routing import calculate_timed_routes
+
+# Jumlah rencana maksimum yang disimpan (7 hari x beberapa snapshot muatan)
+DEFAULT_MAX_PLANS = 64
+
+
+# Fungsi untuk menghitung rencana satu hari dari data model (bisa dijalankan di proses worker)
+def build_plan(day, data, key, backend=None, solver_options=None):
+    """
+    Return:
+    - dict rencana (lihat RoutePlanStore), termasuk 'timetable' dari calculate_timed_routes.
+    """
+    total_waste = sum(data['demands'])
+    filtered_data = filter_locations_by_day(data, day)
+    report_progress(0.1, 'Menghitung matriks jarak dan rute')
+    route, total_distance = calculate_route(filtered_data, backend, solver_options)
+    report_progress(0.6, 'Mengambil geometri rute')
+    legs = get_route_legs_geometry(filtered_data['locations'], route) if route else []
+    report_progress(0.8, 'Menyusun jadwal trip')
+    timetable = plan_timetable(filtered_data, backend, solver_options)
+
+    return {
+        'day': day,
+        'key': key,
+        'data': filtered_data,
+        'route': route,
+        'total_distance': total_distance,
+        'total_waste': total_waste,
+        'legs': legs,
+        'timetable': timetable,
+        'created_at': time.time(),
+    }
+
+
+# Fungsi untuk menghitung ulang rencana dengan matriks tepat dari WarmStartBackend
+def refine_plan(plan, backend, solver_options=None):
+    """
+    Menunggu matriks OSRM untuk lokasi rencana (dimuat di background sejak solve pertama), lalu
+    menghitung ulang rute, geometri, dan jadwal trip dari matriks tersebut.
+
+    Return:
+    - dict rencana baru dengan kunci yang sama dan 'refined' bernilai True.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend)
+    data = plan['data']
+    report_progress(0.1, 'Mengambil matriks jarak OSRM')
+    distances, durations = backend.refined(data['locations'])
+    exact = PrecomputedBackend(data['locations'], distances, durations)
+    report_progress(0.4, 'Menghitung ulang rute')
+    route, total_distance = calculate_route(data, exact, solver_options)
+    report_progress(0.7, 'Mengambil geometri rute')
+    legs = get_route_legs_geometry(data['locations'], route) if route else []
+    return dict(
+        plan,
+        route=route,
+        total_distance=total_distance,
+        legs=legs,
+        timetable=plan_timetable(data, exact, solver_options),
+        refined=True,
+        created_at=time.time(),
+    )
+
+
+# Fungsi untuk menyusun jadwal trip berdasarkan durasi perjalanan, waktu layanan, dan jam shift
+def plan_timetable(data, backend=None, solver_options=None):
+    truck_capacity = sum(data['vehicle_capacities'])
+    data = dict(data, max_trips=-(-sum(data['demands']) // truck_capacity) + 1)
+    return calculate_timed_routes(data, backend, solver_options)
+
+
+class RoutePlanStore:
+    """
+    Menyimpan rencana rute per hari.
+
+    Setiap rencana berisi: day, key, data (sudah difilter), route, total_distance,
+    total_waste (total muatan semua lokasi sebelum difilter), legs (geometri per leg sebagai
+    encoded polyline),
+    timetable (jadwal trip, lihat calculate_timed_routes), created_at, dan refined (hanya untuk
+    rencana yang sudah dihitung ulang dengan matriks tepat, lihat refine_plan).
+    """
+
+    def __init__(self, fleet_config=None, backend=None, solver_options=None, max_plans=DEFAULT_MAX_PLANS,
+                 job_queue=None):
+        """
+        fleet_config: dict yang menimpa data model, misalnya {'vehicle_capacities': [25], 'num_vehicles': 1}
+        backend: backend matriks jarak (lihat create_distance_matrix); dengan job_queue harus berupa
+                 nama atau None agar bisa dikirim ke proses worker
+        solver_options: opsi pencarian (lihat build_search_parameters)
+        job_queue: PlanningJobQueue, atau fungsi tanpa argumen yang mengembalikannya (misalnya
+                   planning_jobs.get_job_queue, agar process pool baru dibuat saat dipakai)
+        """
+        self.fleet_config = dict(fleet_config or {})
+        self.backend = backend
+        self.solver_options = solver_options
+        self.max_plans = max_plans
+        self.job_queue = job_queue
+        self._plans = OrderedDict()
+        self._latest = {}
+        self._artifacts = {}
+        self._refining = set()
+        self._lock = threading.Lock()
+        self._day_locks = {day: threading.Lock() for day in range(7)}
+        self._worker = None
+        self._stop = threading.Event()
+
+    def _fleet_key(self):
+        return tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in self.fleet_config.items()
+        ))
+
+    def plan_key(self, day, data):
+        return (day, tuple(data['demands']), self._fleet_key())
+
+    def prepare_day(self, day):
+        """Membuat data model hari tersebut (sudah ditimpa fleet_config) beserta kunci rencananya."""
+        data = create_data_model(day)
+        data.update(self.fleet_config)
+        return data, self.plan_key(day, data)
+
+    def lookup(self, key):
+        """Mengembalikan rencana dengan kunci tersebut jika sudah pernah dihitung, tanpa solve."""
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self._latest[plan['day']] = key
+            return plan
+
+    def add_plan(self, plan):
+        """
+        Menyimpan rencana yang dihitung di luar store (misalnya oleh antrian job). Rencana yang
+        sudah dihitung ulang dengan matriks tepat tidak diganti oleh rencana awal berkunci sama.
+
+        Return:
+        - rencana yang tersimpan untuk kunci tersebut.
+        """
+        with self._lock:
+            current = self._plans.get(plan['key'])
+            if current is plan or (current is not None and current.get('refined') and not plan.get('refined')):
+                self._plans.move_to_end(plan['key'])
+                self._latest[plan['day']] = plan['key']
+                return current
+            if current is not None:
+                # Rencana diganti (misalnya setelah refine_plan); artefak lamanya tidak berlaku lagi
+                self._artifacts.pop(plan['key'], None)
+            self._plans[plan['key']] = plan
+            self._latest[plan['day']] = plan['key']
+            while len(self._plans) > self.max_plans:
+                evicted_key, _ = self._plans.popitem(last=False)
+                self._artifacts.pop(evicted_key, None)
+        return plan
+
+    def solve_day(self, day):
+        """
+        Membuat data model hari tersebut dan mengembalikan rencananya. Solve dan pengambilan
+        geometri hanya dijalankan jika kombinasi (hari, muatan, armada) belum pernah dihitung.
+        """
+        with self._day_locks[day]:
+            data, key = self.prepare_day(day)
+            plan = self.lookup(key)
+            if plan is not None:
+                return plan
+            plan = self.add_plan(build_plan(day, data, key, self.backend, self.solver_options))
+        self.start_refine(plan)
+        return plan
+
+    def _get_job_queue(self):
+        return self.job_queue() if callable(self.job_queue) else self.job_queue
+
+    def submit_day(self, day, owner=None):
+        """
+        Mengirim solve hari tersebut ke antrian job. Rencananya disimpan (lalu dihitung ulang
+        dengan start_refine) saat job selesai.
+
+        owner: pemilik job (lihat PlanningJobQueue.submit); None berarti job tidak ikut dibatalkan
+
+        Return:
+        - job_id, atau None jika rencana untuk kunci hari tersebut sudah ada.
+        """
+        data, key = self.prepare_day(day)
+        if self.lookup(key) is not None:
+            return None
+        job_queue = self._get_job_queue()
+        job_id = job_queue.submit(key, build_plan, day, data, key, self.backend, self.solver_options, owner=owner)
+        job_queue.add_done_callback(job_id, self._job_done)
+        return job_id
+
+    def _job_done(self, status):
+        if status['state'] == 'done' and status['result'] is not None:
+            self.start_refine(self.add_plan(status['result']))
+
+    def start_refine(self, plan):
+        """
+        Menjalankan refine_plan di background jika backend adalah WarmStartBackend: di antrian job
+        jika ada, selain itu di thread. Dipanggil juga untuk rencana dari antrian job: matriks yang
+        dimuat di proses worker tidak ikut kembali, sehingga matriks tepatnya dihitung ulang.
+
+        Return:
+        - job_id atau thread, atau None jika rencana tidak perlu (atau sedang) dihitung ulang.
+        """
+        backend = self.backend
+        if backend is None or isinstance(backend, str):
+            backend = get_distance_backend(backend)
+        with self._lock:
+            current = self._plans.get(plan['key'])
+        if not isinstance(backend, WarmStartBackend) or plan.get('refined') or (current or {}).get('refined'):
+            return None
+
+        if self.job_queue is not None:
+            job_queue = self._get_job_queue()
+            job_id = job_queue.submit(('refine', plan['key']), refine_plan, plan, self.backend, self.solver_options)
+            job_queue.add_done_callback(job_id, self._job_done)
+            return job_id
+
+        with self._lock:
+            if plan['key'] in self._refining:
+                return None
+            self._refining.add(plan['key'])
+
+        def run():
+            try:
+                self.add_plan(refine_plan(plan, backend, self.solver_options))
+            except Exception as error:
+                print(f"Warning: Gagal menghitung ulang rencana hari {plan['day']} dengan jarak OSRM: {error}")
+            finally:
+                with self._lock:
+                    self._refining.discard(plan['key'])
+
+        thread = threading.Thread(target=run, name=f"route-plan-refine-{plan['day']}", daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self, days=range(7)):
+        """Menghitung rencana hari-hari tersebut, atau mengirimnya ke antrian job jika ada."""
+        for day in days:
+            try:
+                if self.job_queue is not None:
+                    self.submit_day(day)
+                else:
+                    self.solve_day(day)
+            except Exception as error:
+                print(f"Warning: Gagal menghitung rencana hari {day}: {error}")
+
+    def cached_plan(self, day):
+        """Mengembalikan rencana terbaru untuk hari tersebut, atau None jika belum pernah dihitung."""
+        with self._lock:
+            return self._plans.get(self._latest.get(day))
+
+    def get_plan(self, day):
+        """Mengembalikan rencana terbaru untuk hari tersebut, menghitungnya jika belum ada."""
+        return self.cached_plan(day) or self.solve_day(day)
+
+    def artifact(self, plan, name, builder):
+        """
+        Memoisasi hasil turunan sebuah rencana (misalnya figure Plotly atau HTML peta).
+
+        builder: fungsi tanpa argumen yang membuat artefak jika belum ada
+        """
+        with self._lock:
+            artifacts = self._artifacts.setdefault(plan['key'], {})
+            if name in artifacts:
+                return artifacts[name]
+        value = builder()
+        with self._lock:
+            self._artifacts.setdefault(plan['key'], {})[name] = value
+        return value
+
+    def start_background(self, interval=None, days=range(7)):
+        """
+        Menjalankan worker yang menghitung semua hari sekali, lalu mengulanginya
+        setiap `interval` detik jika interval diberikan. Dengan job_queue, worker ini hanya
+        mengirim job (lihat refresh).
+        """
+        if self._worker is not None and self._worker.is_alive():
+            return self._worker
+
+        def run():
+            while not self._stop.is_set():
+                self.refresh(days)
+                if not interval or self._stop.wait(interval):
+                    break
+
+        self._stop.clear()
+        self._worker = threading.Thread(target=run, name='route-plan-store', daemon=True)
+        self._worker.start()
+        return self._worker
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,335 @@
+"""
+Evaluasi skenario what-if untuk perbandingan armada dan layanan dalam satu batch.
+
+Setiap skenario adalah dict yang menimpa konfigurasi dasar, misalnya:
+    {'name': '2 truk', 'num_vehicles': 2}
+    {'name': 'Kapasitas 35 m3', 'capacity': 35, 'max_trips': 2}
+    {'name': 'Tanpa akhir pekan', 'service_days': [0, 1, 2, 3, 4]}
+Kunci yang dikenali: name, vehicle_capacities (atau num_vehicles, extra_vehicles, dan capacity),
+max_trips, service_days, landfill_location, dan time_limit_seconds (batas waktu solver untuk seluruh skenario,
+dibagi rata ke hari layanannya).
+
+Sampah di tempat sampah yang jadwalnya jatuh pada hari tanpa layanan terbawa ke hari layanan
+berikutnya (volume dijumlahkan), sehingga skenario yang menghapus hari layanan tetap mengangkut
+seluruh sampah seminggu.
+
+Matriks jarak dan durasi dihitung sekali untuk semua lokasi (ditambah TPA semua skenario) dan dipakai
+bersama: setiap (skenario, hari) hanya mengambil sub-matriksnya (np.ix_), lalu diselesaikan paralel di
+process pool dengan mode armada (fleet_routing). Hasilnya tabel per skenario berisi jarak, durasi,
+jumlah trip, utilisasi muatan, dan estimasi BBM, serta tabel rinci per hari.
+
+Estimasi BBM per ruas adalah jarak x konsumsi per km yang diinterpolasi linier antara truk kosong
+dan truk penuh sesuai muatan yang dibawa pada ruas tersebut.
+
+Environment variable:
+- SCENARIO_WORKERS: jumlah proses worker (default: jumlah CPU)
+- SCENARIO_TIME_LIMIT_SECONDS: batas waktu solver default per skenario (default: 30)
+- FUEL_LITERS_PER_KM_EMPTY, FUEL_LITERS_PER_KM_FULL: konsumsi BBM truk kosong dan penuh (default: 0.35, 0.55)
+
+Contoh:
+    python scenarios.py skenario.json --output perbandingan.csv
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from bin_inventory import day_selection, schedule_to_mask
+from distance_backend import PrecomputedBackend, get_distance_backend
+from fleet_routing import calculate_fleet_routes
+from metrics import current_span, traced
+from optimalisasi_rute_truk_sampah import create_data_model
+from planning_jobs import report_progress
+from timed_routing import DEFAULT_SERVICE_TIME, DEFAULT_UNLOAD_TIME
+
+DEFAULT_WORKERS = int(os.environ.get('SCENARIO_WORKERS', os.cpu_count() or 1))
+DEFAULT_SCENARIO_TIME_LIMIT = float(os.environ.get('SCENARIO_TIME_LIMIT_SECONDS', 30))
+FUEL_LITERS_PER_KM_EMPTY = float(os.environ.get('FUEL_LITERS_PER_KM_EMPTY', 0.35))
+FUEL_LITERS_PER_KM_FULL = float(os.environ.get('FUEL_LITERS_PER_KM_FULL', 0.55))
+
+ALL_DAYS = list(range(7))
+
+# Skenario contoh untuk dashboard, relatif terhadap armada dasar
+DEFAULT_SCENARIOS = [
+    {'name': 'Armada saat ini'},
+    {'name': 'Tambah satu truk', 'extra_vehicles': 1},
+    {'name': 'Kapasitas 35 m3', 'capacity': 35},
+    {'name': 'Tanpa layanan akhir pekan', 'service_days': [0, 1, 2, 3, 4]},
+]
+
+DAILY_COLUMNS = ['scenario', 'day', 'status', 'bins', 'trucks', 'trips', 'distance_km', 'duration_h', 'load',
+                 'capacity', 'fuel_l', 'solve_time_s']
+SUMMARY_COLUMNS = ['scenario', 'service_days', 'failed_days', 'trucks', 'trips', 'distance_km', 'duration_h',
+                   'load_utilization', 'fuel_l', 'solve_time_s']
+
+
+# Fungsi untuk membuat data seminggu: lokasi, bitmask jadwal, dan volume per hari
+def build_week(demand_provider=None, inventory=None):
+    """
+    Return:
+    - dict berisi base (data model hari Senin, sebagai konfigurasi dasar), locations,
+      schedule_mask, dan demands (array 7 x jumlah lokasi).
+    """
+    week = [create_data_model(day, demand_provider, inventory) for day in ALL_DAYS]
+    base = week[0]
+    schedule_mask = base.get('schedule_mask')
+    if schedule_mask is None:
+        schedule_mask = schedule_to_mask(base['pickup_schedule'])
+    return {
+        'base': base,
+        'locations': np.asarray(base['locations'], dtype=np.float64),
+        'schedule_mask': np.asarray(schedule_mask, dtype=np.uint8),
+        'demands': np.array([data['demands'] for data in week], dtype=np.int64),
+    }
+
+
+# Fungsi untuk menentukan tempat sampah dan volume tiap hari layanan, termasuk sampah hari yang dilewati
+def service_day_demands(schedule_mask, weekly_demands, service_days, depot=0):
+    """
+    Return:
+    - dict {hari: (indeks lokasi terpilih termasuk depot, volume per lokasi terpilih)}.
+    """
+    service_days = sorted({day % 7 for day in service_days})
+    result = {}
+    for day in service_days:
+        selected = np.zeros(len(schedule_mask), dtype=bool)
+        demands = np.zeros(len(schedule_mask), dtype=np.int64)
+        covered = day
+        # Mundur dari hari layanan sampai hari layanan sebelumnya; hari di antaranya tidak dilayani
+        while True:
+            scheduled = day_selection(schedule_mask, covered)
+            selected |= scheduled
+            demands += np.where(scheduled, weekly_demands[covered], 0)
+            covered = (covered - 1) % 7
+            if covered in service_days:
+                break
+        selected[depot] = True
+        demands[depot] = 0
+        indices = np.flatnonzero(selected)
+        result[day] = (indices, demands[indices])
+    return result
+
+
+# Fungsi untuk melengkapi konfigurasi skenario dengan nilai dari data model dasar
+def resolve_scenario(scenario, base, position=0):
+    base_capacities = list(base['vehicle_capacities'])
+    capacities = scenario.get('vehicle_capacities')
+    if capacities is None:
+        capacity = scenario.get('capacity', base_capacities[0])
+        num_vehicles = scenario.get('num_vehicles', len(base_capacities)) + scenario.get('extra_vehicles', 0)
+        capacities = [capacity] * num_vehicles
+    service_days = scenario.get('service_days', ALL_DAYS)
+    return {
+        'name': scenario.get('name') or f"Skenario {position + 1}",
+        'vehicle_capacities': list(capacities),
+        'max_trips': scenario.get('max_trips'),
+        'service_days': sorted({day % 7 for day in service_days}),
+        'landfill_location': scenario.get('landfill_location'),
+        'time_limit_seconds': scenario.get('time_limit_seconds', DEFAULT_SCENARIO_TIME_LIMIT),
+    }
+
+
+# Fungsi untuk menghitung estimasi BBM sepanjang satu trip dari muatan yang dibawa di setiap ruas
+def trip_fuel(arc_distances, carried_load, capacity):
+    load_fraction = np.clip(np.asarray(carried_load, dtype=np.float64) / capacity, 0, 1)
+    liters_per_km = FUEL_LITERS_PER_KM_EMPTY + (FUEL_LITERS_PER_KM_FULL - FUEL_LITERS_PER_KM_EMPTY) * load_fraction
+    return float(np.sum(np.asarray(arc_distances) / 1000 * liters_per_km))
+
+
+# Fungsi untuk mengevaluasi satu (skenario, hari) di proses worker
+def evaluate_day(task):
+    """
+    task: dict berisi scenario, day, data (data model hari tersebut), distances, durations
+          (sub-matriks untuk data['locations'] ditambah TPA jika ada), dan solver_options
+
+    Return:
+    - dict satu baris tabel rinci (lihat DAILY_COLUMNS).
+    """
+    data = task['data']
+    locations = list(data['locations'])
+    landfill = None
+    if data.get('landfill_location') is not None:
+        landfill = len(locations)
+        locations.append(data['landfill_location'])
+    distances, durations = task['distances'], task['durations']
+    backend = PrecomputedBackend(locations, distances, durations)
+
+    start = time.perf_counter()
+    result = calculate_fleet_routes(data, backend, task['solver_options'])
+    solve_time = time.perf_counter() - start
+
+    row = {'scenario': task['scenario'], 'day': task['day'], 'bins': len(data['locations']) - 1,
+           'solve_time_s': round(solve_time, 3)}
+    if result is None:
+        return dict(row, status='no_solution')
+
+    demands = np.asarray(list(data['demands']) + ([0] if landfill is not None else []), dtype=np.int64)
+    distance = duration = fuel = 0.0
+    trucks = trips = load = capacity = 0
+    for vehicle in result['vehicles']:
+        if not vehicle['trips']:
+            continue
+        trucks += 1
+        for trip, trip_load in zip(vehicle['trips'], vehicle['loads']):
+            trip = np.asarray(trip)
+            arc_distances = distances[trip[:-1], trip[1:]]
+            distance += arc_distances.sum()
+            duration += durations[trip[:-1], trip[1:]].sum() + DEFAULT_SERVICE_TIME * (len(trip) - 2) + DEFAULT_UNLOAD_TIME
+            fuel += trip_fuel(arc_distances, np.cumsum(demands[trip[:-1]]), vehicle['capacity'])
+            trips += 1
+            load += trip_load
+            capacity += vehicle['capacity']
+        # Setelah trip terakhir truk kembali kosong dari TPA ke depot
+        if landfill is not None:
+            distance += distances[landfill, data['depot']]
+            duration += durations[landfill, data['depot']]
+            fuel += trip_fuel([distances[landfill, data['depot']]], [0], vehicle['capacity'])
+
+    return dict(row, status='ok', trucks=trucks, trips=trips, distance_km=round(distance / 1000, 3),
+                duration_h=round(duration / 3600, 3), load=int(load), capacity=int(capacity), fuel_l=round(fuel, 2))
+
+
+# Fungsi untuk menyiapkan task semua (skenario, hari) dengan satu matriks bersama
+def scenario_tasks(scenarios, week, distances, durations, landfill_index, solver_options=None):
+    base = week['base']
+    depot = base['depot']
+    tasks = []
+    for scenario in scenarios:
+        day_budget = scenario['time_limit_seconds'] / max(len(scenario['service_days']), 1)
+        options = dict(solver_options or {}, time_limit_seconds=max(day_budget, 1))
+        landfill = scenario['landfill_location']
+        days = service_day_demands(week['schedule_mask'], week['demands'], scenario['service_days'], depot)
+        for day, (indices, demands) in days.items():
+            data = {
+                'locations': week['locations'][indices].tolist(),
+                'demands': demands.tolist(),
+                'vehicle_capacities': scenario['vehicle_capacities'],
+                'num_vehicles': len(scenario['vehicle_capacities']),
+                'depot': int(np.searchsorted(indices, depot)),
+                # Default: trip yang cukup untuk total volume hari itu jika semua truk penuh, ditambah satu
+                'max_trips': scenario['max_trips'] or -(-int(demands.sum()) // sum(scenario['vehicle_capacities'])) + 1,
+                'landfill_location': landfill,
+            }
+            if landfill is not None:
+                indices = np.append(indices, landfill_index[tuple(landfill)])
+            tasks.append({
+                'scenario': scenario['name'],
+                'day': day,
+                'data': data,
+                'distances': distances[np.ix_(indices, indices)],
+                'durations': durations[np.ix_(indices, indices)],
+                'solver_options': options,
+            })
+    return tasks
+
+
+# Fungsi untuk meringkas tabel rinci per hari menjadi satu baris per skenario
+def summarize_scenarios(daily, scenarios):
+    rows = []
+    for scenario in scenarios:
+        days = daily[daily['scenario'] == scenario['name']]
+        solved = days[days['status'] == 'ok']
+        capacity = solved['capacity'].sum()
+        rows.append({
+            'scenario': scenario['name'],
+            'service_days': len(days),
+            'failed_days': int((days['status'] != 'ok').sum()),
+            'trucks': int(solved['trucks'].max()) if len(solved) else 0,
+            'trips': int(solved['trips'].sum()),
+            'distance_km': round(solved['distance_km'].sum(), 1),
+            'duration_h': round(solved['duration_h'].sum(), 2),
+            'load_utilization': round(solved['load'].sum() / capacity, 3) if capacity else None,
+            'fuel_l': round(solved['fuel_l'].sum(), 1),
+            'solve_time_s': round(days['solve_time_s'].sum(), 2),
+        })
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+
+# Fungsi untuk mengevaluasi sekumpulan skenario dengan satu matriks bersama
+@traced('evaluate_scenarios')
+def evaluate_scenarios(scenarios=None, backend=None, solver_options=None, demand_provider=None, inventory=None,
+                       fleet_config=None, max_workers=DEFAULT_WORKERS):
+    """
+    scenarios: list dict skenario (lihat docstring modul), default DEFAULT_SCENARIOS
+    backend: backend matriks jarak (nama atau objek, lihat get_distance_backend); hanya dipakai
+             sekali untuk matriks bersama
+    fleet_config: dict yang menimpa data model dasar sebelum skenario diterapkan
+                  (misalnya fleet_config RoutePlanStore)
+    max_workers: jumlah proses worker; 1 berarti dijalankan di proses ini
+
+    Return:
+    - (summary, daily): DataFrame satu baris per skenario (SUMMARY_COLUMNS) dan satu baris per
+      (skenario, hari layanan) (DAILY_COLUMNS).
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend)
+    week = build_week(demand_provider, inventory)
+    week['base'].update(fleet_config or {})
+    scenarios = [resolve_scenario(scenario, week['base'], position)
+                 for position, scenario in enumerate(scenarios or DEFAULT_SCENARIOS)]
+
+    # Satu matriks untuk semua lokasi dan semua TPA yang dipakai skenario
+    landfills = list(dict.fromkeys(tuple(scenario['landfill_location']) for scenario in scenarios
+                                   if scenario['landfill_location'] is not None))
+    landfill_index = {landfill: len(week['locations']) + offset for offset, landfill in enumerate(landfills)}
+    locations = np.vstack([week['locations']] + [np.asarray(landfills).reshape(-1, 2)])
+    report_progress(0.05, 'Menghitung matriks jarak bersama')
+    distances, durations = backend.matrix(locations.tolist())
+    distances, durations = np.asarray(distances, dtype=np.float64), np.asarray(durations, dtype=np.float64)
+
+    tasks = scenario_tasks(scenarios, week, distances, durations, landfill_index, solver_options)
+    rows = []
+    if max_workers == 1:
+        for task in tasks:
+            rows.append(evaluate_day(task))
+            report_progress(0.1 + 0.9 * len(rows) / len(tasks), f"{len(rows)}/{len(tasks)} hari skenario selesai")
+    else:
+        # 'spawn' agar worker tidak mewarisi klien OSRM bersama yang baru dipakai untuk matriks di atas
+        # (thread pool-nya tidak ikut ter-fork)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = [executor.submit(evaluate_day, task) for task in tasks]
+            for future in as_completed(futures):
+                rows.append(future.result())
+                report_progress(0.1 + 0.9 * len(rows) / len(tasks), f"{len(rows)}/{len(tasks)} hari skenario selesai")
+
+    order = {scenario['name']: position for position, scenario in enumerate(scenarios)}
+    rows.sort(key=lambda row: (order[row['scenario']], row['day']))
+    daily = pd.DataFrame(rows, columns=DAILY_COLUMNS)
+    current_span().set(scenarios=len(scenarios), tasks=len(tasks), matrix_size=len(locations))
+    return summarize_scenarios(daily, scenarios), daily
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Membandingkan skenario armada dan layanan')
+    parser.add_argument('scenarios', nargs='?', help='File JSON berisi list skenario (default: skenario contoh)')
+    parser.add_argument('--inventory', help='Inventaris CSV/Parquet (lihat bin_inventory)')
+    parser.add_argument('--backend', default=None, help='Backend matriks jarak (lihat get_distance_backend)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--metaheuristic', default=None, help='Misalnya GUIDED_LOCAL_SEARCH')
+    parser.add_argument('--output', help='Tulis tabel ringkasan ke CSV')
+    parser.add_argument('--daily', help='Tulis tabel rinci per hari ke CSV')
+    args = parser.parse_args()
+
+    scenarios = None
+    if args.scenarios:
+        with open(args.scenarios) as file:
+            scenarios = json.load(file)
+    inventory = None
+    if args.inventory:
+        from bin_inventory import load_bin_inventory
+        inventory = load_bin_inventory(args.inventory)
+    solver_options = {'local_search_metaheuristic': args.metaheuristic} if args.metaheuristic else None
+
+    summary, daily = evaluate_scenarios(scenarios, args.backend, solver_options, inventory=inventory,
+                                        max_workers=args.workers)
+    print(summary.to_string(index=False))
+    if args.output:
+        summary.to_csv(args.output, index=False)
+    if args.daily:
+        daily.to_csv(args.daily, index=False)
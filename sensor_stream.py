@@ -0,0 +1,482 @@
+"""
+Ingest streaming data sensor tingkat isi (fill level) tempat sampah.
+
+Sensor mengirim satu pembacaan per baris JSON, misalnya {"bin": 3, "level": 0.82, "ts": 1760680000.5}:
+- bin: nomor tempat sampah 1..N, sama dengan indeks node di data model (0 adalah depot)
+- level: tingkat isi sebagai pecahan kapasitas tempat sampah (0..1)
+- ts: waktu pembacaan dalam epoch detik (opsional, default waktu batch diterima)
+
+Alur:
+- SensorAggregator menyimpan `window` pembacaan terakhir per tempat sampah dalam ring buffer
+  NumPy (N x window) serta vektor level terkini. Satu batch pembacaan ditulis dengan operasi
+  tervektorisasi, tanpa loop Python per pembacaan.
+- LineParser memotong aliran byte menjadi baris utuh dan mem-parse satu batch baris dengan satu
+  panggilan json.loads.
+- tail_jsonl (file JSON lines yang terus ditambah) dan serve_socket (TCP atau Unix socket lokal)
+  adalah pembaca async yang mengisi aggregator; start_sensor_stream menjalankannya di thread latar.
+- Tempat sampah yang level terkininya (atau proyeksi level dari laju pengisian dalam horizon
+  tertentu) melewati ambang pengambilan diserahkan ke planner lewat pickup_data_model (data model
+  baru untuk calculate_route) atau apply_to_planner (IncrementalPlanner), hanya dari state di
+  memori tanpa membaca ulang riwayat.
+
+Environment variable:
+- SENSOR_WINDOW: jumlah pembacaan yang disimpan per tempat sampah (default: 16)
+- SENSOR_PICKUP_THRESHOLD: tingkat isi minimum untuk diambil (default: 0.7)
+- SENSOR_BIN_CAPACITY: volume tempat sampah penuh dalam satuan demand (default: 10)
+- SENSOR_CHUNK_SIZE: ukuran potongan byte yang dibaca per iterasi (default: 65536)
+- SENSOR_POLL_INTERVAL: jeda polling file saat tidak ada data baru, dalam detik (default: 0.2)
+- SENSOR_STARTUP_TIMEOUT: batas waktu menunggu pembaca siap di start_sensor_stream, dalam detik (default: 10)
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from demand_provider import DemandProvider
+from metrics import increment, set_gauge
+
+SENSOR_WINDOW = int(os.environ.get('SENSOR_WINDOW', 16))
+SENSOR_PICKUP_THRESHOLD = float(os.environ.get('SENSOR_PICKUP_THRESHOLD', 0.7))
+SENSOR_BIN_CAPACITY = float(os.environ.get('SENSOR_BIN_CAPACITY', 10))
+SENSOR_CHUNK_SIZE = int(os.environ.get('SENSOR_CHUNK_SIZE', 65536))
+SENSOR_POLL_INTERVAL = float(os.environ.get('SENSOR_POLL_INTERVAL', 0.2))
+SENSOR_STARTUP_TIMEOUT = float(os.environ.get('SENSOR_STARTUP_TIMEOUT', 10))
+
+
+class SensorAggregator:
+    """
+    Ring buffer pembacaan sensor per tempat sampah.
+
+    Baris array diindeks dengan nomor node (baris 0 untuk depot, selalu kosong), sehingga
+    vektor volume langsung berformat data model. Aman dipanggil dari thread pembaca dan
+    thread planner sekaligus.
+    """
+
+    def __init__(self, num_bins, window=SENSOR_WINDOW, bin_capacity=None, threshold=SENSOR_PICKUP_THRESHOLD):
+        """
+        num_bins: jumlah tempat sampah (tanpa depot)
+        window: jumlah pembacaan terakhir yang disimpan per tempat sampah
+        bin_capacity: volume tempat sampah penuh dalam satuan demand; skalar atau array berukuran
+                      num_bins (misalnya kolom capacity inventaris tanpa depot).
+                      Default: SENSOR_BIN_CAPACITY
+        threshold: tingkat isi minimum untuk diambil (lihat select_pickups)
+        """
+        self.num_bins = num_bins
+        self.window = window
+        self.threshold = threshold
+        capacity = np.zeros(num_bins + 1, dtype=np.float64)
+        capacity[1:] = SENSOR_BIN_CAPACITY if bin_capacity is None else bin_capacity
+        self.bin_capacity = capacity
+
+        self.levels = np.full((num_bins + 1, window), np.nan, dtype=np.float32)
+        self.timestamps = np.full((num_bins + 1, window), np.nan, dtype=np.float64)
+        self.counts = np.zeros(num_bins + 1, dtype=np.int64)  # Total pembacaan per tempat sampah
+        self.current = np.zeros(num_bins + 1, dtype=np.float32)
+        self.last_seen = np.full(num_bins + 1, np.nan, dtype=np.float64)
+        self.received = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def ingest(self, bins, levels, timestamps=None):
+        """
+        Menambahkan satu batch pembacaan. Pembacaan dengan nomor tempat sampah di luar 1..N atau
+        level bukan angka dibuang. Di dalam batch, urutan kedatangan menentukan pembacaan terkini.
+
+        Return:
+        - jumlah pembacaan yang diterima.
+        """
+        bins = np.asarray(bins, dtype=np.int64)
+        levels = np.asarray(levels, dtype=np.float32)
+        if timestamps is None:
+            timestamps = np.full(bins.shape, time.time())
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+
+        valid = (bins >= 1) & (bins <= self.num_bins) & np.isfinite(levels) & np.isfinite(timestamps)
+        dropped = bins.size - int(np.count_nonzero(valid))
+        if dropped:
+            bins, levels, timestamps = bins[valid], levels[valid], timestamps[valid]
+        levels = np.clip(levels, 0, 1)
+
+        # Kelompokkan per tempat sampah (sort stabil menjaga urutan kedatangan); rank adalah
+        # urutan pembacaan di dalam kelompoknya sehingga setiap pembacaan mendapat slot sendiri
+        order = np.argsort(bins, kind='stable')
+        bins, levels, timestamps = bins[order], levels[order], timestamps[order]
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]]) if bins.size else np.empty(0, np.int64)
+        group_sizes = np.diff(np.r_[starts, bins.size])
+        unique = bins[starts]
+        last = starts + group_sizes - 1
+        rank = np.arange(bins.size) - np.repeat(starts, group_sizes)
+        # Hanya `window` pembacaan terakhir per tempat sampah yang muat di ring buffer
+        keep = rank >= np.repeat(group_sizes, group_sizes) - self.window
+
+        with self._lock:
+            slots = (self.counts[bins] + rank) % self.window
+            self.levels[bins[keep], slots[keep]] = levels[keep]
+            self.timestamps[bins[keep], slots[keep]] = timestamps[keep]
+            self.current[unique] = levels[last]
+            self.last_seen[unique] = timestamps[last]
+            self.counts[unique] += group_sizes
+            self.received += bins.size
+            self.dropped += dropped
+
+        increment('sensor_readings_total', bins.size)
+        if dropped:
+            increment('sensor_readings_dropped_total', dropped)
+        return bins.size
+
+    def drop(self, count):
+        """Mencatat pembacaan yang dibuang sebelum sampai ke ingest (misalnya JSON tidak valid)."""
+        with self._lock:
+            self.dropped += count
+        increment('sensor_readings_dropped_total', count)
+
+    def mark_collected(self, nodes):
+        """Mengosongkan level dan riwayat tempat sampah yang baru saja diambil."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        with self._lock:
+            self.levels[nodes] = np.nan
+            self.timestamps[nodes] = np.nan
+            self.current[nodes] = 0
+
+    def fill_rates(self):
+        """
+        Laju pengisian per tempat sampah (pecahan kapasitas per detik) dari regresi linier
+        pembacaan di ring buffer. Tempat sampah dengan kurang dari dua pembacaan bernilai 0.
+        """
+        with self._lock:
+            levels = self.levels.astype(np.float64)
+            timestamps = self.timestamps.copy()
+        valid = np.isfinite(levels)
+        samples = valid.sum(axis=1, keepdims=True)
+        timestamps = np.where(valid, timestamps, 0)
+        levels = np.where(valid, levels, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            time_offset = np.where(valid, timestamps - timestamps.sum(axis=1, keepdims=True) / samples, 0)
+            level_offset = np.where(valid, levels - levels.sum(axis=1, keepdims=True) / samples, 0)
+            rates = (time_offset * level_offset).sum(axis=1) / (time_offset ** 2).sum(axis=1)
+        rates[(samples[:, 0] < 2) | ~np.isfinite(rates)] = 0
+        # Penurunan level (misalnya setelah diambil) tidak diproyeksikan ke depan
+        return np.clip(rates, 0, None)
+
+    def current_levels(self):
+        with self._lock:
+            return self.current.copy()
+
+    def demand_vector(self):
+        """Volume terkini per node dalam format data model (indeks 0 depot bernilai 0), dibulatkan ke atas."""
+        return np.ceil(self.current_levels() * self.bin_capacity).astype(np.int64)
+
+    def select_pickups(self, threshold=None, horizon_seconds=0):
+        """
+        Memilih tempat sampah yang perlu diambil: level terkini ditambah proyeksi laju pengisian
+        selama horizon_seconds mencapai threshold. Tempat sampah yang belum pernah melapor tidak dipilih.
+
+        Return:
+        - array nomor node terurut.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        projected = self.current_levels().astype(np.float64)
+        if horizon_seconds:
+            projected += self.fill_rates() * horizon_seconds
+        selected = (projected >= threshold) & np.isfinite(self.last_seen)
+        selected[0] = False
+        nodes = np.flatnonzero(selected)
+        set_gauge('sensor_bins_above_threshold', nodes.size)
+        return nodes
+
+
+class StreamDemandProvider(DemandProvider):
+    """
+    Provider volume dari vektor sensor terkini; semua hari yang diminta mendapat volume saat ini.
+    Bisa dipasang sebagai provider default dengan set_demand_provider.
+    """
+
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self.num_bins = aggregator.num_bins
+
+    def demands(self, days):
+        days = list(days)
+        return np.tile(self.aggregator.demand_vector()[1:], (len(days), 1))
+
+
+# Fungsi untuk memeriksa dan mengubah satu pembacaan menjadi (bin, level, ts); None jika tidak valid.
+# Nomor tempat sampah harus bilangan bulat (bool dan pecahan ditolak); rentang 1..N diperiksa di ingest.
+def _coerce_reading(record, now):
+    try:
+        bin_number = record['bin']
+        if isinstance(bin_number, bool) or float(bin_number) != int(bin_number):
+            return None
+        return int(bin_number), float(record['level']), float(record.get('ts', now))
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+
+
+class LineParser:
+    """Memotong aliran byte menjadi baris JSON utuh dan mengirimnya per batch ke aggregator."""
+
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self._remainder = b''
+
+    def feed(self, chunk):
+        """Memproses potongan byte; baris terakhir yang belum lengkap disimpan untuk potongan berikutnya."""
+        lines = (self._remainder + chunk).split(b'\n')
+        self._remainder = lines.pop()
+        return self.ingest_lines(lines)
+
+    def flush(self):
+        """Memproses sisa baris terakhir (misalnya saat koneksi ditutup tanpa newline)."""
+        remainder, self._remainder = self._remainder, b''
+        return self.ingest_lines([remainder])
+
+    def ingest_lines(self, lines):
+        """
+        Mem-parse dan meneruskan satu batch baris. Baris atau pembacaan yang tidak valid dilewati
+        satu per satu (batch lainnya tetap masuk) dan dihitung di aggregator.dropped.
+        """
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return 0
+        try:
+            # Satu panggilan json.loads untuk seluruh batch jauh lebih cepat daripada per baris
+            records = json.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass  # Dihitung sebagai invalid dan dilaporkan sekali di bawah
+        records = [record for record in records if isinstance(record, dict)]
+        invalid = len(lines) - len(records)
+
+        now = time.time()
+        bins = [record.get('bin', -1) for record in records]
+        # Jalur cepat hanya jika semua nomor tempat sampah int murni (bool dan pecahan tidak boleh
+        # diubah diam-diam oleh NumPy), sehingga sebuah pembacaan diterima atau ditolak dengan aturan
+        # yang sama seperti _coerce_reading, apa pun isi batch lainnya
+        fast_path = all(type(bin_number) is int for bin_number in bins)
+        if fast_path:
+            try:
+                levels = [record.get('level', np.nan) for record in records]
+                timestamps = [record.get('ts', now) for record in records]
+                ingested = self.aggregator.ingest(bins, levels, timestamps) if records else 0
+            except (TypeError, ValueError, OverflowError):
+                fast_path = False
+        if not fast_path:
+            # Ada nilai yang perlu diperiksa: periksa per pembacaan
+            readings = [reading for reading in (_coerce_reading(record, now) for record in records) if reading]
+            invalid += len(records) - len(readings)
+            ingested = self.aggregator.ingest(*zip(*readings)) if readings else 0
+        if invalid:
+            print(f"Warning: {invalid} pembacaan sensor tidak valid dilewati")
+            self.aggregator.drop(invalid)
+        return ingested
+
+
+# Fungsi untuk membaca file JSON lines yang terus ditambah (seperti tail -f)
+async def tail_jsonl(path, aggregator, offset=None, poll_interval=SENSOR_POLL_INTERVAL,
+                     chunk_size=SENSOR_CHUNK_SIZE, stop_event=None):
+    """
+    offset: posisi byte awal pembacaan (0 untuk dari awal file); default akhir file, yaitu hanya
+            pembacaan baru
+    stop_event: asyncio.Event opsional untuk menghentikan pembacaan
+
+    File lokal dibaca per potongan secara langsung (read pada file lokal tidak memblokir lama).
+    Jika file dipotong (ukurannya mengecil), pembacaan diulang dari awal. Jika file dirotasi
+    (path menunjuk ke inode lain, misalnya logrotate yang me-rename file lama), sisa file lama
+    dihabiskan dulu lalu path dibuka ulang dari awal; selama path belum ada, pembacaan menunggu.
+    """
+    parser = LineParser(aggregator)
+    file = open(path, 'rb')
+    try:
+        if offset is None:
+            file.seek(0, os.SEEK_END)
+        else:
+            file.seek(offset)
+        identity = os.fstat(file.fileno())
+        while stop_event is None or not stop_event.is_set():
+            chunk = file.read(chunk_size)
+            if chunk:
+                parser.feed(chunk)
+                await asyncio.sleep(0)
+                continue
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                await asyncio.sleep(poll_interval)
+                continue
+            if (current.st_ino, current.st_dev) != (identity.st_ino, identity.st_dev):
+                # File lama sudah habis dibaca: lanjut ke file baru di path yang sama
+                parser.flush()
+                try:
+                    new_file = open(path, 'rb')
+                except FileNotFoundError:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                file.close()
+                file = new_file
+                identity = os.fstat(file.fileno())
+                parser = LineParser(aggregator)
+                continue
+            if current.st_size < file.tell():
+                file.seek(0)
+                parser = LineParser(aggregator)
+                continue
+            await asyncio.sleep(poll_interval)
+        parser.flush()
+    finally:
+        file.close()
+
+
+# Fungsi untuk membuka server socket lokal yang menerima pembacaan sensor
+async def serve_socket(aggregator, host='127.0.0.1', port=0, unix_path=None, chunk_size=SENSOR_CHUNK_SIZE):
+    """
+    Setiap koneksi mengirim pembacaan sebagai JSON lines. Jika unix_path diisi, memakai Unix socket.
+
+    Return:
+    - objek asyncio.Server (alamatnya di server.sockets[0].getsockname()).
+    """
+    async def handle(reader, writer):
+        parser = LineParser(aggregator)
+        try:
+            while chunk := await reader.read(chunk_size):
+                parser.feed(chunk)
+            parser.flush()
+        finally:
+            writer.close()
+
+    if unix_path:
+        return await asyncio.start_unix_server(handle, unix_path)
+    return await asyncio.start_server(handle, host, port)
+
+
+# Fungsi untuk menjalankan pembaca sensor di thread latar dengan event loop sendiri
+def start_sensor_stream(aggregator, source, from_start=False):
+    """
+    source: path file JSON lines, 'tcp://host:port', atau 'unix:///path/socket'
+
+    Return:
+    - (stop, address): panggil stop() untuk menghentikan pembaca; address adalah alamat socket
+      yang dibuka (berguna untuk port 0), atau path file.
+
+    Error saat membuka socket (misalnya port sudah dipakai) diteruskan ke pemanggil; TimeoutError
+    jika pembaca belum siap dalam SENSOR_STARTUP_TIMEOUT detik.
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    # Posisi awal file ditentukan sekarang agar pembacaan yang ditulis setelah fungsi ini kembali tidak terlewat
+    offset = 0 if from_start or source.startswith(('tcp://', 'unix://')) else os.path.getsize(source)
+    state = {'address': source}
+
+    async def run():
+        stop_event = asyncio.Event()
+        state['stop_event'] = stop_event
+        server = None
+        try:
+            if source.startswith('unix://'):
+                server = await serve_socket(aggregator, unix_path=source[len('unix://'):])
+            elif source.startswith('tcp://'):
+                host, _, port = source[len('tcp://'):].rpartition(':')
+                server = await serve_socket(aggregator, host or '127.0.0.1', int(port))
+                state['address'] = 'tcp://%s:%d' % server.sockets[0].getsockname()[:2]
+        except Exception as error:
+            state['error'] = error
+            return
+        finally:
+            # Selalu memberi tahu pemanggil, termasuk saat gagal, agar ready.wait() tidak menunggu selamanya
+            ready.set()
+
+        if server is None:
+            await tail_jsonl(source, aggregator, offset=offset, stop_event=stop_event)
+        else:
+            async with server:
+                await stop_event.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    if not ready.wait(SENSOR_STARTUP_TIMEOUT):
+        raise TimeoutError(f"Pembaca sensor untuk {source} belum siap setelah {SENSOR_STARTUP_TIMEOUT} detik")
+    if 'error' in state:
+        thread.join()
+        loop.close()
+        raise state['error']
+
+    def stop():
+        loop.call_soon_threadsafe(state['stop_event'].set)
+        thread.join()
+        loop.close()
+
+    return stop, state['address']
+
+
+# Fungsi untuk membuat data model berisi depot dan tempat sampah yang perlu diambil
+def pickup_data_model(data, aggregator, threshold=None, horizon_seconds=0):
+    """
+    data: data model lengkap (indeks node sama dengan nomor tempat sampah sensor)
+
+    Return:
+    - (pickup_data, nodes): data model baru dengan volume dari vektor sensor terkini, dan nomor
+      node asal untuk setiap indeks di pickup_data (indeks rute bisa dipetakan kembali dengan nodes[i]).
+    """
+    depot = data['depot']
+    selected = aggregator.select_pickups(threshold, horizon_seconds)
+    nodes = np.union1d([depot], selected)
+    demands = aggregator.demand_vector()
+
+    pickup_data = dict(data)
+    pickup_data.pop('inventory', None)  # Inventaris penuh tidak lagi sesuai dengan indeks node terpilih
+    for key in ('locations', 'pickup_schedule', 'schedule_mask'):
+        if key in data:
+            pickup_data[key] = np.asarray(data[key])[nodes].tolist()
+    pickup_data['demands'] = demands[nodes].tolist()
+    pickup_data['demands'][int(np.searchsorted(nodes, depot))] = 0
+    pickup_data['depot'] = int(np.searchsorted(nodes, depot))
+    return pickup_data, nodes.tolist()
+
+
+# Fungsi untuk meneruskan volume terkini dan pilihan pengambilan ke IncrementalPlanner
+def apply_to_planner(planner, aggregator, threshold=None, horizon_seconds=0):
+    """
+    Tempat sampah di bawah ambang dilewati (skip_bin) dan sisanya diaktifkan dengan volume terkini,
+    sehingga planner.plan() berikutnya hanya melayani tempat sampah yang perlu diambil.
+
+    Return:
+    - list nomor node yang akan diambil.
+    """
+    selected = set(aggregator.select_pickups(threshold, horizon_seconds).tolist())
+    demands = aggregator.demand_vector()
+    for node in range(1, min(len(planner.locations), aggregator.num_bins + 1)):
+        if node == planner.depot:
+            continue
+        planner.update_demand(node, int(demands[node]))
+        planner.skip_bin(node, skipped=node not in selected)
+    return sorted(selected)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingest pembacaan sensor tingkat isi tempat sampah')
+    parser.add_argument('source', help="File JSON lines, 'tcp://host:port', atau 'unix:///path/socket'")
+    parser.add_argument('--num-bins', type=int, required=True)
+    parser.add_argument('--threshold', type=float, default=SENSOR_PICKUP_THRESHOLD)
+    parser.add_argument('--horizon', type=float, default=0, help='Horizon proyeksi laju pengisian (detik)')
+    parser.add_argument('--from-start', action='store_true', help='Baca file dari awal')
+    parser.add_argument('--interval', type=float, default=5, help='Jeda laporan status (detik)')
+    args = parser.parse_args()
+
+    aggregator = SensorAggregator(args.num_bins, threshold=args.threshold)
+    stop, address = start_sensor_stream(aggregator, args.source, from_start=args.from_start)
+    print(f"Membaca pembacaan sensor dari {address}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            nodes = aggregator.select_pickups(horizon_seconds=args.horizon)
+            print(f"{aggregator.received} pembacaan ({aggregator.dropped} dibuang), "
+                  f"{len(nodes)} tempat sampah perlu diambil: {nodes[:20].tolist()}")
+    except KeyboardInterrupt:
+        stop()
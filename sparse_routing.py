@@ -0,0 +1,306 @@
+"""
+Mode sparse untuk instance besar: hanya arc ke k tetangga terdekat yang dipertimbangkan.
+
+Untuk ribuan tempat sampah, matriks penuh N x N mahal untuk diambil dari OSRM dan disimpan, dan
+OR-Tools menelusuri semua arc padahal rute yang baik hampir selalu berpindah ke tempat sampah
+terdekat. Pada mode ini:
+- BallTree (metrik haversine) memilih k tetangga terdekat setiap tempat sampah sebagai kandidat
+  arc (dibuat simetris), ditambah arc dari dan ke depot dan arc tur awal (tetangga terdekat);
+- hanya sel kandidat yang diminta dari backend jarak: tempat sampah dikelompokkan per blok
+  spasial dan setiap blok meminta submatriks ke gabungan tetangganya;
+- domain NextVar setiap tempat sampah dibatasi ke kandidatnya (dan akhir rute), sehingga solver
+  tidak menelusuri arc lain. Heuristik solusi awal OR-Tools sering buntu pada graf sparse, jadi
+  pencarian dimulai dari tur awal yang dipotong sesuai kapasitas truk lalu diperbaiki dengan
+  local search;
+- arc di luar kandidat yang tetap ditanyakan solver diestimasi saat itu juga dari jarak garis
+  lurus dikalikan faktor jalan. Sampai SPARSE_CALLBACK_CACHE_SIZE node, OR-Tools menyimpan
+  hasilnya di C++ sehingga setiap arc hanya diestimasi sekali.
+
+Dengan restrict_arcs=False domain tidak dibatasi: local search OR-Tools tidak memakai domain
+NextVar saat membuat langkah, sehingga pembatasan membuang banyak langkah dan hasilnya sedikit
+lebih panjang pada batas waktu yang sama. Arc estimasi yang akhirnya terpakai diambil jarak
+tepatnya dari backend setelah solve.
+
+Dipakai lewat calculate_sparse_route, atau calculate_route dengan data['sparse_neighbors'] = k.
+"""
+import math
+import os
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+from sklearn.neighbors import BallTree
+
+from distance_backend import DEFAULT_ROAD_FACTOR, get_distance_backend
+from geometry import METERS_PER_DEGREE
+from metrics import current_span, traced
+from optimalisasi_rute_truk_sampah import INVALID_ROUTE_PENALTY, build_search_parameters, record_solver_statistics
+from planning_jobs import watch_cancellation
+
+# Jumlah tetangga terdekat default per tempat sampah
+DEFAULT_NEIGHBORS = int(os.environ.get('SPARSE_NEIGHBORS', 10))
+
+# Sampai jumlah node ini OR-Tools menyimpan hasil callback jarak di C++ (int64 per arc), sehingga
+# callback Python hanya dipanggil sekali per arc
+SPARSE_CALLBACK_CACHE_SIZE = int(os.environ.get('SPARSE_CALLBACK_CACHE_SIZE', 3000))
+
+# Jumlah tempat sampah asal per permintaan submatriks
+DEFAULT_SOURCE_BLOCK = 50
+
+
+# Fungsi untuk membuat tur awal tetangga terdekat (jarak garis lurus) dari depot
+def nearest_neighbor_tour(locations, depot=0, tree=None):
+    """
+    Dari setiap tempat sampah, lanjut ke tempat sampah terdekat yang belum dikunjungi. Pencarian
+    memakai BallTree dengan jumlah tetangga yang digandakan sampai ditemukan yang belum dikunjungi.
+
+    Return:
+    - array urutan tempat sampah (tanpa depot).
+    """
+    points = np.radians(np.asarray(locations, dtype=np.float64).reshape(-1, 2))
+    bins = np.array([node for node in range(len(points)) if node != depot], dtype=np.int64)
+    if len(bins) == 0:
+        return bins
+    tree = tree or BallTree(points[bins], metric='haversine')
+    visited = np.zeros(len(bins), dtype=bool)
+    order = []
+    current = points[depot]
+    for _ in range(len(bins)):
+        k = 8
+        while True:
+            positions = tree.query(current[None, :], k=min(k, len(bins)), return_distance=False)[0]
+            unvisited = positions[~visited[positions]]
+            if len(unvisited) or k >= len(bins):
+                break
+            k *= 4
+        position = int(unvisited[0])
+        visited[position] = True
+        order.append(bins[position])
+        current = points[bins[position]]
+    return np.array(order, dtype=np.int64)
+
+
+# Fungsi untuk memilih kandidat arc dari k tetangga terdekat
+def candidate_neighbors(locations, k=DEFAULT_NEIGHBORS, depot=0, tour=None, tree=None):
+    """
+    tour: urutan tempat sampah (misalnya nearest_neighbor_tour) yang arc berurutannya ikut
+          menjadi kandidat, sehingga graf kandidat selalu memuat satu tur lengkap
+
+    Return:
+    - list berisi array indeks node tujuan kandidat untuk setiap node (terurut). Arc dibuat
+      simetris: jika j tetangga i maka i juga kandidat dari j. Depot tidak termasuk, karena
+      arc dari dan ke depot selalu diizinkan.
+    """
+    points = np.radians(np.asarray(locations, dtype=np.float64).reshape(-1, 2))
+    bins = np.array([node for node in range(len(points)) if node != depot], dtype=np.int64)
+    candidates = [set() for _ in range(len(points))]
+
+    def connect(node, neighbour):
+        candidates[node].add(neighbour)
+        candidates[neighbour].add(node)
+
+    k = min(k, len(bins) - 1)
+    if k > 0:
+        tree = tree or BallTree(points[bins], metric='haversine')
+        positions = tree.query(points[bins], k=k + 1, return_distance=False)
+        for node, neighbours in zip(bins.tolist(), bins[positions[:, 1:]].tolist()):
+            for neighbour in neighbours:
+                connect(node, neighbour)
+
+    if tour is not None:
+        tour = np.asarray(tour).tolist()
+        for node, neighbour in zip(tour, tour[1:]):
+            connect(node, neighbour)
+    return [np.array(sorted(nodes), dtype=np.int64) for nodes in candidates]
+
+
+# Fungsi untuk mengelompokkan node menjadi blok yang berdekatan secara spasial
+def _spatial_blocks(locations, nodes, block_size):
+    """
+    Node diurutkan per lintang menjadi pita, lalu per bujur (zig-zag) di dalam pita. Lebar pita
+    dipilih agar setiap blok berbentuk kira-kira persegi.
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    points = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+    if len(nodes) == 0:
+        return []
+    num_strips = max(1, math.ceil(math.sqrt(len(nodes) / block_size)))
+    ordered = []
+    for number, strip in enumerate(np.array_split(nodes[np.argsort(points[nodes, 0], kind='stable')], num_strips)):
+        strip = strip[np.argsort(points[strip, 1], kind='stable')]
+        ordered.append(strip[::-1] if number % 2 else strip)
+    ordered = np.concatenate(ordered)
+    return [ordered[start:start + block_size] for start in range(0, len(ordered), block_size)]
+
+
+# Fungsi untuk membuat rute awal dari tur strip yang dipotong sesuai kapasitas kendaraan
+def initial_routes(data, order):
+    """
+    Return:
+    - list rute (tanpa depot) per kendaraan, atau None jika kapasitas kendaraan tidak cukup
+      untuk menampung seluruh tur secara berurutan.
+    """
+    demands = data['demands']
+    routes = [[] for _ in range(data['num_vehicles'])]
+    vehicle_id, load = 0, 0
+    for node in order.tolist():
+        while vehicle_id < len(routes) and load + demands[node] > data['vehicle_capacities'][vehicle_id]:
+            vehicle_id, load = vehicle_id + 1, 0
+        if vehicle_id == len(routes):
+            return None
+        routes[vehicle_id].append(node)
+        load += demands[node]
+    return routes
+
+
+# Fungsi untuk mengambil jarak arc kandidat dari backend jarak
+@traced('sparse_distances')
+def sparse_distances(locations, candidates, backend=None, depot=0, block_size=DEFAULT_SOURCE_BLOCK):
+    """
+    Return:
+    - (arc_costs, requested_cells): arc_costs adalah list dict {tujuan: jarak integer meter}
+      per node asal, berisi arc kandidat serta arc dari dan ke depot; requested_cells adalah
+      jumlah sel yang diminta dari backend.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend)
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+    arc_costs = [{} for _ in range(len(locations))]
+    requested_cells = 0
+
+    # Depot ke semua node dan semua node ke depot
+    everything = locations.tolist()
+    from_depot, _ = backend.submatrix([everything[depot]], everything)
+    to_depot, _ = backend.submatrix(everything, [everything[depot]])
+    requested_cells += 2 * len(locations)
+    for node in range(len(locations)):
+        arc_costs[depot][node] = int(round(float(from_depot[0, node])))
+        arc_costs[node][depot] = int(round(float(to_depot[node, 0])))
+
+    bins = [node for node in range(len(locations)) if node != depot]
+    for block in _spatial_blocks(locations, bins, block_size):
+        destinations = np.unique(np.concatenate([candidates[node] for node in block]))
+        if len(destinations) == 0:
+            continue
+        distances, _ = backend.submatrix(locations[block].tolist(), locations[destinations].tolist())
+        requested_cells += distances.size
+        column = {int(node): position for position, node in enumerate(destinations)}
+        for row, node in enumerate(block.tolist()):
+            for neighbour in candidates[node].tolist():
+                arc_costs[node][neighbour] = int(round(float(distances[row, column[neighbour]])))
+    return arc_costs, requested_cells
+
+
+# Fungsi untuk menghitung rute dengan kandidat arc k tetangga terdekat
+@traced('calculate_sparse_route', profile=True)
+def calculate_sparse_route(data, backend=None, solver_options=None, neighbors=None, restrict_arcs=None):
+    """
+    Sama seperti calculate_route, tetapi hanya arc ke `neighbors` tetangga terdekat (default:
+    data['sparse_neighbors'] atau DEFAULT_NEIGHBORS) yang diambil jaraknya dari backend.
+
+    restrict_arcs: batasi solver ke arc kandidat (default: data['sparse_restrict_arcs'] atau
+                   True). Jika False, arc lain boleh dipakai dengan jarak estimasi.
+
+    Return:
+    - (route, total_distance) seperti calculate_route; (None, 0) jika tidak ada solusi.
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend or data.get('distance_backend'))
+    neighbors = neighbors or data.get('sparse_neighbors') or DEFAULT_NEIGHBORS
+    if restrict_arcs is None:
+        restrict_arcs = data.get('sparse_restrict_arcs', True)
+    locations = np.asarray(data['locations'], dtype=np.float64).reshape(-1, 2)
+    depot = data['depot']
+    num_nodes = len(locations)
+
+    bins = np.array([node for node in range(num_nodes) if node != depot], dtype=np.int64)
+    tree = BallTree(np.radians(locations[bins]), metric='haversine') if len(bins) else None
+    tour = nearest_neighbor_tour(locations, depot, tree)
+    candidates = candidate_neighbors(locations, neighbors, depot, tour, tree)
+    arc_costs, requested_cells = sparse_distances(locations, candidates, backend, depot)
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, data['num_vehicles'], depot)
+    model_parameters = pywrapcp.DefaultRoutingModelParameters()
+    model_parameters.max_callback_cache_size = SPARSE_CALLBACK_CACHE_SIZE
+    routing = pywrapcp.RoutingModel(manager, model_parameters)
+    index_to_node = [manager.IndexToNode(index) for index in range(routing.Size() + routing.vehicles())]
+
+    # Estimasi untuk arc di luar kandidat: proyeksi datar lokal (cukup untuk skala kota) x faktor jalan
+    scale = METERS_PER_DEGREE * DEFAULT_ROAD_FACTOR
+    x = (locations[:, 1] * math.cos(math.radians(float(locations[:, 0].mean())))).tolist()
+    y = locations[:, 0].tolist()
+    estimated_arcs = 0
+
+    def distance_callback(from_index, to_index):
+        nonlocal estimated_arcs
+        from_node, to_node = index_to_node[from_index], index_to_node[to_index]
+        cost = arc_costs[from_node].get(to_node)
+        if cost is None:
+            if from_node == to_node:
+                return 0
+            estimated_arcs += 1
+            cost = int(scale * math.hypot(x[to_node] - x[from_node], y[to_node] - y[from_node]))
+        return cost
+
+    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    demands = np.asarray(data['demands'], dtype=np.int64)
+    demand_callback_index = routing.RegisterUnaryTransitVector(demands.tolist())
+    routing.AddDimensionWithVehicleCapacity(
+        demand_callback_index,
+        0,  # Tidak ada slack
+        data['vehicle_capacities'],
+        True,
+        'Capacity'
+    )
+
+    search_parameters = build_search_parameters(solver_options or data.get('solver_options'))
+    routing.CloseModelWithParameters(search_parameters)
+
+    # Domain NextVar tempat sampah dibatasi ke kandidat dan akhir rute semua kendaraan
+    candidate_arcs = sum(len(nodes) for nodes in candidates)
+    if restrict_arcs:
+        ends = [routing.End(vehicle_id) for vehicle_id in range(data['num_vehicles'])]
+        for node in bins.tolist():
+            allowed = [manager.NodeToIndex(int(neighbour)) for neighbour in candidates[node]] + ends
+            routing.NextVar(manager.NodeToIndex(node)).SetValues(allowed)
+
+    # Tur awal sebagai solusi awal; jika tidak muat, memakai heuristik solusi awal biasa
+    routes = initial_routes(data, tour)
+    initial = routing.ReadAssignmentFromRoutes(routes, True) if routes is not None else None
+    watch_cancellation(routing)
+    if initial is not None:
+        solution = routing.SolveFromAssignmentWithParameters(initial, search_parameters)
+    else:
+        solution = routing.SolveWithParameters(search_parameters)
+    record_solver_statistics(routing, solution, num_nodes)
+
+    if not solution:
+        current_span().set(neighbors=neighbors, candidate_arcs=candidate_arcs, requested_cells=requested_cells,
+                           estimated_arcs=estimated_arcs)
+        return None, 0
+
+    route = []
+    for vehicle_id in range(data['num_vehicles']):
+        index = routing.Start(vehicle_id)
+        while not routing.IsEnd(index):
+            route.append(manager.IndexToNode(index))
+            index = solution.Value(routing.NextVar(index))
+        route.append(manager.IndexToNode(index))
+
+    # Arc estimasi yang terpakai diganti jarak tepat dari backend
+    arcs = [(from_node, to_node) for from_node, to_node in zip(route, route[1:])
+            if from_node != to_node and not (from_node == depot and to_node == depot)]
+    estimated_used = [(from_node, to_node) for from_node, to_node in arcs if to_node not in arc_costs[from_node]]
+    for from_node, to_node in estimated_used:
+        distances, _ = backend.submatrix([locations[from_node].tolist()], [locations[to_node].tolist()])
+        arc_costs[from_node][to_node] = int(round(float(distances[0, 0])))
+    requested_cells += len(estimated_used)
+
+    invalid_arcs = sum(1 for from_node, to_node in arcs if arc_costs[from_node][to_node] >= INVALID_ROUTE_PENALTY)
+    if invalid_arcs:
+        print(f"Warning: Rute sparse memakai {invalid_arcs} pasangan lokasi tanpa rute valid")
+    current_span().set(neighbors=neighbors, candidate_arcs=candidate_arcs, requested_cells=requested_cells,
+                       estimated_arcs=estimated_arcs, estimated_arcs_used=len(estimated_used),
+                       restrict_arcs=restrict_arcs)
+    return route, sum(arc_costs[from_node][to_node] for from_node, to_node in arcs)
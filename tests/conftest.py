@@ -0,0 +1,63 @@
+"""
+Fixture bersama untuk pengujian: server OSRM tiruan, klien OSRM, dan cache rute di memori.
+
+Semua fixture mengganti objek bersama (set_osrm_client / set_route_cache) dan mengembalikan
+objek sebelumnya setelah test selesai, sehingga tidak ada test yang menyentuh server OSRM
+publik atau file cache di disk.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import osrm_client as osrm_client_module  # noqa: E402
+import route_cache as route_cache_module  # noqa: E402
+from mock_osrm import start_mock_osrm  # noqa: E402
+from osrm_client import OSRMClient, set_osrm_client  # noqa: E402
+from route_cache import RouteCache, set_route_cache  # noqa: E402
+
+
+@pytest.fixture
+def mock_osrm():
+    """(server, base_url) server OSRM tiruan; server.request_count menghitung request yang masuk."""
+    server, base_url = start_mock_osrm()
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def route_cache():
+    """Cache rute ':memory:' yang dipasang sebagai cache bersama."""
+    previous = route_cache_module._default_cache
+    cache = RouteCache(':memory:')
+    set_route_cache(cache)
+    yield cache
+    set_route_cache(previous)
+
+
+@pytest.fixture
+def osrm_client(mock_osrm, route_cache):
+    """Klien OSRM ke server tiruan (tanpa jeda backoff) yang dipasang sebagai klien bersama."""
+    previous = osrm_client_module._default_client
+    client = OSRMClient(base_url=mock_osrm[1], max_concurrency=4, backoff_factor=0)
+    set_osrm_client(client)
+    yield client
+    set_osrm_client(previous)
+    client.close()
+
+
+@pytest.fixture
+def unreachable_osrm(route_cache):
+    """Klien OSRM bersama yang mengarah ke port tanpa server (semua request gagal koneksi)."""
+    server, base_url = start_mock_osrm()
+    server.shutdown()
+    server.server_close()
+    previous = osrm_client_module._default_client
+    client = OSRMClient(base_url=base_url, max_retries=0, timeout=1, backoff_factor=0)
+    set_osrm_client(client)
+    yield client
+    set_osrm_client(previous)
+    client.close()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from geometry import METERS_PER_DEGREE, sample_along, simplify_polyline
+
+DEPOT = [-6.2088, 106.8456]
+
+
+# Fungsi untuk membuat polyline zig-zag kecil di sepanjang garis lurus ke timur
+def zigzag(points=400, amplitude_m=1.0):
+    lng = DEPOT[1] + np.linspace(0, 0.02, points)
+    lat = DEPOT[0] + np.where(np.arange(points) % 2, amplitude_m / METERS_PER_DEGREE, 0)
+    return np.column_stack([lat, lng])
+
+
+def test_simplify_drops_points_within_tolerance_and_keeps_ends():
+    path = zigzag(amplitude_m=1.0)
+
+    simplified = simplify_polyline(path, tolerance=5)
+
+    assert len(simplified) == 2
+    np.testing.assert_array_equal(simplified, path[[0, -1]])
+    assert len(simplify_polyline(zigzag(amplitude_m=20.0), tolerance=5)) == 400
+    assert len(simplify_polyline(path, tolerance=0)) == 400
+
+
+def test_sample_along_is_evenly_spaced_by_distance():
+    # Titik rapat di awal dan jarang di akhir: sampling tetap merata menurut jarak tempuh
+    lng = DEPOT[1] + np.concatenate([np.linspace(0, 0.001, 50), [0.01]])
+    path = np.column_stack([np.full(len(lng), DEPOT[0]), lng])
+
+    positions = sample_along(path, 11)
+
+    np.testing.assert_allclose(np.diff(positions[:, 1]), 0.001, atol=1e-12)
+    np.testing.assert_array_equal(positions[[0, -1]], path[[0, -1]])
+    assert sample_along(path, 0).shape == (0, 2)
+
+
+def test_marker_animation_moves_only_the_truck_within_time_budget():
+    dashboard = pytest.importorskip('dashboard')
+    legs = [path.tolist() for path in np.array_split(zigzag(3000), 3)]
+
+    fig = dashboard.generate_animation([DEPOT], [0, 0], 0, legs=legs, mode='marker', time_budget_ms=6000)
+
+    assert len(fig.frames) == 6000 // dashboard.ANIMATION_FRAME_DURATION_MS
+    assert all(frame.traces == (2,) and len(frame.data[0].lat) == 1 for frame in fig.frames)
+    # Garis rute dikirim sekali dan sudah disederhanakan
+    assert len(fig.data[0].lat) < 100
+    assert fig.frames[-1].data[0].lon[0] == pytest.approx(legs[-1][-1][1])
+
+
+def test_cumulative_mode_is_still_available():
+    dashboard = pytest.importorskip('dashboard')
+    legs = [zigzag(20).tolist()]
+
+    fig = dashboard.generate_animation([DEPOT], [0, 0], 0, legs=legs, mode='cumulative')
+
+    assert len(fig.frames) == 20
+    assert len(fig.frames[-1].data[0].lat) == 20
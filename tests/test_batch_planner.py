@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from batch_planner import LANDFILL_BIN_ID, date_range, depot_demand_provider, plan_batch
+from bin_inventory import create_bin_inventory
+from distance_backend import HaversineBackend
+
+LANDFILL = [-6.25, 106.85]
+SOLVER_OPTIONS = {'time_limit_seconds': 1}
+
+
+# Fungsi untuk membuat inventaris satu depot: depot dan enam tempat sampah yang diambil setiap hari
+def make_inventory(offset=0.0, first_bin_id=0):
+    lat = np.array([-6.2088, -6.2154, -6.2202, -6.2255, -6.2308, -6.2356, -6.2402]) + offset
+    lng = np.array([106.8456, 106.8424, 106.8500, 106.8433, 106.8477, 106.8508, 106.8430])
+    return create_bin_inventory(lat, lng, bin_id=np.arange(first_bin_id, first_bin_id + 7))
+
+
+@pytest.fixture(scope='module')
+def batch():
+    inventories = {'utara': make_inventory(), 'selatan': make_inventory(-0.01, 100)}
+    dates = date_range('2024-06-03', '2024-06-04')
+    routes = plan_batch(inventories, dates, 'haversine', vehicle_capacities=[10, 10], landfill_location=LANDFILL,
+                        solver_options=SOLVER_OPTIONS, max_workers=2)
+    return inventories, routes
+
+
+def test_batch_plan_unloads_at_landfill_and_counts_return_leg(batch):
+    inventories, routes = batch
+
+    assert (routes['status'] == 'ok').all()
+    assert set(routes['date']) == {'2024-06-03', '2024-06-04'}
+    assert all(stops[-1] == LANDFILL_BIN_ID for stops in routes['stops'])
+    assert (routes['load'] <= 10).all()
+
+    for (depot_id, _), plan in routes.groupby(['depot_id', 'date']):
+        inventory = inventories[depot_id]
+        locations = np.vstack([np.column_stack([inventory['lat'], inventory['lng']]), LANDFILL])
+        distances = np.rint(HaversineBackend().matrix(locations)[0]).astype(int)
+        node = {int(bin_id): index for index, bin_id in enumerate(inventory['bin_id'])}
+        node[LANDFILL_BIN_ID] = len(inventory)
+
+        expected = 0
+        for _, vehicle_trips in plan.groupby('vehicle_id'):
+            for stops in vehicle_trips['stops']:
+                nodes = [node[bin_id] for bin_id in stops]
+                expected += sum(distances[a, b] for a, b in zip(nodes, nodes[1:]))
+            # Trip terakhir truk juga kembali dari TPA ke depot
+            expected += distances[len(inventory), 0]
+        assert plan['distance_m'].sum() == expected
+
+
+def test_depots_of_equal_size_get_different_synthetic_demand():
+    north = depot_demand_provider('utara', 6).demands(range(7))
+    south = depot_demand_provider('selatan', 6).demands(range(7))
+
+    assert not np.array_equal(north, south)
+    np.testing.assert_array_equal(depot_demand_provider('utara', 6).demands(range(7)), north)
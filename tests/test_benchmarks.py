@@ -0,0 +1,52 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from benchmarks import run_benchmarks
+from benchmarks.instances import DEPOT_LOCATION, generate_instance
+
+
+def test_generated_instance_is_seeded_and_fits_one_truck():
+    data = generate_instance(50, seed=3)
+
+    assert data == generate_instance(50, seed=3)
+    assert data != generate_instance(50, seed=4)
+    assert len(data['locations']) == len(data['demands']) == 51
+    assert data['locations'][0] == DEPOT_LOCATION and data['demands'][0] == 0
+    assert data['vehicle_capacities'] == [sum(data['demands'])]
+    assert np.abs(np.asarray(data['locations']) - DEPOT_LOCATION).max() <= 0.05
+
+
+def test_regressions_respect_tolerance_and_minimum_change():
+    baseline = {'instance[10]': {'solve_s': 1.0, 'matrix_cold_s': 0.01, 'cost_m': 1000.0, 'solver': 'monolithic'}}
+    results = {'instance[10]': {'solve_s': 1.5, 'matrix_cold_s': 0.03, 'cost_m': 1100.0, 'solver': 'decomposed'},
+               'instance[100]': {'solve_s': 9.0}}
+
+    regressions = run_benchmarks.find_regressions(results, baseline, tolerance=0.2)
+
+    # matrix_cold_s naik 3x tetapi di bawah selisih minimum; cost_m hanya naik 10%
+    assert regressions == [('instance[10]', 'solve_s', 1.0, 1.5)]
+
+
+def test_suite_writes_results_and_passes_against_its_own_baseline(tmp_path, monkeypatch, route_cache):
+    output = tmp_path / 'hasil.json'
+    arguments = ['run_benchmarks', '--sizes', '10', '--no-memory', '--no-dashboard']
+    monkeypatch.setattr(sys, 'argv', arguments + ['--output', str(output)])
+    run_benchmarks.main()
+
+    report = json.loads(output.read_text())
+    metrics = report['results']['instance[10]']
+    assert metrics['solver'] == 'monolithic' and metrics['matrix_backend'] == 'osrm-exact'
+    assert metrics['cost_m'] > 0 and report['meta']['osrm_requests'] > 0
+
+    monkeypatch.setattr(sys, 'argv', arguments + ['--output', str(tmp_path / 'baru.json'), '--baseline', str(output)])
+    run_benchmarks.main()
+
+    # Baseline dengan biaya rute setengahnya membuat run berikutnya gagal sebagai regresi
+    report['results']['instance[10]']['cost_m'] /= 2
+    output.write_text(json.dumps(report))
+    with pytest.raises(SystemExit) as exit_info:
+        run_benchmarks.main()
+    assert exit_info.value.code == 1
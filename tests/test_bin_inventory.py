@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bin_inventory import (
+    EVERY_DAY_MASK,
+    create_bin_inventory,
+    day_selection,
+    filter_inventory_by_day,
+    load_bin_inventory,
+    schedule_to_mask,
+)
+from optimalisasi_rute_truk_sampah import create_data_model, data_model_from_inventory, filter_locations_by_day
+
+INVENTORY = create_bin_inventory(
+    lat=[-6.20, -6.21, -6.22, -6.23, -6.24], lng=[106.80, 106.81, 106.82, 106.83, 106.84],
+    pickup_schedule=[0, 2, 0, 2, 7])
+
+
+# Fungsi untuk membaca hari-hari (0: Senin) yang menyala di sebuah bitmask
+def mask_days(mask):
+    return [day for day in range(7) if int(mask) >> day & 1]
+
+
+@pytest.mark.parametrize('schedule, days', [
+    (0, [0, 1, 2, 3, 4, 5, 6]),
+    (1, [0, 1, 2, 3, 4, 5, 6]),
+    (2, [1, 3, 5]),
+    (3, [2, 5]),
+    (7, [6]),
+])
+def test_schedule_to_mask_semantics(schedule, days):
+    assert mask_days(schedule_to_mask([schedule])[0]) == days
+
+
+def test_schedule_to_mask_is_vectorised():
+    masks = schedule_to_mask([0, 1, 2, 0, 1, 2, 0, 1])
+
+    assert masks.dtype == np.uint8
+    assert masks.tolist() == [EVERY_DAY_MASK, EVERY_DAY_MASK, 0b0101010] * 2 + [EVERY_DAY_MASK, EVERY_DAY_MASK]
+
+
+def test_day_selection_wraps_week():
+    masks = schedule_to_mask([0, 2, 7])
+
+    assert day_selection(masks, 1).tolist() == [True, True, False]
+    assert day_selection(masks, 6).tolist() == [True, False, True]
+    assert day_selection(masks, 8).tolist() == day_selection(masks, 1).tolist()
+
+
+@pytest.mark.parametrize('day', range(7))
+def test_filter_locations_by_day_keeps_depot_and_scheduled_bins(day):
+    data = create_data_model(day)
+    scheduled = day_selection(data['schedule_mask'], day)
+    scheduled[0] = True
+    expected_locations = np.asarray(data['locations'])[scheduled].tolist()
+    expected_demands = np.asarray(data['demands'])[scheduled].tolist()
+
+    filtered = filter_locations_by_day(data, day)
+
+    assert filtered['locations'][filtered['depot']] == [-6.2088, 106.8456]
+    assert filtered['locations'] == expected_locations
+    assert filtered['demands'] == expected_demands
+    assert len(filtered['schedule_mask']) == len(filtered['locations'])
+
+
+def test_filter_locations_by_day_without_mask_uses_legacy_schedule():
+    data = create_data_model(0)
+    expected = filter_locations_by_day(dict(data), 1)
+    del data['schedule_mask']
+
+    assert filter_locations_by_day(data, 1)['locations'] == expected['locations']
+
+
+def test_data_model_from_inventory_keeps_only_bitmask_schedule():
+    data = data_model_from_inventory(INVENTORY, 0)
+
+    assert 'pickup_schedule' not in data
+    assert data['schedule_mask'] == INVENTORY['schedule_mask'].tolist()
+
+
+@pytest.mark.parametrize('day', range(7))
+def test_filter_inventory_data_model_matches_list_filter(day):
+    data = data_model_from_inventory(INVENTORY, day)
+    expected = filter_locations_by_day({key: value for key, value in data.items() if key != 'inventory'}, day)
+
+    filtered = filter_locations_by_day(data, day)
+
+    assert 'inventory' not in filtered
+    assert filtered == expected
+
+
+def test_filter_inventory_by_day_puts_depot_first():
+    inventory = create_bin_inventory(
+        lat=[-6.20, -6.21, -6.22, -6.23], lng=[106.80, 106.81, 106.82, 106.83],
+        pickup_schedule=[2, 0, 2, 7])
+
+    view = filter_inventory_by_day(inventory, 6)
+
+    assert view.indices.tolist() == [0, 1, 3]
+    assert len(view) == 3
+    np.testing.assert_array_equal(view.locations(), [[-6.20, 106.80], [-6.21, 106.81], [-6.23, 106.83]])
+
+
+def test_load_bin_inventory_reads_legacy_schedule(tmp_path):
+    path = tmp_path / 'bins.csv'
+    pd.DataFrame({
+        'bin_id': [10, 11, 12],
+        'lat': [-6.2, -6.21, -6.22],
+        'lng': [106.8, 106.81, 106.82],
+        'pickup_schedule': [0, 2, 3],
+    }).to_csv(path, index=False)
+
+    inventory = load_bin_inventory(path)
+
+    assert inventory['bin_id'].tolist() == [10, 11, 12]
+    assert inventory['schedule_mask'].tolist() == schedule_to_mask([0, 2, 3]).tolist()
+    assert (inventory['capacity'] == 0).all()
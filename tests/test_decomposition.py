@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from decomposition import _fill_leg_distances, solve_decomposed
+from distance_backend import HaversineBackend
+
+SOLVER_OPTIONS = {'time_limit_seconds': 1}
+
+
+# Fungsi untuk membuat data model acak di sekitar depot dengan seed tetap
+def make_data(num_bins=24, seed=0):
+    rng = np.random.default_rng(seed)
+    depot = np.array([-6.2088, 106.8456])
+    locations = np.vstack([depot, depot + rng.uniform(-0.03, 0.03, size=(num_bins, 2))])
+    return {
+        'locations': locations.tolist(),
+        'demands': [0] + rng.integers(1, 6, size=num_bins).tolist(),
+        'vehicle_capacities': [25],
+        'depot': 0,
+    }
+
+
+class CountingBackend(HaversineBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def submatrix(self, origins, destinations):
+        self.calls.append((len(origins), len(destinations)))
+        return super().submatrix(origins, destinations)
+
+
+def test_route_distances_are_sums_of_solver_legs():
+    data = make_data()
+    result = solve_decomposed(data, num_clusters=3, backend='haversine', solver_options=SOLVER_OPTIONS, max_workers=2)
+
+    distances = np.rint(HaversineBackend().matrix(data['locations'])[0]).astype(int)
+    for route, route_distance in zip(result['routes'], result['route_distances']):
+        assert route_distance == sum(distances[a, b] for a, b in zip(route, route[1:]))
+    assert result['total_distance'] == sum(result['route_distances'])
+    assert sorted(node for route in result['routes'] for node in route[1:-1]) == list(range(1, 25))
+    assert result['unrouted'] == []
+
+
+def test_bins_of_unsolvable_cluster_are_returned_as_unrouted():
+    data = make_data(num_bins=8)
+    data['demands'][3] = 30  # Melebihi kapasitas satu truk, klasternya tidak memiliki solusi
+
+    result = solve_decomposed(data, num_clusters=2, backend='haversine', solver_options=SOLVER_OPTIONS,
+                              max_workers=1, repair=False)
+
+    (unsolvable,) = [cluster for cluster in result['clusters'] if 3 in cluster]
+    assert result['unrouted'] == sorted(unsolvable)
+    routed = {node for route in result['routes'] for node in route[1:-1]}
+    assert routed.isdisjoint(result['unrouted'])
+    assert routed | set(result['unrouted']) == set(range(1, 9))
+
+
+def test_missing_legs_are_fetched_in_one_submatrix_call():
+    data = make_data(num_bins=4)
+    backend = CountingBackend()
+    known = {(0, 1): 10, (1, 2): 20, (2, 0): 30}
+
+    legs = _fill_leg_distances(data, [[0, 1, 3, 2, 0], [0, 0]], known, backend)
+
+    assert backend.calls == [(2, 2)]
+    assert (legs[(0, 1)], legs[(2, 0)]) == (10, 30)
+    expected = HaversineBackend().matrix(data['locations'])[0]
+    assert legs[(1, 3)] == pytest.approx(expected[1, 3], abs=0.5)
+    assert legs[(3, 2)] == pytest.approx(expected[3, 2], abs=0.5)
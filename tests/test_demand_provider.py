@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from demand_provider import DEMAND_PROFILES, DEFAULT_DEMAND_PROFILE, ReplayDemandProvider, SyntheticDemandProvider
+from optimalisasi_rute_truk_sampah import create_data_model, get_daily_demands
+
+
+def test_synthetic_demand_is_deterministic_per_seed_and_day():
+    provider = SyntheticDemandProvider(num_bins=50, seed=7)
+
+    week = provider.demands(range(7))
+
+    np.testing.assert_array_equal(SyntheticDemandProvider(num_bins=50, seed=7).demands(range(7)), week)
+    assert not np.array_equal(SyntheticDemandProvider(num_bins=50, seed=8).demands(range(7)), week)
+    # Volume satu hari tidak bergantung pada hari lain yang diminta bersamanya
+    np.testing.assert_array_equal(provider.demands([3]), week[[3]])
+    np.testing.assert_array_equal(provider.demands([6, 3, 3]), week[[6, 3, 3]])
+
+
+@pytest.mark.parametrize('day', range(14))
+def test_synthetic_demand_follows_daily_profile(day):
+    low, high = DEMAND_PROFILES.get(day % 7, DEFAULT_DEMAND_PROFILE)
+
+    demands = SyntheticDemandProvider(num_bins=200).demands([day])[0]
+
+    assert demands.min() >= low and demands.max() <= high
+
+
+def test_data_model_demands_are_reproducible():
+    assert create_data_model(2)['demands'] == create_data_model(2)['demands']
+    assert get_daily_demands(2)[0] == 0
+    assert len(get_daily_demands(2)) == len(create_data_model(2)['locations'])
+
+
+def test_replay_returns_recorded_history(tmp_path):
+    history = pd.DataFrame({'day': [0, 0, 1, 1, 3], 'bin': [1, 2, 1, 2, 2], 'demand': [4, 5, 6, 7, 8]})
+    path = tmp_path / 'history.csv'
+    history.to_csv(path, index=False)
+
+    provider = ReplayDemandProvider(str(path))
+
+    assert provider.num_bins == 2
+    assert provider.demands([1, 0]).tolist() == [[6, 7], [4, 5]]
+    # Tempat sampah tanpa catatan pada hari tersebut bervolume 0
+    assert provider.daily_demands(3) == [0, 0, 8]
+    with pytest.raises(KeyError):
+        provider.demands([2])
+
+
+def test_replay_loop_wraps_over_recorded_days():
+    history = pd.DataFrame({'day': [0, 1], 'bin': [1, 1], 'demand': [3, 9]})
+
+    provider = ReplayDemandProvider(history, loop=True)
+
+    assert provider.demands([2, 3, 5]).ravel().tolist() == [3, 9, 9]
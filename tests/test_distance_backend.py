@@ -0,0 +1,194 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from distance_backend import (
+    DistanceBackend,
+    FallbackBackend,
+    HaversineBackend,
+    OSRMBackend,
+    PrecomputedBackend,
+    WarmStartBackend,
+    calibrate_road_factor,
+    get_distance_backend,
+)
+from mock_osrm import ROAD_FACTOR, haversine
+from optimalisasi_rute_truk_sampah import INVALID_ROUTE_PENALTY, create_data_model
+from route_store import RoutePlanStore, build_plan, refine_plan
+
+LOCATIONS = create_data_model(0)['locations']
+
+# Hari contoh yang muatannya masih muat di satu truk (hari 0 tidak punya solusi)
+FEASIBLE_DAY = 5
+
+
+class FailingBackend(DistanceBackend):
+    name = 'failing'
+
+    def matrix(self, locations):
+        raise RuntimeError('server mati')
+
+
+class StaticBackend(DistanceBackend):
+    """Backend dengan matriks tetap, untuk memeriksa penggabungan sel oleh FallbackBackend."""
+
+    name = 'static'
+
+    def __init__(self, distances):
+        self.distances = np.asarray(distances, dtype=np.float64)
+
+    def matrix(self, locations):
+        return self.distances.copy(), self.distances / 10
+
+
+def test_haversine_matches_great_circle_distance():
+    distances, durations = HaversineBackend(road_factor=ROAD_FACTOR).matrix(LOCATIONS)
+
+    expected = np.array([[haversine(a[::-1], b[::-1]) * ROAD_FACTOR for b in LOCATIONS] for a in LOCATIONS])
+    np.testing.assert_allclose(distances, expected, rtol=1e-4, atol=0.5)
+    np.testing.assert_array_equal(np.diag(distances), 0)
+    np.testing.assert_allclose(distances, distances.T)
+    np.testing.assert_allclose(durations, distances / np.float32(30 / 3.6), rtol=1e-6)
+
+
+def test_haversine_blocks_match_single_block():
+    rng = np.random.default_rng(0)
+    locations = np.column_stack([rng.uniform(-6.4, -6.1, 600), rng.uniform(106.7, 107.0, 600)])
+    backend = HaversineBackend(dtype=np.float64)
+
+    distances = backend.distance_matrix(locations)
+    # Matriks persegi panjang tidak mengenolkan diagonal, jadi toleransinya sebesar galat titik yang sama
+    np.testing.assert_allclose(distances[:10], backend.distance_matrix(locations[:10], locations), atol=0.5)
+    np.testing.assert_allclose(distances[-10:], backend.distance_matrix(locations[-10:], locations), atol=0.5)
+
+
+def test_haversine_submatrix_is_matrix_slice():
+    backend = HaversineBackend()
+    distances, _ = backend.matrix(LOCATIONS)
+    sub_distances, _ = backend.submatrix(LOCATIONS[:2], LOCATIONS[2:])
+
+    np.testing.assert_allclose(sub_distances, distances[:2, 2:], rtol=1e-6)
+
+
+def test_fallback_replaces_failed_backend():
+    backend = FallbackBackend(FailingBackend(), HaversineBackend())
+
+    np.testing.assert_array_equal(backend.matrix(LOCATIONS)[0], HaversineBackend().matrix(LOCATIONS)[0])
+
+
+def test_fallback_fills_only_invalid_cells():
+    primary = np.full((len(LOCATIONS), len(LOCATIONS)), 1000.0)
+    primary[1, 2] = primary[2, 1] = INVALID_ROUTE_PENALTY
+    distances, durations = FallbackBackend(StaticBackend(primary), HaversineBackend()).matrix(LOCATIONS)
+
+    quick_distances, quick_durations = HaversineBackend().matrix(LOCATIONS)
+    assert distances[1, 2] == pytest.approx(quick_distances[1, 2])
+    assert durations[2, 1] == pytest.approx(quick_durations[2, 1])
+    assert distances[0, 1] == 1000.0
+    assert (distances < INVALID_ROUTE_PENALTY).all()
+
+
+def test_osrm_backend_uses_road_distances(osrm_client):
+    distances, _ = get_distance_backend('osrm').matrix(LOCATIONS)
+
+    assert calibrate_road_factor(LOCATIONS, distances) == pytest.approx(ROAD_FACTOR, rel=1e-3)
+
+
+def test_osrm_backend_falls_back_to_haversine_when_unreachable(unreachable_osrm):
+    distances, _ = get_distance_backend('osrm').matrix(LOCATIONS[:3])
+
+    np.testing.assert_allclose(distances, HaversineBackend().matrix(LOCATIONS[:3])[0])
+
+
+def test_unknown_backend_name():
+    with pytest.raises(ValueError):
+        get_distance_backend('euclidean')
+
+
+def test_precomputed_backend_serves_subsets():
+    distances, durations = HaversineBackend().matrix(LOCATIONS)
+    backend = PrecomputedBackend(LOCATIONS, distances, durations)
+    subset = [LOCATIONS[4], LOCATIONS[0], LOCATIONS[2]]
+
+    np.testing.assert_array_equal(backend.matrix(subset)[0], distances[np.ix_([4, 0, 2], [4, 0, 2])])
+    np.testing.assert_array_equal(backend.submatrix(subset[:1], LOCATIONS)[1], durations[[4]])
+    with pytest.raises(KeyError):
+        backend.matrix([[0.0, 0.0]])
+
+
+def test_warm_start_returns_quick_matrix_then_exact(osrm_client):
+    backend = WarmStartBackend(OSRMBackend(), HaversineBackend())
+
+    quick, _ = backend.matrix(LOCATIONS)
+    exact, _ = backend.refined(LOCATIONS, timeout=10)
+
+    np.testing.assert_array_equal(quick, HaversineBackend().matrix(LOCATIONS)[0])
+    np.testing.assert_allclose(exact, OSRMBackend().matrix(LOCATIONS)[0])
+    # Tanpa matrix() sebelumnya, refined menghitung matriks tepat secara langsung
+    np.testing.assert_allclose(backend.refined(LOCATIONS[:3])[0], exact[:3, :3])
+
+
+def test_warm_start_keeps_bounded_pending_and_cancels_stale_loads():
+    release = threading.Event()
+    loaded = []
+
+    class SlowBackend(DistanceBackend):
+        def matrix(self, locations):
+            release.wait(10)
+            loaded.append(len(locations))
+            return HaversineBackend().matrix(locations)
+
+    backend = WarmStartBackend(SlowBackend(), HaversineBackend(), max_pending=2, max_workers=1)
+    for size in (2, 3, 4, 5):
+        backend.matrix(LOCATIONS[:size])
+    assert len(backend._pending) == 2
+    release.set()
+
+    np.testing.assert_allclose(backend.refined(LOCATIONS[:5], timeout=10)[0], HaversineBackend().matrix(LOCATIONS[:5])[0])
+    backend.refined(LOCATIONS[:4], timeout=10)
+    # Pemuatan untuk 2 lokasi sudah berjalan saat dibuang; pemuatan untuk 3 lokasi dibatalkan
+    assert sorted(loaded) == [2, 4, 5]
+    assert not backend._pending
+
+
+def test_refine_plan_recomputes_route_with_exact_matrix(osrm_client):
+    backend = WarmStartBackend(OSRMBackend(), HaversineBackend())
+    plan = build_plan(FEASIBLE_DAY, create_data_model(FEASIBLE_DAY), 'key', backend)
+    refined = refine_plan(plan, backend)
+
+    assert refined['refined'] and refined['key'] == plan['key']
+    assert sorted(refined['route']) == sorted(plan['route'])
+    exact, _ = OSRMBackend().matrix(plan['data']['locations'])
+    route = refined['route']
+    assert refined['total_distance'] == sum(round(exact[a, b]) for a, b in zip(route, route[1:]))
+
+
+def test_store_replaces_warm_start_plan_with_refined_plan(osrm_client):
+    store = RoutePlanStore(backend=WarmStartBackend(OSRMBackend(), HaversineBackend()))
+    plan = store.solve_day(FEASIBLE_DAY)
+    deadline = time.monotonic() + 30
+    while not store.cached_plan(FEASIBLE_DAY).get('refined') and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert not plan.get('refined')
+    assert store.cached_plan(FEASIBLE_DAY)['refined']
+    assert store.lookup(plan['key']) is store.cached_plan(FEASIBLE_DAY)
+
+
+def test_store_refines_plans_added_from_job_queue(osrm_client):
+    backend = WarmStartBackend(OSRMBackend(), HaversineBackend())
+    store = RoutePlanStore(backend=backend)
+    data, key = store.prepare_day(FEASIBLE_DAY)
+    plan = store.add_plan(build_plan(FEASIBLE_DAY, data, key, 'haversine'))
+
+    store.start_refine(plan)
+    deadline = time.monotonic() + 30
+    while not store.lookup(key).get('refined') and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert store.lookup(key)['refined']
+    # Hasil job yang sama dari sesi lain tidak menimpa rencana yang sudah dihitung ulang
+    assert store.add_plan(plan)['refined']
+    assert store.cached_plan(FEASIBLE_DAY)['refined']
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from mock_osrm import ROAD_FACTOR, SPEED_MPS, haversine
+from optimalisasi_rute_truk_sampah import (
+    INVALID_ROUTE_PENALTY,
+    create_data_model,
+    create_distance_duration_matrix,
+    create_distance_duration_submatrix,
+    get_route_coordinates,
+    get_route_legs_coordinates,
+    get_table,
+)
+
+LOCATIONS = create_data_model(0)['locations']
+
+
+# Fungsi untuk menghitung matriks yang diharapkan dari rumus server tiruan
+def expected_matrix(origins, destinations):
+    distances = np.array([[haversine(origin[::-1], destination[::-1]) * ROAD_FACTOR for destination in destinations]
+                          for origin in origins])
+    return distances, distances / SPEED_MPS
+
+
+def test_get_table_returns_requested_block(osrm_client):
+    coordinates = [f"{lng},{lat}" for lat, lng in LOCATIONS[:3]]
+    distances, durations = get_table(coordinates, [0, 1], [2])
+
+    expected_distances, expected_durations = expected_matrix(LOCATIONS[:2], LOCATIONS[2:3])
+    np.testing.assert_allclose(distances, expected_distances)
+    np.testing.assert_allclose(durations, expected_durations)
+
+
+def test_get_table_returns_none_when_request_fails(unreachable_osrm):
+    assert get_table(["106.8,-6.2", "106.9,-6.3"], [0], [1]) == (None, None)
+
+
+@pytest.mark.parametrize('chunk_size', [2, 4, 6, 100])
+def test_chunked_matrix_matches_full_table(osrm_client, mock_osrm, chunk_size):
+    distances, durations = create_distance_duration_matrix({'locations': LOCATIONS}, chunk_size=chunk_size)
+
+    expected_distances, expected_durations = expected_matrix(LOCATIONS, LOCATIONS)
+    np.fill_diagonal(expected_distances, 0)
+    np.fill_diagonal(expected_durations, 0)
+    np.testing.assert_allclose(distances, expected_distances)
+    np.testing.assert_allclose(durations, expected_durations)
+
+    # Satu request per pasangan blok, bukan per pasangan lokasi
+    blocks = -(-len(LOCATIONS) // max(1, chunk_size // 2))
+    assert mock_osrm[0].request_count == blocks * blocks
+
+
+def test_chunked_matrix_reuses_cached_blocks(osrm_client, mock_osrm):
+    first = create_distance_duration_matrix({'locations': LOCATIONS}, chunk_size=4)
+    requests_after_first = mock_osrm[0].request_count
+    second = create_distance_duration_matrix({'locations': LOCATIONS}, chunk_size=4)
+
+    assert mock_osrm[0].request_count == requests_after_first
+    np.testing.assert_allclose(second[0], first[0])
+    np.testing.assert_allclose(second[1], first[1])
+
+
+def test_submatrix_is_rectangular(osrm_client):
+    origins, destinations = LOCATIONS[:3], LOCATIONS[3:]
+    distances, durations = create_distance_duration_submatrix(origins, destinations, chunk_size=4)
+
+    assert distances.shape == durations.shape == (3, len(destinations))
+    np.testing.assert_allclose(distances, expected_matrix(origins, destinations)[0])
+
+
+def test_failed_blocks_are_filled_with_penalty(unreachable_osrm):
+    distances, durations = create_distance_duration_matrix({'locations': LOCATIONS[:4]}, chunk_size=4)
+
+    off_diagonal = ~np.eye(4, dtype=bool)
+    assert (distances[off_diagonal] == INVALID_ROUTE_PENALTY).all()
+    assert (durations[off_diagonal] == INVALID_ROUTE_PENALTY).all()
+    assert (np.diag(distances) == 0).all()
+
+
+def test_route_coordinates_are_plain_lat_lng_lists(osrm_client):
+    coordinates = get_route_coordinates('106.8456,-6.2088', '106.8424,-6.2154')
+
+    assert isinstance(coordinates, list) and all(isinstance(point, list) for point in coordinates)
+    assert coordinates[0] == pytest.approx([-6.2088, 106.8456])
+    assert coordinates[-1] == pytest.approx([-6.2154, 106.8424])
+    legs = get_route_legs_coordinates(LOCATIONS, [0, 1, 0])
+    np.testing.assert_allclose([leg[0] for leg in legs], [LOCATIONS[0], LOCATIONS[1]])
+
+
+def test_route_coordinates_are_empty_list_when_request_fails(unreachable_osrm):
+    assert get_route_coordinates('106.8456,-6.2088', '106.8424,-6.2154') == []
+    assert get_route_legs_coordinates(LOCATIONS, [0, 1, 0]) == [[], []]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from distance_backend import HaversineBackend
+from fleet_routing import calculate_fleet_routes, create_fleet_data_model
+
+LANDFILL = [-6.25, 106.85]
+SOLVER_OPTIONS = {'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_limit_seconds': 1}
+
+
+def solve(day, capacities, **kwargs):
+    data = create_fleet_data_model(day, capacities, **kwargs)
+    return data, calculate_fleet_routes(data, 'haversine', SOLVER_OPTIONS)
+
+
+# Fungsi untuk memeriksa bahwa setiap tempat sampah dikunjungi tepat satu kali
+def visited_bins(result):
+    return sorted(node for vehicle in result['vehicles'] for trip in vehicle['trips'] for node in trip[1:-1])
+
+
+@pytest.mark.parametrize('capacities, max_trips', [([25], 1), ([10, 10], 2)])
+def test_fleet_capacity_overflow_returns_none(capacities, max_trips):
+    data, result = solve(0, capacities, max_trips=max_trips)
+
+    assert sum(data['demands']) > sum(capacities) * max_trips
+    assert result is None
+
+
+def test_trucks_make_several_trips_within_capacity():
+    data, result = solve(0, [25], max_trips=3)
+
+    (vehicle,) = result['vehicles']
+    assert len(vehicle['trips']) == 3
+    assert all(trip[0] == trip[-1] == data['depot'] for trip in vehicle['trips'])
+    assert all(load <= 25 for load in vehicle['loads'])
+    assert sum(vehicle['loads']) == sum(data['demands'])
+    assert visited_bins(result) == list(range(1, len(data['locations'])))
+
+
+def test_heterogeneous_capacities_are_respected():
+    data, result = solve(0, [30, 12], max_trips=2)
+
+    for vehicle in result['vehicles']:
+        assert all(load <= vehicle['capacity'] for load in vehicle['loads'])
+    assert [vehicle['capacity'] for vehicle in result['vehicles']] == [30, 12]
+    assert visited_bins(result) == list(range(1, len(data['locations'])))
+
+
+def test_trips_unload_at_landfill_and_return_to_depot():
+    data, result = solve(0, [25], max_trips=3, landfill_location=LANDFILL)
+
+    landfill = result['landfill']
+    assert landfill == len(data['locations'])
+    distances = np.rint(HaversineBackend().matrix(result['locations'])[0]).astype(int)
+    (vehicle,) = result['vehicles']
+    first, *later = vehicle['trips']
+    assert first[0] == data['depot'] and all(trip[0] == landfill for trip in later)
+    assert all(trip[-1] == landfill for trip in vehicle['trips'])
+
+    legs = sum(distances[a, b] for trip in vehicle['trips'] for a, b in zip(trip, trip[1:]))
+    assert vehicle['distance'] == legs + distances[landfill, data['depot']]
+    assert vehicle['trip_legs'] and sum(map(sum, vehicle['trip_legs'])) == legs
+    assert result['total_distance'] == vehicle['distance']
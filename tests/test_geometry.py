@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from geometry import (
+    decode_polyline,
+    encode_polyline,
+    leg_coordinates,
+    sample_along,
+    simplify_for_zoom,
+    simplify_polyline,
+    tolerance_for_zoom,
+)
+from optimalisasi_rute_truk_sampah import build_route_map, create_data_model, get_route_legs_geometry
+
+# Contoh dari dokumentasi Encoded Polyline Algorithm Format milik Google
+GOOGLE_POINTS = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+GOOGLE_ENCODED = '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+
+# Fungsi untuk membuat polyline zig-zag kecil di sekitar Jakarta
+def wiggly_line(count=200, amplitude=1e-5):
+    lat = -6.2 + np.linspace(0, 0.01, count)
+    lng = 106.8 + amplitude * np.sin(np.arange(count))
+    return np.column_stack([lat, lng])
+
+
+def test_encode_matches_google_example():
+    assert encode_polyline(GOOGLE_POINTS) == GOOGLE_ENCODED
+    np.testing.assert_allclose(decode_polyline(GOOGLE_ENCODED, dtype=np.float64), GOOGLE_POINTS)
+
+
+def test_round_trip_keeps_five_decimals():
+    points = np.random.default_rng(0).uniform([-6.3, 106.7], [-6.1, 106.9], size=(50, 2))
+
+    decoded = decode_polyline(encode_polyline(points))
+
+    assert decoded.dtype == np.float32 and decoded.shape == (50, 2)
+    np.testing.assert_allclose(decoded, points, atol=1e-5)
+    assert encode_polyline([]) == '' and decode_polyline('').shape == (0, 2)
+
+
+def test_leg_coordinates_accepts_polyline_or_list():
+    np.testing.assert_allclose(leg_coordinates(GOOGLE_ENCODED), leg_coordinates(GOOGLE_POINTS), atol=1e-5)
+    assert leg_coordinates([]).shape == (0, 2)
+
+
+def test_simplify_keeps_endpoints_and_drops_small_wiggles():
+    line = wiggly_line()
+
+    simplified = simplify_polyline(line, tolerance=5.0)
+
+    assert len(simplified) == 2
+    np.testing.assert_array_equal(simplified[[0, -1]], line[[0, -1]])
+    assert len(simplify_polyline(line, tolerance=0)) == len(line)
+
+
+def test_zoom_tolerance_halves_per_level():
+    assert tolerance_for_zoom(15) == pytest.approx(tolerance_for_zoom(14) / 2)
+    assert tolerance_for_zoom(14, latitude=60) == pytest.approx(tolerance_for_zoom(14) / 2)
+
+    # Zig-zag ~1 meter hilang di zoom kota tetapi tetap ada di zoom jalan terdekat
+    line = wiggly_line()
+    assert len(simplify_for_zoom(line, 12)) == 2
+    assert len(simplify_for_zoom(line, 22)) > 0.9 * len(line)
+
+
+def test_sample_along_is_evenly_spaced():
+    samples = sample_along([[0, 0], [0, 0.001], [0, 0.003]], 4)
+
+    np.testing.assert_allclose(samples[:, 1], [0, 0.001, 0.002, 0.003])
+    assert sample_along([[1, 2]], 3).tolist() == [[1, 2]] * 3
+
+
+def test_route_legs_are_cached_as_polylines(osrm_client, mock_osrm):
+    locations = create_data_model(0)['locations']
+    route = [0, 1, 2, 0]
+
+    legs = get_route_legs_geometry(locations, route)
+    requests = mock_osrm[0].request_count
+
+    assert all(isinstance(leg, str) and leg for leg in legs)
+    np.testing.assert_allclose(decode_polyline(legs[0])[[0, -1]], [locations[0], locations[1]], atol=1e-5)
+    assert get_route_legs_geometry(locations, route) == legs
+    assert mock_osrm[0].request_count == requests
+
+
+def test_build_route_map_uses_given_legs_without_osrm(unreachable_osrm):
+    locations = create_data_model(0)['locations']
+    legs = [encode_polyline([locations[0], locations[1]]), encode_polyline([locations[1], locations[0]])]
+
+    html = build_route_map(locations, [0, 1, 0], 1500, legs=legs).get_root().render()
+
+    assert 'Total distance: 1.5 km' in html
+    assert f'[{locations[1][0]}, {locations[1][1]}]' in html
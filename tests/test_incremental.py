@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from distance_backend import HaversineBackend
+from incremental import IncrementalPlanner
+from optimalisasi_rute_truk_sampah import create_data_model
+
+# Hari contoh yang muatannya masih muat di satu truk (hari 0 tidak punya solusi)
+FEASIBLE_DAY = 5
+NEW_BIN = [-6.2120, 106.8490]
+
+
+class CountingBackend(HaversineBackend):
+    def __init__(self):
+        super().__init__()
+        self.matrix_calls = 0
+        self.submatrix_calls = []
+
+    def matrix(self, locations):
+        self.matrix_calls += 1
+        return super().matrix(locations)
+
+    def submatrix(self, origins, destinations):
+        self.submatrix_calls.append((len(origins), len(destinations)))
+        return super().submatrix(origins, destinations)
+
+
+@pytest.fixture
+def planner():
+    return IncrementalPlanner(create_data_model(FEASIBLE_DAY), CountingBackend(), {'time_limit_seconds': 1})
+
+
+# Fungsi untuk menghitung jarak rute dari matriks planner
+def route_distance(planner, route):
+    distances = np.rint(planner.distances).astype(int)
+    return sum(distances[a, b] for a, b in zip(route, route[1:]))
+
+
+def test_added_bin_extends_matrix_without_refetching(planner):
+    planner.plan()
+    node = planner.add_bin(NEW_BIN, 2)
+
+    assert node == 8
+    assert planner.backend.matrix_calls == 1
+    assert planner.backend.submatrix_calls == [(1, 8), (8, 1)]
+    np.testing.assert_allclose(planner.distances, HaversineBackend().matrix(planner.locations)[0])
+
+    route, total_distance = planner.plan()
+    assert sorted(route[1:-1]) == list(range(1, 9))
+    assert total_distance == route_distance(planner, route)
+
+
+def test_skipped_bin_is_left_out_until_reactivated(planner):
+    planner.plan()
+    planner.skip_bin(3)
+
+    route, _ = planner.plan()
+    assert sorted(route[1:-1]) == [1, 2, 4, 5, 6, 7]
+
+    planner.skip_bin(3, skipped=False)
+    route, _ = planner.plan()
+    assert 3 in route
+
+
+def test_removed_bin_shifts_nodes_and_matrix(planner):
+    planner.plan()
+    removed_location = planner.locations[2]
+
+    planner.remove_bin(2)
+
+    assert removed_location not in planner.locations
+    np.testing.assert_allclose(planner.distances, HaversineBackend().matrix(planner.locations)[0])
+    route, _ = planner.plan()
+    assert sorted(route[1:-1]) == list(range(1, 7))
+    with pytest.raises(ValueError):
+        planner.remove_bin(planner.depot)
+
+
+def test_demand_update_beyond_capacity_has_no_solution(planner):
+    planner.plan()
+    planner.update_demand(1, 26)
+
+    assert planner.plan() == (None, 0)
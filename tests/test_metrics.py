@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+import metrics
+from distance_backend import HaversineBackend
+from metrics import current_span, increment, recent_spans, render_prometheus, set_gauge, span, traced
+from optimalisasi_rute_truk_sampah import calculate_route, create_data_model
+
+FEASIBLE_DAY = 5
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_counters_and_gauges_are_rendered_per_label_set():
+    increment('osrm_http_requests_total', endpoint='table', status=200)
+    increment('osrm_http_requests_total', 2, endpoint='table', status=200)
+    increment('osrm_http_requests_total', endpoint='route', status=500)
+    set_gauge('solver_last_objective', 10)
+    set_gauge('solver_last_objective', 7)
+
+    lines = render_prometheus().splitlines()
+
+    assert '# TYPE osrm_http_requests_total counter' in lines
+    assert 'osrm_http_requests_total{endpoint="table",status="200"} 3' in lines
+    assert 'osrm_http_requests_total{endpoint="route",status="500"} 1' in lines
+    assert 'solver_last_objective 7' in lines
+
+
+def test_nested_spans_record_attributes_on_the_innermost_span():
+    @traced('inner', backend='haversine')
+    def inner():
+        current_span().set(locations=3)
+
+    with span('outer') as outer:
+        inner()
+        outer.set(tasks=1)
+    current_span().set(ignored=True)
+
+    (inner_span,) = recent_spans('inner')
+    (outer_span,) = recent_spans('outer')
+    assert inner_span['backend'] == 'haversine' and inner_span['locations'] == 3
+    assert outer_span['tasks'] == 1 and 'locations' not in outer_span
+    assert outer_span['duration'] >= inner_span['duration']
+    assert 'planner_span_seconds_count{span="inner",backend="haversine"} 1' in render_prometheus()
+
+
+def test_span_is_recorded_when_function_raises():
+    @traced('failing')
+    def failing():
+        raise ValueError('gagal')
+
+    with pytest.raises(ValueError):
+        failing()
+
+    assert len(recent_spans('failing')) == 1
+    assert current_span().set(anything=1) is None
+
+
+def test_spans_in_other_threads_do_not_share_the_stack():
+    seen = []
+
+    def worker():
+        seen.append(current_span())
+
+    with span('main'):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert isinstance(seen[0], metrics._NoSpan)
+
+
+def test_profile_mode_writes_one_file_for_the_outermost_span(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'PROFILE_DIR', str(tmp_path))
+
+    with span('outer', profile=True):
+        with span('inner', profile=True):
+            sum(range(1000))
+    with span('not_profiled'):
+        pass
+
+    assert [path.name.split('-')[0] for path in tmp_path.iterdir()] == ['outer']
+
+
+def test_calculate_route_records_solver_statistics():
+    data = create_data_model(FEASIBLE_DAY)
+    calculate_route(data, backend=HaversineBackend(), solver_options={'time_limit_seconds': 1})
+
+    (solve,) = recent_spans('calculate_route')
+    assert solve['nodes'] > 0 and solve['objective'] > 0
+    assert 'solver_runs_total{found="True"} 1' in render_prometheus()
+
+
+def test_metrics_route_serves_prometheus_text():
+    flask = pytest.importorskip('flask')
+    server = flask.Flask(__name__)
+    metrics.register_metrics_route(server)
+    increment('sensor_readings_total', 4)
+
+    response = server.test_client().get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'sensor_readings_total 4' in response.get_data(as_text=True)
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from osrm_client import OSRMClient, OSRMError, RateLimiter
+
+ORIGIN = '106.8456,-6.2088'
+DESTINATION = '106.8424,-6.2154'
+
+
+def test_route_and_table(osrm_client):
+    route = osrm_client.route(ORIGIN, DESTINATION)
+    distances, durations = osrm_client.table([ORIGIN, DESTINATION], [0], [0, 1])
+
+    assert route['distance'] > 0
+    assert distances[0][0] == 0
+    assert distances[0][1] == pytest.approx(route['distance'])
+    assert durations[0][1] == pytest.approx(route['duration'])
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retryable_status_is_retried(osrm_client, mock_osrm, status):
+    server, _ = mock_osrm
+    server.failures = 2
+    server.failure_status = status
+
+    assert osrm_client.route(ORIGIN, DESTINATION)['distance'] > 0
+    assert server.request_count == 3
+    assert osrm_client.request_count == 3
+
+
+def test_gives_up_after_max_retries(mock_osrm):
+    server, base_url = mock_osrm
+    server.failures = 10
+    client = OSRMClient(base_url=base_url, max_retries=2, backoff_factor=0)
+
+    with pytest.raises(OSRMError, match='503'):
+        client.route(ORIGIN, DESTINATION)
+    assert server.request_count == 3
+    client.close()
+
+
+def test_backoff_grows_exponentially(mock_osrm):
+    server, base_url = mock_osrm
+    server.failures = 2
+    client = OSRMClient(base_url=base_url, max_retries=2, backoff_factor=0.05)
+
+    start = time.monotonic()
+    client.route(ORIGIN, DESTINATION)
+    # Jeda 0.05 lalu 0.1 detik sebelum percobaan ketiga
+    assert time.monotonic() - start >= 0.15
+    client.close()
+
+
+def test_client_error_is_not_retried(osrm_client, mock_osrm):
+    server, _ = mock_osrm
+    server.failures = 1
+    server.failure_status = 400
+
+    with pytest.raises(OSRMError, match='400'):
+        osrm_client.route(ORIGIN, DESTINATION)
+    assert server.request_count == 1
+
+
+def test_connection_error_raises_osrm_error(unreachable_osrm):
+    with pytest.raises(OSRMError, match='ConnectionError'):
+        unreachable_osrm.route(ORIGIN, DESTINATION)
+
+
+def test_map_preserves_order(osrm_client):
+    destinations = [f"106.84{offset},-6.21{offset}" for offset in range(8)]
+    routes = osrm_client.map(lambda destination: osrm_client.route(ORIGIN, destination), destinations)
+
+    expected = [osrm_client.route(ORIGIN, destination)['distance'] for destination in destinations]
+    assert [route['distance'] for route in routes] == expected
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    assert time.monotonic() - start >= 5 / 50 * 0.9
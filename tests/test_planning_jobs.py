@@ -0,0 +1,88 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from optimalisasi_rute_truk_sampah import calculate_route
+from planning_jobs import PlanningJobQueue, report_progress
+from route_store import RoutePlanStore
+
+# Hari contoh yang muatannya masih muat di satu truk (hari 0 tidak punya solusi)
+FEASIBLE_DAY = 5
+
+
+# Fungsi job: solve dengan batas waktu panjang yang hanya bisa berhenti lebih awal lewat pembatalan
+def long_solve(num_bins=150):
+    rng = np.random.default_rng(0)
+    data = {
+        'locations': (np.array([-6.2088, 106.8456]) + rng.uniform(-0.05, 0.05, size=(num_bins + 1, 2))).tolist(),
+        'demands': [0] * (num_bins + 1),
+        'vehicle_capacities': [1],
+        'num_vehicles': 1,
+        'depot': 0,
+    }
+    report_progress(0.5, 'Solve')
+    calculate_route(data, 'haversine', {'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH', 'time_limit_seconds': 60})
+    report_progress(1.0, 'Selesai')
+
+
+# Fungsi job: mengembalikan nilainya sendiri setelah jeda (agar masih berjalan saat diikuti sesi lain)
+def echo(value, delay=1.0):
+    time.sleep(delay)
+    return value
+
+
+# Fungsi untuk menunggu sampai kondisi terpenuhi
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture(scope='module')
+def job_queue():
+    queue = PlanningJobQueue(max_workers=2)
+    yield queue
+    queue.shutdown(wait=False)
+
+
+def test_cancelled_job_stops_during_solve(job_queue):
+    job_id = job_queue.submit('long-solve', long_solve, owner='sesi')
+    assert wait_until(lambda: job_queue.status(job_id)['message'] == 'Solve')
+    time.sleep(1)
+
+    cancelled_at = time.monotonic()
+    job_queue.release('sesi')
+
+    assert wait_until(lambda: job_queue.status(job_id)['state'] == 'cancelled', timeout=10)
+    assert time.monotonic() - cancelled_at < 10
+
+
+def test_done_callback_runs_once_and_ownerless_job_is_not_cancelled(job_queue):
+    results = []
+    done = threading.Event()
+
+    job_id = job_queue.submit('echo', echo, 42)
+    assert job_queue.submit('echo', echo, 42, owner='sesi-lain') == job_id
+    job_queue.release('sesi-lain')
+    job_queue.add_done_callback(job_id, lambda status: (results.append(status), done.set()))
+
+    assert done.wait(30)
+    assert [(status['state'], status['result']) for status in results] == [('done', 42)]
+    # Callback untuk job yang sudah selesai langsung dipanggil
+    job_queue.add_done_callback(job_id, results.append)
+    assert len(results) == 2
+
+
+def test_store_with_job_queue_solves_in_worker(job_queue):
+    store = RoutePlanStore(backend='haversine', solver_options={'time_limit_seconds': 2}, job_queue=lambda: job_queue)
+
+    job_id = store.submit_day(FEASIBLE_DAY)
+
+    assert job_id is not None
+    assert wait_until(lambda: store.cached_plan(FEASIBLE_DAY) is not None)
+    assert store.cached_plan(FEASIBLE_DAY)['route']
+    # Rencana sudah ada, jadi tidak ada job baru
+    assert store.submit_day(FEASIBLE_DAY) is None
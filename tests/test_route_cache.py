@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from route_cache import LEG_KIND, POLYLINE_KIND, RouteCache
+
+
+def test_hit_and_miss_are_counted():
+    cache = RouteCache(':memory:')
+    cache.set('a', {'distance': 1.5})
+
+    assert cache.get('a') == {'distance': 1.5}
+    assert cache.get('b') is None
+    assert cache.get_many(['a', 'b', 'c']) == {'a': {'distance': 1.5}}
+    assert cache.stats() == {'hits': 2, 'misses': 3, 'entries': 1}
+
+
+def test_make_key_rounds_coordinates():
+    cache = RouteCache(':memory:', precision=5)
+    key = cache.make_key('leg', '106.845600001,-6.2088', '106.8424,-6.21540000049', 'driving')
+
+    assert key == 'leg:driving:106.84560,-6.20880;106.84240,-6.21540'
+    assert key == cache.make_key('leg', '106.8456,-6.2088', '106.8424,-6.2154', 'driving')
+
+
+def test_make_key_separates_kinds_and_rejects_unknown_kind():
+    cache = RouteCache(':memory:')
+    args = ('106.8456,-6.2088', '106.8424,-6.2154', 'driving')
+
+    assert cache.make_key(LEG_KIND, *args) != cache.make_key(POLYLINE_KIND, *args)
+    with pytest.raises(ValueError):
+        cache.make_key('geometry', *args)
+
+
+def test_expired_entries_are_not_returned_and_are_evicted():
+    cache = RouteCache(':memory:', ttl=0.05)
+    cache.set('old', 1)
+    time.sleep(0.1)
+
+    assert cache.get('old') is None
+    cache.set('new', 2)
+    assert cache.stats()['entries'] == 1
+    assert cache.get('new') == 2
+
+
+def test_lru_eviction_keeps_recently_read_entries():
+    cache = RouteCache(':memory:', max_entries=3, touch_interval=0)
+    cache.set_many({'a': 1, 'b': 2, 'c': 3})
+    time.sleep(0.01)
+    cache.get('a')
+    cache.set('d', 4)
+
+    assert cache.get_many(['a', 'b', 'c', 'd']) == {'a': 1, 'c': 3, 'd': 4}
+
+
+def test_reads_within_touch_interval_do_not_write():
+    cache = RouteCache(':memory:', touch_interval=3600)
+    cache.set('a', 1)
+    changes = cache._connection.total_changes
+    for _ in range(100):
+        cache.get('a')
+    cache.flush()
+
+    assert cache._connection.total_changes == changes
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    RouteCache(path).set('leg', {'distance': 10, 'duration': 2})
+
+    assert RouteCache(path).get('leg') == {'distance': 10, 'duration': 2}
+
+
+def test_clear_removes_entries_and_counters():
+    cache = RouteCache(':memory:')
+    cache.set('a', 1)
+    cache.get('a')
+    cache.clear()
+
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'entries': 0}
@@ -0,0 +1,98 @@
+import pytest
+
+import demand_provider as demand_provider_module
+import route_store
+from demand_provider import SyntheticDemandProvider, set_demand_provider
+from route_store import RoutePlanStore
+
+# Hari contoh yang muatannya masih muat di satu truk (hari 0 tidak punya solusi)
+FEASIBLE_DAY = 5
+
+
+@pytest.fixture
+def build_calls(monkeypatch, osrm_client):
+    """Menghitung solve yang benar-benar dijalankan oleh store."""
+    calls = []
+    build_plan = route_store.build_plan
+
+    def counting_build_plan(day, *args, **kwargs):
+        calls.append(day)
+        return build_plan(day, *args, **kwargs)
+
+    monkeypatch.setattr(route_store, 'build_plan', counting_build_plan)
+    return calls
+
+
+@pytest.fixture
+def demand_provider():
+    """Mengembalikan provider volume default setelah test menggantinya."""
+    previous = demand_provider_module._default_provider
+    yield set_demand_provider
+    set_demand_provider(previous)
+
+
+def make_store(**kwargs):
+    return RoutePlanStore(backend='haversine', solver_options={'time_limit_seconds': 1}, **kwargs)
+
+
+def test_same_day_and_demands_are_solved_once(build_calls):
+    store = make_store()
+
+    plan = store.solve_day(FEASIBLE_DAY)
+
+    assert store.solve_day(FEASIBLE_DAY) is plan
+    assert store.get_plan(FEASIBLE_DAY) is plan
+    assert build_calls == [FEASIBLE_DAY]
+    assert plan['route'][0] == plan['route'][-1] == plan['data']['depot']
+    assert plan['total_waste'] == sum(store.prepare_day(FEASIBLE_DAY)[0]['demands'])
+
+
+def test_changed_demands_invalidate_plan(build_calls, demand_provider):
+    store = make_store()
+    demand_provider(SyntheticDemandProvider(seed=1))
+    first = store.solve_day(FEASIBLE_DAY)
+    demand_provider(SyntheticDemandProvider(seed=2))
+
+    second = store.solve_day(FEASIBLE_DAY)
+
+    assert second['key'] != first['key']
+    assert store.cached_plan(FEASIBLE_DAY) is second
+    assert build_calls == [FEASIBLE_DAY, FEASIBLE_DAY]
+    # Snapshot muatan lama masih tersimpan dan dipakai lagi tanpa solve
+    demand_provider(SyntheticDemandProvider(seed=1))
+    assert store.solve_day(FEASIBLE_DAY) is first
+    assert len(build_calls) == 2
+
+
+def test_fleet_config_is_part_of_plan_key():
+    data, key = make_store().prepare_day(FEASIBLE_DAY)
+    bigger_data, bigger_key = make_store(fleet_config={'vehicle_capacities': [35]}).prepare_day(FEASIBLE_DAY)
+
+    assert bigger_data['vehicle_capacities'] == [35]
+    assert bigger_key != key and bigger_key[:2] == key[:2]
+
+
+def test_oldest_plans_and_their_artifacts_are_evicted():
+    store = make_store(max_plans=2)
+    plans = [{'day': day, 'key': ('plan', day)} for day in range(3)]
+    for plan in plans[:2]:
+        store.add_plan(plan)
+        store.artifact(plan, 'map', lambda: 'html')
+    store.lookup(plans[0]['key'])
+
+    store.add_plan(plans[2])
+
+    assert store.lookup(plans[1]['key']) is None
+    assert store.lookup(plans[0]['key']) is plans[0]
+    assert ('plan', 1) not in store._artifacts
+
+
+def test_replaced_plan_rebuilds_artifacts():
+    store = make_store()
+    plan = store.add_plan({'day': 1, 'key': 'k'})
+    builds = []
+    store.artifact(plan, 'map', lambda: builds.append(1) or len(builds))
+
+    assert store.artifact(plan, 'map', lambda: builds.append(1) or len(builds)) == 1
+    replaced = store.add_plan({'day': 1, 'key': 'k', 'refined': True})
+    assert store.artifact(replaced, 'map', lambda: builds.append(1) or len(builds)) == 2
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from bin_inventory import day_selection
+from scenarios import (
+    ALL_DAYS,
+    DAILY_COLUMNS,
+    DEFAULT_SCENARIOS,
+    FUEL_LITERS_PER_KM_EMPTY,
+    FUEL_LITERS_PER_KM_FULL,
+    SUMMARY_COLUMNS,
+    build_week,
+    evaluate_scenarios,
+    resolve_scenario,
+    service_day_demands,
+    trip_fuel,
+)
+
+LANDFILL = [-6.25, 106.85]
+
+
+# Fungsi untuk menghitung total sampah seminggu dari tempat sampah yang dijadwalkan
+def weekly_scheduled_waste(week):
+    return sum(int(week['demands'][day][day_selection(week['schedule_mask'], day)].sum()) for day in ALL_DAYS)
+
+
+@pytest.fixture(scope='module')
+def evaluation():
+    scenarios = DEFAULT_SCENARIOS + [{'name': 'Lewat TPA', 'landfill_location': LANDFILL}]
+    return evaluate_scenarios(scenarios, backend='haversine', max_workers=1)
+
+
+def test_resolve_scenario_applies_overrides():
+    base = {'vehicle_capacities': [25]}
+
+    assert resolve_scenario({'extra_vehicles': 1, 'capacity': 35}, base, 2) == {
+        'name': 'Skenario 3',
+        'vehicle_capacities': [35, 35],
+        'max_trips': None,
+        'service_days': ALL_DAYS,
+        'landfill_location': None,
+        'time_limit_seconds': pytest.approx(resolve_scenario({}, base)['time_limit_seconds']),
+    }
+    assert resolve_scenario({'vehicle_capacities': [10, 20], 'service_days': [7, 1]}, base)['service_days'] == [0, 1]
+
+
+def test_skipped_service_days_carry_waste_forward():
+    week = build_week()
+    every_day = service_day_demands(week['schedule_mask'], week['demands'], ALL_DAYS)
+    weekdays = service_day_demands(week['schedule_mask'], week['demands'], [0, 1, 2, 3, 4])
+
+    assert sorted(weekdays) == [0, 1, 2, 3, 4]
+    assert sum(int(demands.sum()) for _, demands in weekdays.values()) == weekly_scheduled_waste(week)
+    # Senin juga mengangkut sampah Sabtu dan Minggu
+    assert weekdays[0][1].sum() == sum(every_day[day][1].sum() for day in (5, 6, 0))
+    for indices, demands in weekdays.values():
+        assert indices[0] == 0 and demands[0] == 0
+
+
+def test_trip_fuel_interpolates_between_empty_and_full():
+    assert trip_fuel([1000], [0], 10) == pytest.approx(FUEL_LITERS_PER_KM_EMPTY)
+    assert trip_fuel([1000], [10], 10) == pytest.approx(FUEL_LITERS_PER_KM_FULL)
+    assert trip_fuel([1000, 1000], [5, 20], 10) == pytest.approx(
+        (FUEL_LITERS_PER_KM_EMPTY + FUEL_LITERS_PER_KM_FULL) / 2 + FUEL_LITERS_PER_KM_FULL)
+
+
+def test_summary_has_one_row_per_scenario(evaluation):
+    summary, daily = evaluation
+
+    assert list(summary.columns) == SUMMARY_COLUMNS
+    assert list(daily.columns) == DAILY_COLUMNS
+    assert summary['scenario'].tolist() == [scenario['name'] for scenario in DEFAULT_SCENARIOS] + ['Lewat TPA']
+    assert summary['service_days'].tolist() == [7, 7, 7, 5, 7]
+    assert (summary['failed_days'] == 0).all()
+    assert (summary['load_utilization'] <= 1).all()
+
+
+def test_every_scenario_collects_all_weekly_waste(evaluation):
+    _, daily = evaluation
+
+    loads = daily.groupby('scenario')['load'].sum()
+    assert set(loads.tolist()) == {weekly_scheduled_waste(build_week())}
+
+
+def test_bigger_trucks_need_fewer_trips(evaluation):
+    summary, _ = evaluation
+    trips = summary.set_index('scenario')['trips']
+
+    assert trips['Kapasitas 35 m3'] < trips['Armada saat ini']
+    assert summary.set_index('scenario').loc['Tambah satu truk', 'trucks'] <= 2
+
+
+def test_landfill_detour_adds_distance(evaluation):
+    summary, _ = evaluation
+    distances = summary.set_index('scenario')['distance_km']
+
+    assert distances['Lewat TPA'] > distances['Armada saat ini']
+
+
+def test_process_pool_matches_in_process_evaluation(evaluation):
+    scenarios = DEFAULT_SCENARIOS[:2]
+    parallel_summary, parallel_daily = evaluate_scenarios(scenarios, backend='haversine', max_workers=2)
+    summary, daily = evaluation
+
+    columns = ['scenario', 'day', 'status', 'trips', 'distance_km', 'load']
+    expected = daily[daily['scenario'].isin([scenario['name'] for scenario in scenarios])]
+    assert parallel_daily[columns].to_dict('records') == expected[columns].to_dict('records')
+    np.testing.assert_allclose(parallel_summary['fuel_l'], summary['fuel_l'][:2])
+
+
+def test_dashboard_keeps_only_recent_scenario_tables(monkeypatch):
+    dashboard = pytest.importorskip('dashboard')
+    monkeypatch.setattr(dashboard, 'MAX_SCENARIO_TABLES', 2)
+    monkeypatch.setattr(dashboard, 'scenario_tables', OrderedDict())
+
+    dashboard.store_scenario_table('a', 1)
+    dashboard.store_scenario_table('b', 2)
+    assert dashboard.lookup_scenario_table('a') == 1
+    dashboard.store_scenario_table('c', 3)
+
+    assert list(dashboard.scenario_tables) == ['a', 'c']
+    assert dashboard.lookup_scenario_table('b') is None
@@ -0,0 +1,199 @@
+import json
+import os
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from sensor_stream import LineParser, SensorAggregator, pickup_data_model, start_sensor_stream
+
+
+# Fungsi untuk menunggu sampai kondisi terpenuhi (pembaca berjalan di thread latar)
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+# Fungsi untuk menambahkan pembacaan ke file JSON lines
+def append_readings(path, readings):
+    with open(path, 'a') as file:
+        for bin_number, level in readings:
+            file.write(json.dumps({'bin': bin_number, 'level': level}) + '\n')
+
+
+def test_ingest_drops_out_of_range_and_non_finite_readings():
+    aggregator = SensorAggregator(3)
+
+    assert aggregator.ingest([1, 0, 4, 2, 3], [0.5, 0.5, 0.5, np.nan, 1.5], [10, 10, 10, 10, np.inf]) == 1
+    assert (aggregator.received, aggregator.dropped) == (1, 4)
+    assert aggregator.current_levels().tolist() == [0, 0.5, 0, 0]
+
+
+def test_ring_buffer_keeps_last_window_readings_in_arrival_order():
+    aggregator = SensorAggregator(2, window=3)
+    aggregator.ingest([1, 1, 2, 1], [0.1, 0.2, 0.9, 0.3], [1, 2, 1, 3])
+    aggregator.ingest([1, 1], [0.4, 0.5], [4, 5])
+
+    assert sorted(aggregator.levels[1].tolist()) == pytest.approx([0.3, 0.4, 0.5])
+    assert aggregator.current_levels()[1] == pytest.approx(0.5)
+    assert aggregator.counts.tolist() == [0, 5, 1]
+
+
+def test_fill_rates_and_projected_pickups():
+    aggregator = SensorAggregator(3, threshold=0.7)
+    aggregator.ingest([1, 1, 1, 2, 3], [0.1, 0.2, 0.3, 0.75, 0.5], [0, 100, 200, 0, 0])
+
+    np.testing.assert_allclose(aggregator.fill_rates(), [0, 0.001, 0, 0], atol=1e-9)
+    assert aggregator.select_pickups().tolist() == [2]
+    assert aggregator.select_pickups(horizon_seconds=400).tolist() == [1, 2]
+    aggregator.mark_collected([2])
+    assert aggregator.select_pickups().tolist() == []
+
+
+def test_parser_joins_lines_split_across_chunks():
+    aggregator = SensorAggregator(5)
+    parser = LineParser(aggregator)
+    payload = b''.join(json.dumps({'bin': b, 'level': b / 10, 'ts': 1}).encode() + b'\n' for b in range(1, 6))
+
+    for start in range(0, len(payload), 7):
+        parser.feed(payload[start:start + 7])
+    assert aggregator.received == 5
+    parser.feed(b'{"bin": 1, "level": 0.9}')
+    assert aggregator.received == 5
+    parser.flush()
+    assert aggregator.received == 6
+    assert aggregator.current_levels()[1] == pytest.approx(0.9)
+
+
+def test_parser_skips_only_invalid_records():
+    aggregator = SensorAggregator(10)
+    lines = [
+        b'{"bin": 1, "level": 0.5}',
+        b'{"bin": null, "level": 0.5}',
+        b'{"bin": 2, "level": "abc"}',
+        b'{"bin": 3, "level": 0.7}',
+        b'{"bin": 4, "level": 0.8, "ts": "x"}',
+        b'[1, 2]',
+        b'{"bin": 6}',
+        b'not json',
+        b'{"bin": 7, "level": 0.1}',
+    ]
+
+    assert LineParser(aggregator).ingest_lines(lines) == 3
+    assert (aggregator.received, aggregator.dropped) == (3, 6)
+    assert aggregator.current_levels()[[1, 3, 7]].tolist() == pytest.approx([0.5, 0.7, 0.1])
+
+
+@pytest.mark.parametrize('lines', [
+    [b'{"bin": true, "level": 0.5}', b'{"bin": 2.7, "level": 0.5}'],
+    [b'{"bin": true, "level": 0.5}', b'{"bin": 2.7, "level": 0.5}', b'{"bin": null, "level": 0.5}'],
+])
+def test_bool_and_fractional_bins_are_rejected_regardless_of_batch(lines):
+    aggregator = SensorAggregator(5)
+
+    assert LineParser(aggregator).ingest_lines(lines) == 0
+    assert (aggregator.received, aggregator.dropped) == (0, len(lines))
+    assert not aggregator.current_levels().any()
+
+
+def test_integral_float_bins_are_accepted_and_out_of_range_bins_dropped():
+    aggregator = SensorAggregator(5)
+    lines = [b'{"bin": 2.0, "level": 0.5}', b'{"bin": 9, "level": 0.5}', b'{"bin": 0, "level": 0.5}']
+
+    assert LineParser(aggregator).ingest_lines(lines) == 1
+    assert (aggregator.received, aggregator.dropped) == (1, 2)
+    assert aggregator.current_levels()[2] == pytest.approx(0.5)
+
+
+def test_invalid_lines_are_reported_once_per_batch(capsys):
+    aggregator = SensorAggregator(5)
+    LineParser(aggregator).ingest_lines([b'not json', b'{broken', b'{"bin": 1, "level": 0.5}'])
+
+    assert capsys.readouterr().out.count('Warning') == 1
+    assert (aggregator.received, aggregator.dropped) == (1, 2)
+
+
+def test_tail_reads_only_new_lines_and_follows_truncation(tmp_path):
+    path = str(tmp_path / 'readings.jsonl')
+    append_readings(path, [(1, 0.1), (2, 0.2)])
+    aggregator = SensorAggregator(5)
+    stop, address = start_sensor_stream(aggregator, path)
+    try:
+        assert address == path
+        append_readings(path, [(3, 0.3)])
+        assert wait_until(lambda: aggregator.received == 1)
+
+        with open(path, 'w') as file:
+            file.write(json.dumps({'bin': 4, 'level': 0.4}) + '\n')
+        assert wait_until(lambda: aggregator.received == 2)
+    finally:
+        stop()
+    assert aggregator.current_levels().tolist() == pytest.approx([0, 0, 0, 0.3, 0.4, 0])
+
+
+def test_tail_follows_rename_rotation(tmp_path):
+    path = str(tmp_path / 'readings.jsonl')
+    open(path, 'w').close()
+    aggregator = SensorAggregator(5)
+    stop, _ = start_sensor_stream(aggregator, path)
+    try:
+        append_readings(path, [(1, 0.1)])
+        assert wait_until(lambda: aggregator.received == 1)
+
+        # logrotate: file lama di-rename lalu file baru dibuat di path yang sama; baris lama yang
+        # belum terbaca tetap dihabiskan sebelum pindah ke file baru
+        append_readings(path, [(2, 0.2)])
+        os.rename(path, path + '.1')
+        append_readings(path, [(3, 0.3), (4, 0.4)])
+        assert wait_until(lambda: aggregator.received == 4)
+
+        append_readings(path, [(5, 0.5)])
+        assert wait_until(lambda: aggregator.received == 5)
+    finally:
+        stop()
+    assert aggregator.dropped == 0
+
+
+def test_tcp_stream(tmp_path):
+    aggregator = SensorAggregator(3)
+    stop, address = start_sensor_stream(aggregator, 'tcp://127.0.0.1:0')
+    try:
+        host, _, port = address[len('tcp://'):].rpartition(':')
+        with socket.create_connection((host, int(port))) as connection:
+            connection.sendall(b'{"bin": 1, "level": 0.4}\n{"bin": 2, "level": 0.6}')
+        assert wait_until(lambda: aggregator.received == 2)
+    finally:
+        stop()
+
+
+def test_startup_error_is_raised_to_caller():
+    with socket.socket() as busy:
+        busy.bind(('127.0.0.1', 0))
+        busy.listen()
+        port = busy.getsockname()[1]
+        start = time.monotonic()
+        with pytest.raises(OSError):
+            start_sensor_stream(SensorAggregator(3), f'tcp://127.0.0.1:{port}')
+        assert time.monotonic() - start < 5
+
+
+def test_pickup_data_model_maps_nodes_back():
+    data = {
+        'locations': [[0, 0], [1, 1], [2, 2], [3, 3]],
+        'demands': [0, 1, 1, 1],
+        'depot': 0,
+        'vehicle_capacities': [25],
+    }
+    aggregator = SensorAggregator(3, bin_capacity=10)
+    aggregator.ingest([1, 2, 3], [0.9, 0.2, 0.71])
+
+    pickup_data, nodes = pickup_data_model(data, aggregator, threshold=0.7)
+
+    assert nodes == [0, 1, 3]
+    assert pickup_data['locations'] == [[0, 0], [1, 1], [3, 3]]
+    assert pickup_data['demands'] == [0, 9, 8]
+    assert pickup_data['depot'] == 0
+    assert data['demands'] == [0, 1, 1, 1]
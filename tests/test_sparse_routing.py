@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from benchmarks.instances import generate_instance
+from distance_backend import HaversineBackend
+from metrics import recent_spans
+from optimalisasi_rute_truk_sampah import calculate_route
+from sparse_routing import candidate_neighbors, nearest_neighbor_tour
+
+SOLVER_OPTIONS = {'time_limit_seconds': 2}
+N_BINS = 150
+
+
+# Fungsi untuk memecah rute gabungan semua kendaraan menjadi rute per kendaraan
+def split_vehicle_routes(route, depot=0):
+    routes, current = [], []
+    for node in route:
+        current.append(node)
+        if node == depot and len(current) > 1:
+            routes.append(current)
+            current = []
+    return routes
+
+
+# Fungsi untuk menghitung panjang rute dari matriks jarak backend
+def route_length(data, route):
+    distances = np.rint(HaversineBackend().matrix(data['locations'])[0]).astype(np.int64)
+    return int(sum(distances[a, b] for a, b in zip(route, route[1:])))
+
+
+@pytest.fixture(scope='module')
+def dense_solution():
+    data = generate_instance(N_BINS, seed=7)
+    return calculate_route(data, backend=HaversineBackend(), solver_options=SOLVER_OPTIONS)
+
+
+def test_nearest_neighbor_tour_visits_every_bin_once():
+    locations = generate_instance(30, seed=2)['locations']
+
+    tour = nearest_neighbor_tour(locations)
+    candidates = candidate_neighbors(locations, 5, 0, tour)
+
+    assert sorted(tour.tolist()) == list(range(1, 31))
+    # Arc tur awal selalu termasuk kandidat sehingga solusi awal tidak terhalang domain
+    for from_node, to_node in zip(tour[:-1].tolist(), tour[1:].tolist()):
+        assert to_node in candidates[from_node].tolist()
+
+
+@pytest.mark.parametrize('restrict_arcs', [True, False])
+def test_sparse_route_is_close_to_dense_route(dense_solution, restrict_arcs):
+    data = dict(generate_instance(N_BINS, seed=7), sparse_neighbors=10, sparse_restrict_arcs=restrict_arcs)
+    dense_route, dense_distance = dense_solution
+
+    route, distance = calculate_route(data, backend=HaversineBackend(), solver_options=SOLVER_OPTIONS)
+
+    assert route[0] == route[-1] == 0
+    assert sorted(node for node in route if node != 0) == list(range(1, N_BINS + 1))
+    assert distance == route_length(data, route)
+    assert distance <= dense_distance * 1.1
+    assert sorted(dense_route) == sorted(route)
+
+    # Hanya sebagian kecil matriks penuh yang diminta dari backend
+    solve = recent_spans('calculate_sparse_route')[-1]
+    assert solve['requested_cells'] < 0.6 * (N_BINS + 1) ** 2
+
+
+def test_sparse_route_respects_vehicle_capacity():
+    data = generate_instance(40, seed=3)
+    capacity = sum(data['demands']) // 2 + 10
+    data.update(vehicle_capacities=[capacity, capacity], num_vehicles=2, sparse_neighbors=8)
+
+    route, distance = calculate_route(data, backend=HaversineBackend(), solver_options=SOLVER_OPTIONS)
+
+    vehicle_routes = split_vehicle_routes(route)
+    assert len(vehicle_routes) == 2
+    assert all(sum(data['demands'][node] for node in trip) <= capacity for trip in vehicle_routes)
+    assert sorted(node for node in route if node != 0) == list(range(1, 41))
+    assert distance == route_length(data, route)
@@ -0,0 +1,93 @@
+import pytest
+
+from distance_backend import HaversineBackend
+from timed_routing import calculate_timed_routes, format_clock, parse_clock
+
+SOLVER_OPTIONS = {'time_limit_seconds': 2}
+
+
+# Fungsi untuk membuat data model kecil: depot dan empat tempat sampah dalam radius beberapa km
+def make_data(demands=(0, 5, 5, 5, 5), **overrides):
+    data = {
+        'locations': [[-6.2088, 106.8456], [-6.2154, 106.8424], [-6.2202, 106.8500],
+                      [-6.2255, 106.8433], [-6.2308, 106.8477]],
+        'demands': list(demands),
+        'vehicle_capacities': [25],
+        'num_vehicles': 1,
+        'depot': 0,
+    }
+    data.update(overrides)
+    return data
+
+
+def solve(data, **kwargs):
+    return calculate_timed_routes(data, HaversineBackend(), SOLVER_OPTIONS, **kwargs)
+
+
+def test_parse_and_format_clock():
+    assert parse_clock('06:30') == 6 * 3600 + 30 * 60
+    assert parse_clock(3600) == 3600
+    assert format_clock(parse_clock('17:45') + 59) == '17:45'
+
+
+def test_timetable_stays_within_shift():
+    result = solve(make_data(), shift_start='07:00', shift_end='09:00')
+
+    (vehicle,) = result['vehicles']
+    (trip,) = vehicle['trips']
+    (stops,) = vehicle['timetable']
+    assert trip[0] == trip[-1] == 0
+    assert sorted(trip[1:-1]) == [1, 2, 3, 4]
+    assert parse_clock('07:00') <= parse_clock(stops[0]['departure'])
+    assert parse_clock(stops[-1]['arrival']) <= parse_clock('09:00')
+    arrivals = [parse_clock(stop['arrival']) for stop in stops]
+    assert arrivals == sorted(arrivals)
+    assert stops[-1]['load'] == 20
+    assert result['total_distance'] == vehicle['distance'] > 0
+
+
+def test_service_time_is_added_at_each_bin():
+    result = solve(make_data(), service_time=600)
+
+    (stops,) = result['vehicles'][0]['timetable']
+    for stop, next_stop in zip(stops[1:-1], stops[2:]):
+        assert parse_clock(stop['departure']) - parse_clock(stop['arrival']) == 600
+        assert parse_clock(next_stop['arrival']) >= parse_clock(stop['departure'])
+
+
+def test_infeasible_when_shift_is_too_short():
+    assert solve(make_data(), service_time=120, max_shift_duration=300) is None
+    assert solve(make_data(), service_time=120, shift_start='06:00', shift_end='06:05') is None
+
+
+def test_second_trip_starts_after_unloading():
+    data = make_data(demands=(0, 10, 10, 10, 10), max_trips=2)
+    result = solve(data, unload_time=1800)
+
+    (vehicle,) = result['vehicles']
+    assert len(vehicle['trips']) == 2
+    first, second = vehicle['timetable']
+    assert max(stop['load'] for stop in first) <= 25 and max(stop['load'] for stop in second) <= 25
+    assert parse_clock(second[0]['departure']) - parse_clock(first[-1]['arrival']) >= 1800 - 60
+
+
+def test_shift_limit_covers_all_trips_of_a_truck():
+    data = make_data(demands=(0, 10, 10, 10, 10), max_trips=2)
+
+    # Dua trip dengan bongkar 30 menit di antaranya tidak muat dalam 30 menit kerja
+    assert solve(data, unload_time=1800, max_shift_duration=1800) is None
+    assert solve(data, unload_time=1800, max_shift_duration=4 * 3600) is not None
+
+
+def test_time_window_is_respected():
+    data = make_data(time_windows=[None, None, ('08:00', '08:30'), None, None])
+    result = solve(data, shift_start='06:00', shift_end='12:00')
+
+    (stops,) = result['vehicles'][0]['timetable']
+    (stop,) = [stop for stop in stops if stop['node'] == 2]
+    assert parse_clock('08:00') <= parse_clock(stop['arrival']) <= parse_clock('08:30')
+
+
+@pytest.mark.parametrize('capacity', [5, 9])
+def test_capacity_without_extra_trips_is_infeasible(capacity):
+    assert solve(make_data(vehicle_capacities=[capacity])) is None
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import demand_provider as demand_provider_module
+from demand_provider import ReplayDemandProvider, SyntheticDemandProvider, set_demand_provider
+from optimalisasi_rute_truk_sampah import train_volume_prediction_model
+from volume_model import LATEST_FILE, PredictedDemandProvider, train_volume_model
+
+NUM_BINS = 4
+
+
+# Fungsi untuk membuat riwayat volume beberapa minggu dengan kolom day, bin, demand
+def make_history(weeks=2):
+    days = np.arange(weeks * 7)
+    return pd.DataFrame({
+        'day': np.repeat(days, NUM_BINS),
+        'bin': np.tile(np.arange(1, NUM_BINS + 1), len(days)),
+        'demand': SyntheticDemandProvider(NUM_BINS).demands(days).ravel(),
+    })
+
+
+@pytest.fixture
+def demand_provider():
+    """Mengembalikan provider volume default setelah test menggantinya."""
+    previous = demand_provider_module._default_provider
+    yield set_demand_provider
+    set_demand_provider(previous)
+
+
+@pytest.fixture
+def model(tmp_path):
+    return train_volume_model(make_history(), model_dir=str(tmp_path), n_estimators=5, n_jobs=1)
+
+
+def test_synthetic_demand_is_not_trained_or_persisted(demand_provider, tmp_path, monkeypatch):
+    monkeypatch.setattr('volume_model.DEFAULT_MODEL_DIR', str(tmp_path))
+    demand_provider(SyntheticDemandProvider(NUM_BINS))
+
+    with pytest.raises(ValueError):
+        train_volume_prediction_model()
+    assert not list(tmp_path.iterdir())
+
+
+def test_replayed_history_is_trained_and_persisted(demand_provider, tmp_path, monkeypatch):
+    model_dir = tmp_path / 'models'
+    monkeypatch.setattr('optimalisasi_rute_truk_sampah.train_volume_model',
+                        lambda history, version=None: train_volume_model(
+                            history, version, model_dir=str(model_dir), n_estimators=5, n_jobs=1))
+    demand_provider(ReplayDemandProvider(make_history()))
+
+    trained = train_volume_prediction_model()
+
+    assert trained.num_bins == NUM_BINS
+    assert (model_dir / LATEST_FILE).read_text() == trained.version
+
+
+def test_predicted_demand_cache_is_bounded(model):
+    provider = PredictedDemandProvider(model, horizon=3, max_cached_days=5)
+    first_week = provider.demands(range(7))
+
+    assert first_week.shape == (7, NUM_BINS)
+    assert list(provider._cache) == [2, 3, 4, 5, 6]
+    provider.demands([3])
+    provider.demands([10])
+    assert list(provider._cache) == [4, 5, 6, 3, 10]
+    np.testing.assert_array_equal(provider.demands(range(7)), first_week)
@@ -0,0 +1,172 @@
+"""
+Perencanaan rute dengan dimensi waktu: durasi perjalanan dari matriks durasi OSRM (ikut
+tersimpan di cache rute bersama jarak), waktu layanan per tempat sampah, jendela waktu
+per tempat sampah, dan batas shift pengemudi.
+
+Seperti mode armada, setiap truk bisa melakukan beberapa trip; trip berikutnya baru boleh
+berangkat setelah trip sebelumnya kembali ke depot dan selesai membongkar muatan.
+Semua transit (jarak, waktu, muatan) didaftarkan sebagai matriks/vektor ke OR-Tools.
+"""
+import os
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+
+from distance_backend import get_distance_backend
+from optimalisasi_rute_truk_sampah import build_search_parameters, to_integer_matrix
+from planning_jobs import watch_cancellation
+
+# Waktu layanan default per tempat sampah dan waktu bongkar di depot (detik)
+DEFAULT_SERVICE_TIME = int(os.environ.get('SERVICE_TIME_SECONDS', 120))
+DEFAULT_UNLOAD_TIME = int(os.environ.get('UNLOAD_TIME_SECONDS', 900))
+
+# Jam kerja default pengemudi
+DEFAULT_SHIFT_START = os.environ.get('SHIFT_START', '06:00')
+DEFAULT_SHIFT_END = os.environ.get('SHIFT_END', '18:00')
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+# Fungsi untuk mengubah "HH:MM" menjadi detik sejak tengah malam
+def parse_clock(value):
+    if isinstance(value, str):
+        hours, minutes = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60
+    return int(value)
+
+
+# Fungsi untuk mengubah detik sejak tengah malam menjadi "HH:MM"
+def format_clock(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+# Fungsi untuk menghitung rute dengan jendela waktu dan batas shift
+def calculate_timed_routes(data, backend=None, solver_options=None, service_time=DEFAULT_SERVICE_TIME,
+                           unload_time=DEFAULT_UNLOAD_TIME, shift_start=DEFAULT_SHIFT_START,
+                           shift_end=DEFAULT_SHIFT_END, max_shift_duration=None):
+    """
+    Parameter:
+    - data: dict data model. Kunci opsional:
+      - time_windows: list (mulai, selesai) per lokasi, "HH:MM" atau detik; None berarti bebas
+      - service_times: list waktu layanan per lokasi (detik), menimpa service_time
+      - max_trips: jumlah trip maksimum per truk (default 1)
+    - service_time: waktu layanan default per tempat sampah (detik)
+    - unload_time: waktu bongkar di depot sebelum trip berikutnya (detik)
+    - shift_start, shift_end: jam kerja ("HH:MM" atau detik)
+    - max_shift_duration: lama kerja maksimum per truk (detik), default shift_end - shift_start
+
+    Return:
+    - dict berisi 'vehicles' (per truk: vehicle_id, trips, timetable, distance) dan
+      'total_distance', atau None jika tidak ada solusi yang memenuhi semua batasan.
+      Setiap timetable berisi daftar trip, tiap trip berupa list
+      {'node', 'arrival', 'departure', 'load'} dengan jam dalam format "HH:MM".
+    """
+    if backend is None or isinstance(backend, str):
+        backend = get_distance_backend(backend or data.get('distance_backend'))
+    shift_start = parse_clock(shift_start)
+    shift_end = parse_clock(shift_end)
+    max_shift_duration = max_shift_duration or (shift_end - shift_start)
+    max_trips = data.get('max_trips', 1)
+    depot = data['depot']
+    num_nodes = len(data['locations'])
+
+    distances, durations = backend.matrix(data['locations'])
+    distance_matrix = to_integer_matrix(distances)
+
+    # Waktu transit i -> j = waktu layanan di i + durasi perjalanan i -> j
+    service_times = np.asarray(data.get('service_times') or [service_time] * num_nodes, dtype=np.int64)
+    service_times[depot] = 0
+    time_matrix = to_integer_matrix(durations) + service_times[:, None]
+
+    num_trucks = data['num_vehicles']
+    num_virtual = num_trucks * max_trips
+    capacities = [data['vehicle_capacities'][vehicle_id] for vehicle_id in range(num_trucks) for _ in range(max_trips)]
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, num_virtual, depot)
+    routing = pywrapcp.RoutingModel(manager)
+
+    transit_callback_index = routing.RegisterTransitMatrix(distance_matrix.tolist())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    demand_callback_index = routing.RegisterUnaryTransitVector(np.asarray(data['demands'], dtype=np.int64).tolist())
+    routing.AddDimensionWithVehicleCapacity(demand_callback_index, 0, capacities, True, 'Capacity')
+
+    time_callback_index = routing.RegisterTransitMatrix(time_matrix.tolist())
+    routing.AddDimension(
+        time_callback_index,
+        max_shift_duration,  # Waktu tunggu maksimum (slack) untuk memenuhi jendela waktu
+        SECONDS_PER_DAY,
+        False,  # Waktu berangkat tidak dipaksa 0
+        'Time'
+    )
+    time_dimension = routing.GetDimensionOrDie('Time')
+
+    for node, window in enumerate(data.get('time_windows') or []):
+        if node == depot or window is None:
+            continue
+        start, end = (parse_clock(value) for value in window)
+        time_dimension.CumulVar(manager.NodeToIndex(node)).SetRange(start, end)
+
+    solver = routing.solver()
+    for virtual_id in range(num_virtual):
+        time_dimension.CumulVar(routing.Start(virtual_id)).SetRange(shift_start, shift_end)
+        time_dimension.CumulVar(routing.End(virtual_id)).SetRange(shift_start, shift_end)
+        routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.End(virtual_id)))
+    # Setelah jam kembali ditetapkan seawal mungkin, berangkat selambat mungkin agar tidak ada waktu tunggu sia-sia
+    for virtual_id in range(num_virtual):
+        routing.AddVariableMaximizedByFinalizer(time_dimension.CumulVar(routing.Start(virtual_id)))
+
+    for truck in range(num_trucks):
+        first = truck * max_trips
+        for trip in range(1, max_trips):
+            virtual_id = first + trip
+            # Trip dipakai berurutan, dan berangkat setelah trip sebelumnya selesai dibongkar
+            solver.Add(routing.ActiveVehicleVar(virtual_id) <= routing.ActiveVehicleVar(virtual_id - 1))
+            solver.Add(time_dimension.CumulVar(routing.Start(virtual_id))
+                       >= time_dimension.CumulVar(routing.End(virtual_id - 1))
+                       + unload_time * routing.ActiveVehicleVar(virtual_id))
+        # Batas lama shift pengemudi dari keberangkatan pertama sampai kembali dari trip terakhir
+        solver.Add(time_dimension.CumulVar(routing.End(first + max_trips - 1))
+                   - time_dimension.CumulVar(routing.Start(first)) <= max_shift_duration)
+
+    search_parameters = build_search_parameters(solver_options or data.get('solver_options'))
+    watch_cancellation(routing)
+    solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        return None
+
+    capacity_dimension = routing.GetDimensionOrDie('Capacity')
+    vehicles = []
+    total_distance = 0
+    for truck in range(num_trucks):
+        trips, timetable = [], []
+        vehicle_distance = 0
+        for trip in range(max_trips):
+            virtual_id = truck * max_trips + trip
+            if not routing.IsVehicleUsed(solution, virtual_id):
+                continue
+            index = routing.Start(virtual_id)
+            route, stops = [], []
+            while True:
+                node = manager.IndexToNode(index)
+                arrival = solution.Min(time_dimension.CumulVar(index))
+                route.append(node)
+                stops.append({
+                    'node': node,
+                    'arrival': format_clock(arrival),
+                    'departure': format_clock(arrival + service_times[node]),
+                    'load': solution.Value(capacity_dimension.CumulVar(index)),
+                })
+                if routing.IsEnd(index):
+                    break
+                previous_index = index
+                index = solution.Value(routing.NextVar(index))
+                vehicle_distance += routing.GetArcCostForVehicle(previous_index, index, virtual_id)
+            trips.append(route)
+            timetable.append(stops)
+
+        vehicles.append({'vehicle_id': truck, 'trips': trips, 'timetable': timetable, 'distance': vehicle_distance})
+        total_distance += vehicle_distance
+
+    return {'vehicles': vehicles, 'total_distance': total_distance}
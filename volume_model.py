@@ -0,0 +1,211 @@
+"""
+Model prediksi volume sampah per tempat sampah per hari.
+
+Model dilatih offline dari riwayat volume (kolom day, bin, demand; format yang sama dengan
+ReplayDemandProvider), lalu disimpan dengan joblib di bawah sebuah version key:
+VOLUME_MODEL_DIR/volume_model-<versi>.joblib. File VOLUME_MODEL_DIR/LATEST menunjuk ke versi
+terakhir yang dilatih.
+
+Model dimuat sekali per proses (lihat load_volume_model) dan prediksi dilakukan sekaligus untuk
+semua tempat sampah x N hari dalam satu panggilan predict, memakai beberapa core (n_jobs).
+
+Pelatihan dari command line:
+    python volume_model.py riwayat.csv --version 2024-06
+"""
+import argparse
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from demand_provider import DemandProvider
+
+DEFAULT_MODEL_DIR = os.environ.get('VOLUME_MODEL_DIR', '.models')
+DEFAULT_N_JOBS = int(os.environ.get('VOLUME_MODEL_N_JOBS', -1))
+DEFAULT_HORIZON = 7
+# Jumlah hari prediksi yang disimpan PredictedDemandProvider (LRU)
+DEFAULT_MAX_CACHED_DAYS = int(os.environ.get('VOLUME_MODEL_MAX_CACHED_DAYS', 366))
+LATEST_FILE = 'LATEST'
+
+
+# Fungsi untuk membuat path file model dari versinya
+def model_path(version, model_dir=DEFAULT_MODEL_DIR):
+    return os.path.join(model_dir, f"volume_model-{version}.joblib")
+
+
+# Fungsi untuk membuat version key dari isi riwayat volume
+def history_version(history):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(history[['day', 'bin', 'demand']], index=False).to_numpy())
+    return digest.hexdigest()[:12]
+
+
+class VolumeModel:
+    """
+    Pembungkus estimator beserta statistik per tempat sampah yang dipakai sebagai fitur:
+    rata-rata volume per tempat sampah dan per (tempat sampah, hari dalam seminggu).
+    """
+
+    def __init__(self, estimator, bin_mean, bin_weekday_mean, version, trained_at=None):
+        self.estimator = estimator
+        self.bin_mean = bin_mean  # Array num_bins
+        self.bin_weekday_mean = bin_weekday_mean  # Array num_bins x 7
+        self.version = version
+        self.trained_at = trained_at
+
+    @property
+    def num_bins(self):
+        return len(self.bin_mean)
+
+    def features(self, days, bins=None):
+        """Matriks fitur untuk semua kombinasi hari x tempat sampah (bin bernomor 1..N)."""
+        bins = np.arange(1, self.num_bins + 1) if bins is None else np.asarray(bins)
+        day_grid, bin_grid = np.meshgrid(np.asarray(days), bins, indexing='ij')
+        day_grid, bin_grid = day_grid.ravel(), bin_grid.ravel()
+        weekday = day_grid % 7
+        return np.column_stack([
+            bin_grid,
+            weekday,
+            self.bin_mean[bin_grid - 1],
+            self.bin_weekday_mean[bin_grid - 1, weekday],
+        ])
+
+    def predict(self, days, bins=None):
+        """
+        Return:
+        - NumPy array float berukuran len(days) x len(bins) berisi prediksi volume.
+        """
+        days = list(days)
+        num_bins = self.num_bins if bins is None else len(bins)
+        predictions = self.estimator.predict(self.features(days, bins))
+        return predictions.reshape(len(days), num_bins)
+
+
+# Fungsi untuk melatih model dari riwayat volume dan menyimpannya
+def train_volume_model(history, version=None, model_dir=DEFAULT_MODEL_DIR, n_estimators=100,
+                       n_jobs=DEFAULT_N_JOBS, random_state=42):
+    """
+    history: DataFrame atau path CSV/JSON lines dengan kolom day, bin (1..N), dan demand
+    version: version key model; default berupa hash isi riwayat sehingga riwayat yang sama
+             menghasilkan versi yang sama
+
+    Return:
+    - VolumeModel yang sudah dilatih dan disimpan ke model_path(version).
+    """
+    if not isinstance(history, pd.DataFrame):
+        history = pd.read_json(history, lines=True) if str(history).endswith(('.jsonl', '.json')) else pd.read_csv(history)
+    version = version or history_version(history)
+
+    bins = history['bin'].to_numpy(dtype=np.int64)
+    weekday = history['day'].to_numpy(dtype=np.int64) % 7
+    demand = history['demand'].to_numpy(dtype=np.float64)
+    num_bins = int(bins.max())
+
+    # Rata-rata per tempat sampah dan per (tempat sampah, hari) dengan bincount tervektorisasi
+    bin_count = np.bincount(bins - 1, minlength=num_bins)
+    bin_mean = np.bincount(bins - 1, weights=demand, minlength=num_bins) / np.maximum(bin_count, 1)
+    cell = (bins - 1) * 7 + weekday
+    cell_count = np.bincount(cell, minlength=num_bins * 7)
+    cell_sum = np.bincount(cell, weights=demand, minlength=num_bins * 7)
+    bin_weekday_mean = np.where(cell_count > 0, cell_sum / np.maximum(cell_count, 1),
+                                np.repeat(bin_mean, 7)).reshape(num_bins, 7)
+
+    features = np.column_stack([bins, weekday, bin_mean[bins - 1], bin_weekday_mean[bins - 1, weekday]])
+    estimator = RandomForestRegressor(n_estimators=n_estimators, n_jobs=n_jobs, random_state=random_state)
+    estimator.fit(features, demand)
+
+    model = VolumeModel(estimator, bin_mean, bin_weekday_mean, version, trained_at=datetime.now().isoformat())
+    save_volume_model(model, model_dir)
+    return model
+
+
+# Fungsi untuk menyimpan model dan menandainya sebagai versi terbaru
+def save_volume_model(model, model_dir=DEFAULT_MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, model_path(model.version, model_dir))
+    with open(os.path.join(model_dir, LATEST_FILE), 'w') as latest:
+        latest.write(model.version)
+    with _lock:
+        _loaded_models[(model_dir, model.version)] = model
+
+
+_loaded_models = {}
+_lock = threading.Lock()
+
+
+# Fungsi untuk memuat model (sekali per proses untuk setiap versi)
+def load_volume_model(version=None, model_dir=DEFAULT_MODEL_DIR, n_jobs=DEFAULT_N_JOBS):
+    """
+    version: version key; None atau 'latest' berarti versi di file LATEST
+
+    Raise FileNotFoundError jika model versi tersebut belum pernah dilatih.
+    """
+    if version in (None, 'latest'):
+        latest_path = os.path.join(model_dir, LATEST_FILE)
+        if not os.path.exists(latest_path):
+            raise FileNotFoundError(f"Belum ada model volume di {model_dir}")
+        with open(latest_path) as latest:
+            version = latest.read().strip()
+
+    with _lock:
+        model = _loaded_models.get((model_dir, version))
+        if model is None:
+            model = joblib.load(model_path(version, model_dir))
+            _loaded_models[(model_dir, version)] = model
+    model.estimator.set_params(n_jobs=n_jobs)
+    return model
+
+
+class PredictedDemandProvider(DemandProvider):
+    """
+    Volume sampah dari model prediksi. Saat dibuat, volume untuk semua tempat sampah x
+    `horizon` hari pertama diprediksi dalam satu panggilan; hari lain diprediksi (juga per
+    batch) saat pertama kali diminta lalu disimpan. Paling banyak `max_cached_days` hari
+    disimpan; hari yang paling lama tidak diminta dibuang lebih dulu.
+    """
+
+    def __init__(self, model=None, horizon=DEFAULT_HORIZON, start_day=0, max_cached_days=DEFAULT_MAX_CACHED_DAYS):
+        self.model = model if model is not None else load_volume_model()
+        self.num_bins = self.model.num_bins
+        self.max_cached_days = max(1, max_cached_days)
+        self._cache = OrderedDict()
+        self.demands(range(start_day, start_day + horizon))
+
+    def demands(self, days):
+        days = list(days)
+        rows = {}
+        missing = []
+        for day in dict.fromkeys(days):
+            if day in self._cache:
+                self._cache.move_to_end(day)
+                rows[day] = self._cache[day]
+            else:
+                missing.append(day)
+        if missing:
+            predictions = np.clip(np.rint(self.model.predict(missing)), 0, None).astype(np.int64)
+            rows.update(zip(missing, predictions))
+            self._cache.update(zip(missing, predictions))
+            while len(self._cache) > self.max_cached_days:
+                self._cache.popitem(last=False)
+        return np.array([rows[day] for day in days], dtype=np.int64).reshape(len(days), self.num_bins)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Melatih model prediksi volume sampah")
+    parser.add_argument('history', help="CSV atau JSON lines dengan kolom day, bin, demand")
+    parser.add_argument('--version', default=None)
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--n-jobs', type=int, default=DEFAULT_N_JOBS)
+    args = parser.parse_args()
+
+    # Dilatih lewat modul volume_model (bukan __main__) agar file joblib bisa dimuat dari modul lain
+    import volume_model
+    trained = volume_model.train_volume_model(args.history, version=args.version, model_dir=args.model_dir,
+                                 n_estimators=args.n_estimators, n_jobs=args.n_jobs)
+    print(f"Model versi {trained.version} disimpan di {model_path(trained.version, args.model_dir)}")